@@ -0,0 +1,63 @@
+"""Compare reads of a bound dataclass with `AloeDocument.get`
+
+Run with `uv run python benchmarks/bench_bind.py`
+"""
+
+from dataclasses import dataclass
+from timeit import timeit
+
+from aloe.document import AloeDocument
+
+N = 1_000_000
+
+TEXT = """
+@database {
+    host = "localhost"
+    port = 5432
+
+    @pool {
+        max_connections = 20
+        timeout = 30
+    }
+}
+"""
+
+
+@dataclass(slots=True)
+class Pool:
+    max_connections: int
+    timeout: float
+
+
+@dataclass(slots=True)
+class Database:
+    host: str
+    port: int
+    pool: Pool
+
+
+@dataclass(slots=True)
+class Config:
+    database: Database
+
+
+def main():
+    doc = AloeDocument.from_text(TEXT)
+    # The first binding compiles and caches the plan of every class
+    first = timeit(lambda: doc.bind(Config), number=1)
+    bind = timeit(lambda: doc.bind(Config), number=1000) / 1000
+    config = doc.bind(Config)
+
+    results = {
+        "attribute": timeit(lambda: config.database.pool.max_connections, number=N),
+        "get": timeit(lambda: doc.get("database.pool.max_connections"), number=N),
+    }
+
+    print(f"first bind: {first * 1e6:8.1f} us, bind: {bind * 1e6:8.1f} us")
+
+    for name, seconds in results.items():
+        print(f"{name:>10}: {seconds / N * 1e9:8.1f} ns/read")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Compare `get_many` / `update` with the equivalent `get` / `set` loops
+
+Run with `uv run python benchmarks/bench_bulk.py`
+"""
+
+from timeit import timeit
+
+from aloe.document import AloeDocument
+from common import generate_paths, generate_text
+
+SECTIONS = 100
+KEYS = 50
+ROUNDS = 20
+
+
+def main():
+    doc = AloeDocument.from_text(generate_text(SECTIONS, KEYS))
+    paths = generate_paths(SECTIONS, KEYS)
+    values = {path: 1 for path in paths}
+
+    def get_loop():
+        return {path: doc.get(path) for path in paths}
+
+    def set_loop():
+        for path, value in values.items():
+            doc.set(path, value)
+
+    results = {
+        "get loop": timeit(get_loop, number=ROUNDS),
+        "get_many": timeit(lambda: doc.get_many(paths), number=ROUNDS),
+        "set loop": timeit(set_loop, number=ROUNDS),
+        "update": timeit(lambda: doc.update(values), number=ROUNDS),
+    }
+
+    print(f"{len(paths)} paths, {ROUNDS} rounds")
+    for name, seconds in results.items():
+        print(f"{name:>9}: {seconds / ROUNDS * 1e3:8.3f} ms/round")
+
+
+if __name__ == "__main__":
+    main()
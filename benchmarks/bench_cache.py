@@ -0,0 +1,48 @@
+"""Cold and warm `from_file` with the compiled `.aloec` cache
+
+Run with `uv run python benchmarks/bench_cache.py`
+"""
+
+import os
+import tempfile
+import time
+
+from aloe.cache import cache_path
+from aloe.document import AloeDocument
+from common import generate_text
+
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config.aloe")
+
+        for sections in (100, 1000):
+            with open(path, "w") as f:
+                f.write(generate_text(sections, 20))
+
+            if os.path.exists(cache_path(path)):
+                os.unlink(cache_path(path))
+
+            size = os.path.getsize(path) / 1024
+            plain = timed(lambda: AloeDocument.from_file(path))
+            cold = timed(lambda: AloeDocument.from_file(path, cache=True))
+            warm = min(
+                timed(lambda: AloeDocument.from_file(path, cache=True))
+                for _ in range(5)
+            )
+
+            print(
+                f"{size:6.0f} KiB: no cache {plain * 1e3:8.2f} ms,"
+                f" cold {cold * 1e3:8.2f} ms, warm {warm * 1e3:8.2f} ms"
+                f" ({os.path.getsize(cache_path(path)) / 1024:.0f} KiB cache)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Compare `AloeDocument.get` with a compiled path and a dict lookup
+
+Run with `uv run python benchmarks/bench_compiled_path.py`
+"""
+
+from timeit import timeit
+
+from aloe.document import AloeDocument
+
+N = 1_000_000
+
+TEXT = """
+@database {
+    host = "localhost"
+    port = 5432
+
+    @pool {
+        max_connections = 20
+        timeout = 30
+    }
+}
+"""
+
+
+def main():
+    doc = AloeDocument.from_text(TEXT)
+    timeout = doc.compile_path("database.pool.timeout")
+    table = {"database.pool.timeout": 30}
+
+    results = {
+        "dict lookup": timeit(lambda: table["database.pool.timeout"], number=N),
+        "compiled get": timeit(timeout.get, number=N),
+        "get": timeit(lambda: doc.get("database.pool.timeout"), number=N),
+    }
+
+    for name, seconds in results.items():
+        print(f"{name:>14}: {seconds / N * 1e9:8.1f} ns/op")
+
+
+if __name__ == "__main__":
+    main()
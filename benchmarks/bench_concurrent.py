@@ -0,0 +1,61 @@
+"""Read throughput of `ConcurrentAloeDocument` against the number of threads
+
+A writer thread keeps publishing new versions while the readers run
+
+Run with `uv run python benchmarks/bench_concurrent.py`
+"""
+
+import threading
+import time
+
+from aloe.concurrent import ConcurrentAloeDocument
+from common import generate_paths, generate_text
+
+SECTIONS = 50
+KEYS = 20
+DURATION = 1.0
+
+
+def run(threads: int) -> tuple[float, int]:
+    doc = ConcurrentAloeDocument.from_text(generate_text(SECTIONS, KEYS))
+    paths = generate_paths(SECTIONS, KEYS)[:: SECTIONS * KEYS // 64]
+    stop = threading.Event()
+    counts = [0] * threads
+    writes = 0
+
+    def reader(slot: int):
+        n = 0
+        while not stop.is_set():
+            for path in paths:
+                doc.get(path)
+            n += len(paths)
+        counts[slot] = n
+
+    def writer():
+        nonlocal writes
+        while not stop.is_set():
+            doc.set(paths[writes % len(paths)], writes)
+            writes += 1
+            time.sleep(0.001)
+
+    workers = [threading.Thread(target=reader, args=(i,)) for i in range(threads)]
+    workers.append(threading.Thread(target=writer))
+
+    for worker in workers:
+        worker.start()
+    time.sleep(DURATION)
+    stop.set()
+    for worker in workers:
+        worker.join()
+
+    return sum(counts) / DURATION, writes
+
+
+def main():
+    for threads in (1, 2, 4, 8):
+        reads, writes = run(threads)
+        print(f"{threads} reader threads: {reads:12,.0f} reads/s ({writes} writes)")
+
+
+if __name__ == "__main__":
+    main()
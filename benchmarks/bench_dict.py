@@ -0,0 +1,70 @@
+"""Compare `to_dict`/`from_dict` with the equivalent `get`/`set` loops
+
+Run with `uv run python benchmarks/bench_dict.py`
+"""
+
+import time
+
+from aloe.ast import Document
+from aloe.document import AloeDocument
+from common import generate_paths, generate_text
+
+SECTIONS = 5000
+KEYS = 20
+
+
+def timed(function) -> tuple[object, float]:
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def get_loop(doc: AloeDocument, paths: list[str]) -> dict:
+    values: dict = {}
+
+    for path in paths:
+        *sections, key = path.split(".")
+        scope = values
+
+        for section in sections:
+            scope = scope.setdefault(section, {})
+
+        scope[key] = doc.get(path)
+
+    return values
+
+
+def set_loop(paths: list[str], values: dict) -> AloeDocument:
+    doc = AloeDocument(Document([]))
+
+    for path in paths:
+        *sections, key = path.split(".")
+        scope = values
+
+        for section in sections:
+            scope = scope[section]
+
+        doc.set(path, scope[key])
+
+    return doc
+
+
+def main():
+    doc = AloeDocument.from_text(generate_text(SECTIONS, KEYS))
+    paths = generate_paths(SECTIONS, KEYS)
+
+    values, to_dict = timed(doc.document.to_dict)
+    looped, gets = timed(lambda: get_loop(doc, paths))
+    assert values == looped
+
+    built, from_dict = timed(lambda: AloeDocument.from_dict(values))
+    rebuilt, sets = timed(lambda: set_loop(paths, values))
+    assert built.document.to_dict() == rebuilt.document.to_dict() == values
+
+    print(f"{len(paths)} keys")
+    print(f"  to_dict   {to_dict * 1e3:9.1f} ms, get loop {gets * 1e3:9.1f} ms")
+    print(f"  from_dict {from_dict * 1e3:9.1f} ms, set loop {sets * 1e3:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
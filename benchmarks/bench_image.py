@@ -0,0 +1,66 @@
+"""Memory and lookup cost of a mapped image against a parsed document
+
+Run with `uv run python benchmarks/bench_image.py`
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+
+from aloe.document import AloeDocument
+from aloe.image import ConfigImage, write_image
+from common import generate_paths, generate_text
+
+
+def allocated(function):
+    """Result of `function` and the Python memory it keeps alive"""
+    tracemalloc.start()
+    result = function()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return result, size
+
+
+def load_indexed(path: str) -> AloeDocument:
+    doc = AloeDocument.from_file(path)
+    # Builds the key index, so `get` is a dict lookup too
+    len(doc)
+    return doc
+
+
+def per_lookup(get, paths: list[str]) -> float:
+    start = time.perf_counter()
+    for path in paths:
+        get(path)
+    return (time.perf_counter() - start) / len(paths)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config.aloe")
+        image_path = os.path.join(directory, "config.img")
+
+        for sections in (1000, 5000):
+            with open(path, "w") as f:
+                f.write(generate_text(sections, 20))
+
+            paths = generate_paths(sections, 20)
+            doc, doc_memory = allocated(lambda: load_indexed(path))
+            write_image(doc.document, image_path)
+            image, image_memory = allocated(lambda: ConfigImage.open(image_path))
+
+            print(
+                f"{len(paths):7} keys: parsed {doc_memory / 2**20:7.1f} MiB"
+                f" {per_lookup(doc.get, paths) * 1e9:6.0f} ns/get,"
+                f" image {image_memory / 2**10:5.1f} KiB private"
+                f" + {os.path.getsize(image_path) / 2**20:.1f} MiB shared"
+                f" {per_lookup(image.get, paths) * 1e9:6.0f} ns/get"
+            )
+
+            image.close()
+
+
+if __name__ == "__main__":
+    main()
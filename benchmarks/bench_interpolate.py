@@ -0,0 +1,45 @@
+"""Compare resolved lookups of an `Interpolator` with `AloeDocument.get`
+
+Run with `uv run python benchmarks/bench_interpolate.py`
+"""
+
+from timeit import timeit
+
+from aloe.document import AloeDocument
+from aloe.interpolate import Interpolator
+
+N = 1_000_000
+
+TEXT = """
+@database {
+    host = "localhost"
+    port = 5432
+    url = "postgres://${database.host}:${database.port}/app"
+}
+"""
+
+
+def main():
+    doc = AloeDocument.from_text(TEXT)
+    config = Interpolator(doc)
+    # Builds the key index, so `get` is a dict lookup too
+    len(doc)
+
+    results = {
+        "get": timeit(lambda: doc.get("database.url"), number=N),
+        "resolved get": timeit(lambda: config.get("database.url"), number=N),
+    }
+
+    for name, seconds in results.items():
+        print(f"{name:>14}: {seconds / N * 1e9:8.1f} ns/op")
+
+    def set_and_resolve():
+        doc.set("database.port", 5433)
+        config.get("database.url")
+
+    seconds = timeit(set_and_resolve, number=N // 10)
+    print(f"{'set + resolve':>14}: {seconds / (N // 10) * 1e9:8.1f} ns/op")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Write throughput of a burst of `set` calls with a journal
+
+Compares saving after every `set` with appending to a `Journal`, with and
+without an fsync per record
+
+Run with `uv run python benchmarks/bench_journal.py`
+"""
+
+import os
+import tempfile
+import time
+
+from aloe.document import AloeDocument
+from aloe.journal import Journal
+from common import generate_text
+
+BURST = 20_000
+# Saving after every set is slow, it's measured on a slice of the burst
+SAMPLE = 500
+SECTIONS = 200
+
+
+def run(name: str, path: str, sets: int, make_journal) -> None:
+    doc = AloeDocument.from_file(path)
+    journal = make_journal(doc)
+
+    start = time.perf_counter()
+    for i in range(sets):
+        doc.set("section_a.nested.key_a", i)
+        if journal is None:
+            doc.save(atomic=True)
+    elapsed = time.perf_counter() - start
+
+    compactions = 0
+    if journal is not None:
+        compactions = journal.compactions
+        journal.close()
+
+    print(
+        f"{name:>25}: {sets / elapsed:10,.0f} sets/s,"
+        f" {compactions:3} compactions ({sets} sets)"
+    )
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config.aloe")
+
+        with open(path, "w") as f:
+            f.write(generate_text(SECTIONS, 20))
+
+        print(f"{os.path.getsize(path):,} bytes file")
+
+        run("atomic save per set", path, SAMPLE, lambda doc: None)
+        run("journal", path, BURST, lambda doc: Journal(doc))
+        run("durable journal", path, SAMPLE, lambda doc: Journal(doc, durable=True))
+        run(
+            "journal, 64 KiB threshold",
+            path,
+            BURST,
+            lambda doc: Journal(doc, threshold=1 << 16),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Compare `AloeDocument.query` with filtering every key
+
+Run with `uv run python benchmarks/bench_query.py`
+"""
+
+import re
+import time
+
+from aloe.document import AloeDocument
+from common import generate_text
+
+SECTIONS = 5000
+KEYS = 20
+
+QUERIES = {
+    "section_hij.nested.*": r"section_hij\.nested\.[^.]+",
+    "*.nested.key_b": r"[^.]+\.nested\.key_b",
+    "**.key_b": r"(.+\.)?key_b",
+    "section_ha*.**": r"section_ha[^.]*\..+",
+}
+
+
+def timed(function) -> tuple[object, float]:
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    doc = AloeDocument.from_text(generate_text(SECTIONS, KEYS))
+    # The scans below use the key index, build it upfront
+    print(f"{len(doc)} keys")
+
+    for pattern, regex in QUERIES.items():
+        compiled = re.compile(regex)
+        # New documents over the same tree start without a trie
+        fresh = AloeDocument(doc.document)
+        first, first_time = timed(lambda: next(fresh.query(pattern)))
+        fresh = AloeDocument(doc.document)
+        matches, query_time = timed(lambda: list(fresh.query(pattern)))
+        warm, warm_time = timed(lambda: list(fresh.query(pattern)))
+        scanned, scan_time = timed(
+            lambda: [(k, v) for k, v in doc.items() if compiled.fullmatch(k)]
+        )
+
+        assert sorted(matches) == sorted(scanned) == sorted(warm)
+
+        print(
+            f"{pattern:>22}: {len(matches):6} matches,"
+            f" first {first_time * 1e3:7.3f} ms,"
+            f" cold {query_time * 1e3:7.2f} ms, warm {warm_time * 1e3:7.2f} ms,"
+            f" scan {scan_time * 1e3:7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Reload latency against file size, with and without a change
+
+Run with `uv run python benchmarks/bench_reload.py`
+"""
+
+import os
+import tempfile
+import time
+
+from aloe.document import AloeDocument
+from aloe.watch import Watcher
+from common import generate_text
+
+KEYS = 20
+
+
+def touch(path: str, text: str) -> None:
+    with open(path, "w") as f:
+        f.write(text)
+
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config.aloe")
+
+        for sections in (10, 100, 1000):
+            text = generate_text(sections, KEYS)
+            touch(path, text)
+
+            doc = AloeDocument.from_file(path)
+            watcher = Watcher()
+            watcher.add(doc)
+
+            touch(path, text.replace('"value 0"', '"changed"', 1))
+
+            now = watcher.next_due()
+            assert now is not None
+
+            start = time.perf_counter()
+            [(_, changed)] = watcher.poll(now)
+            elapsed = time.perf_counter() - start
+
+            assert len(changed) == 1
+
+            start = time.perf_counter()
+            watcher.poll(watcher.next_due())
+            unchanged = time.perf_counter() - start
+
+            print(
+                f"{len(text) / 1024:8.0f} KiB: reload {elapsed * 1e3:8.2f} ms,"
+                f" unchanged poll {unchanged * 1e6:6.1f} us"
+            )
+
+        watcher = Watcher()
+        docs = []
+        for i in range(2000):
+            name = os.path.join(directory, f"{i}.aloe")
+            touch(name, "key = 1\n")
+            docs.append(AloeDocument.from_file(name))
+        watcher.add(*docs)
+
+        start = time.perf_counter()
+        watcher.poll(time.monotonic() + 1)
+        elapsed = time.perf_counter() - start
+
+        print(f"2000 unchanged files polled in {elapsed * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
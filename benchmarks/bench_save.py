@@ -0,0 +1,73 @@
+"""Writes and fsyncs under a burst of 10k `set` calls
+
+Compares saving after every `set` (plain and atomic) with `CoalescingSaver`
+
+Run with `uv run python benchmarks/bench_save.py`
+"""
+
+import os
+import tempfile
+import time
+
+from aloe.document import AloeDocument
+from aloe.saver import CoalescingSaver
+from common import generate_text
+
+BURST = 10_000
+# Saving after every set is slow, it's measured on a slice of the burst
+SAMPLE = 500
+
+fsyncs = 0
+_fsync = os.fsync
+
+
+def counting_fsync(fd):
+    global fsyncs
+    fsyncs += 1
+    _fsync(fd)
+
+
+def run(name: str, path: str, sets: int, after_set) -> None:
+    global fsyncs
+    fsyncs = 0
+
+    doc = AloeDocument.from_file(path)
+    saver = after_set(doc)
+
+    start = time.perf_counter()
+    for i in range(sets):
+        doc.set("section_a.nested.key_a", i)
+        if saver is None:
+            doc.save(atomic=name == "atomic save per set")
+    if saver is not None:
+        saver.close()
+    elapsed = time.perf_counter() - start
+
+    writes = sets if saver is None else saver.saves
+    print(
+        f"{name:>22}: {sets / elapsed:10,.0f} sets/s,"
+        f" {writes:5} writes, {fsyncs:5} fsyncs ({sets} sets)"
+    )
+
+
+def main():
+    os.fsync = counting_fsync
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config.aloe")
+
+        with open(path, "w") as f:
+            f.write(generate_text(50, 20))
+
+        run("save per set", path, SAMPLE, lambda doc: None)
+        run("atomic save per set", path, SAMPLE, lambda doc: None)
+        run(
+            "coalescing (50ms)",
+            path,
+            BURST,
+            lambda doc: CoalescingSaver(doc, interval=0.05),
+        )
+
+
+if __name__ == "__main__":
+    main()
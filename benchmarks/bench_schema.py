@@ -0,0 +1,62 @@
+"""Compare a compiled schema with one `AloeDocument.get` per rule
+
+Run with `uv run python benchmarks/bench_schema.py`
+"""
+
+import time
+
+from aloe.document import AloeDocument
+from aloe.schema import Schema
+from common import generate_paths, generate_text, identifier
+
+SECTIONS = 1000
+KEYS = 20
+
+
+def generate_schema(sections: int, keys: int) -> str:
+    """Every key of `generate_text(sections, keys)` is a required string"""
+    lines = []
+
+    for s in range(sections):
+        lines.append(f"@{identifier('section_', s)} {{")
+        lines.append("    @nested {")
+        for k in range(keys):
+            lines.append(f"        @{identifier('key_', k)} {{")
+            lines.append('            type = "string"')
+            lines.append("            required = true")
+            lines.append("        }")
+        lines.append("    }")
+        lines.append("}")
+
+    return "\n".join(lines) + "\n"
+
+
+def by_hand(doc: AloeDocument, paths: list[str]) -> list[str]:
+    return [path for path in paths if not isinstance(doc.get(path), str)]
+
+
+def main():
+    doc = AloeDocument.from_text(generate_text(SECTIONS, KEYS))
+    paths = generate_paths(SECTIONS, KEYS)
+
+    schema_document = AloeDocument.from_text(generate_schema(SECTIONS, KEYS))
+
+    start = time.perf_counter()
+    schema = Schema(schema_document.document)
+    compiled = time.perf_counter() - start
+
+    start = time.perf_counter()
+    assert schema.validate(doc.document) == []
+    validate = time.perf_counter() - start
+
+    start = time.perf_counter()
+    assert by_hand(doc, paths) == []
+    gets = time.perf_counter() - start
+
+    print(f"{len(paths)} rules: compile {compiled * 1e3:8.2f} ms")
+    print(f"  schema.validate {validate * 1e3:8.2f} ms")
+    print(f"  get per rule    {gets * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
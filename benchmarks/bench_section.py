@@ -0,0 +1,70 @@
+"""Compare `AloeDocument.section` with copying a section into a new document
+
+Run with `uv run python benchmarks/bench_section.py`
+"""
+
+import copy
+import time
+
+from aloe.ast import Document
+from aloe.document import AloeDocument
+from common import generate_text, identifier
+
+SECTIONS = 5000
+KEYS = 20
+ROUNDS = 1000
+
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    doc = AloeDocument.from_text(generate_text(SECTIONS, KEYS))
+    name = identifier("section_", SECTIONS - 1)
+    keys = ["nested." + identifier("key_", k) for k in range(KEYS)]
+
+    def copied():
+        for _ in range(ROUNDS):
+            section = next(
+                node for node in doc.document._items if node.name == name
+            )
+            section = copy.deepcopy(section)
+            view = AloeDocument(Document(section.body))
+            for key in keys:
+                view.get(key)
+
+    def viewed():
+        for _ in range(ROUNDS):
+            view = doc.section(name)
+            for key in keys:
+                view.get(key)
+
+    copy_time = timed(copied)
+    view_time = timed(viewed)
+    # Same lookups once the document has a key index
+    print(f"{len(doc)} keys")
+    indexed_time = timed(viewed)
+
+    view = doc.section(name)
+
+    def written():
+        for i in range(ROUNDS):
+            view.set("nested.key_a", i)
+            view.get("nested.key_b")
+
+    write_time = timed(written)
+
+    print(
+        f"{ROUNDS} x (open section + {KEYS} gets):"
+        f" copy {copy_time * 1e3:8.2f} ms,"
+        f" view {view_time * 1e3:8.2f} ms,"
+        f" view with index {indexed_time * 1e3:8.2f} ms"
+    )
+    print(f"{ROUNDS} x (set + get through a view): {write_time * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
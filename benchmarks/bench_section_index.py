@@ -0,0 +1,57 @@
+"""Single key lookup latency with and without the sidecar section index
+
+Run with `uv run python benchmarks/bench_section_index.py`
+"""
+
+import os
+import tempfile
+import time
+
+from aloe.document import AloeDocument
+from aloe.section_index import SectionIndex, index_path, lookup
+from common import generate_text, identifier
+
+SECTIONS = 20_000
+KEYS = 20
+LOOKUPS = 100
+
+
+def timed(function) -> tuple[object, float]:
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config.aloe")
+
+        with open(path, "w") as f:
+            f.write(generate_text(SECTIONS, KEYS))
+
+        key = identifier("section_", SECTIONS // 2) + ".nested." + identifier(
+            "key_", KEYS - 1
+        )
+
+        expected, load_time = timed(lambda: AloeDocument.from_file(path).get(key))
+        _, build_time = timed(lambda: SectionIndex.load(path))
+        value, lookup_time = timed(
+            lambda: [lookup(path, key) for _ in range(LOOKUPS)][-1]
+        )
+        index = SectionIndex.load(path)
+        _, get_time = timed(lambda: [index.get(key) for _ in range(LOOKUPS)])
+
+        assert value == expected
+
+        print(
+            f"{os.path.getsize(path) / 1e6:.1f} MB file,"
+            f" {os.path.getsize(index_path(path)) / 1e6:.1f} MB index"
+        )
+        print(f"  from_file + get: {load_time * 1e3:10.3f} ms")
+        print(f"      build index: {build_time * 1e3:10.3f} ms")
+        print(f"  lookup (+ load): {lookup_time / LOOKUPS * 1e3:10.3f} ms")
+        print(f"  get, index open: {get_time / LOOKUPS * 1e3:10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Lookups over a directory of documents, with and without `AloeStore`
+
+Run with `uv run python benchmarks/bench_store.py`
+"""
+
+import os
+import random
+import tempfile
+import time
+
+from aloe.document import AloeDocument
+from aloe.store import AloeStore
+from common import generate_text, identifier
+
+FILES = 2000
+LOOKUPS = 20_000
+# Most lookups go to a small, changing subset of the files
+HOT = 100
+
+
+def main():
+    random.seed(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        text = generate_text(5, 10)
+
+        for i in range(FILES):
+            filename = os.path.join(directory, identifier("t_", i) + ".aloe")
+            with open(filename, "w") as f:
+                f.write(text)
+
+        tenants = [identifier("t_", random.randrange(FILES)) for _ in range(HOT)]
+        paths = [
+            random.choice(tenants) + ".section_b.nested.key_c" for _ in range(LOOKUPS)
+        ]
+
+        start = time.perf_counter()
+        for path in paths[:1000]:
+            tenant, key = path.split(".", 1)
+            AloeDocument.from_file(os.path.join(directory, tenant + ".aloe")).get(key)
+        parse_time = (time.perf_counter() - start) / 1000
+
+        print(
+            f"{FILES} files, {HOT} hot:"
+            f" from_file per lookup {parse_time * 1e6:.1f} us"
+        )
+
+        for limit in (HOT // 2, HOT * 2):
+            store = AloeStore(directory, max_documents=limit)
+            start = time.perf_counter()
+            for path in paths:
+                store.get(path)
+            store_time = (time.perf_counter() - start) / LOOKUPS
+
+            print(
+                f"  LRU of {limit:3}: {store_time * 1e6:6.1f} us per lookup,"
+                f" hits {store.hits}, misses {store.misses},"
+                f" evictions {store.evictions}"
+            )
+
+if __name__ == "__main__":
+    main()
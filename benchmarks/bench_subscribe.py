@@ -0,0 +1,71 @@
+"""Compare `AloeDocument.subscribe` with checking every subscriber on a change
+
+Run with `uv run python benchmarks/bench_subscribe.py`
+"""
+
+import time
+
+from aloe.document import AloeDocument
+from common import generate_paths, generate_text, identifier
+
+SECTIONS = 2000
+KEYS = 10
+SETS = 5000
+
+
+class Naive:
+    """A listener checking the prefix of every subscriber"""
+
+    def __init__(self, doc: AloeDocument, prefixes: list[str]):
+        self.prefixes = [(prefix, prefix + ".") for prefix in prefixes]
+        self.calls = 0
+        doc._add_listener(self.changed)
+
+    def changed(self, doc, paths):
+        for prefix, dotted in self.prefixes:
+            if any(path == prefix or path.startswith(dotted) for path in paths):
+                self.calls += 1
+
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    text = generate_text(SECTIONS, KEYS)
+    paths = generate_paths(SECTIONS, KEYS)[:SETS]
+    prefixes = [identifier("section_", s) + ".nested" for s in range(SECTIONS)]
+
+    def run(doc):
+        for i, path in enumerate(paths):
+            doc.set(path, i)
+
+    doc = AloeDocument.from_text(text)
+    len(doc)
+    baseline = timed(lambda: run(doc))
+
+    doc = AloeDocument.from_text(text)
+    len(doc)
+    calls = []
+    for prefix in prefixes:
+        doc.subscribe(prefix, calls.append)
+    trie_time = timed(lambda: run(doc))
+
+    doc = AloeDocument.from_text(text)
+    len(doc)
+    naive = Naive(doc, prefixes)
+    naive_time = timed(lambda: run(doc))
+
+    assert len(calls) == naive.calls == SETS
+
+    print(
+        f"{SETS} sets, {SECTIONS} subscriptions:"
+        f" no subscriptions {baseline * 1e3:7.2f} ms,"
+        f" trie {trie_time * 1e3:7.2f} ms, every subscriber {naive_time * 1e3:7.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
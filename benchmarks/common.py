@@ -0,0 +1,45 @@
+"""Helpers shared by the benchmarks"""
+
+
+def identifier(prefix: str, n: int) -> str:
+    """Identifiers can't contain digits, spell `n` with letters"""
+    letters = ""
+
+    while True:
+        n, r = divmod(n, 26)
+        letters = chr(ord("a") + r) + letters
+        if n == 0:
+            return prefix + letters
+
+
+def generate_text(sections: int, keys: int, nested: bool = True) -> str:
+    """
+    `sections` top level sections, each with `keys` keys
+
+    With `nested` the keys live in a `nested` sub section
+    """
+    lines = []
+    indent = " " * 8 if nested else " " * 4
+
+    for s in range(sections):
+        lines.append(f"@{identifier('section_', s)} {{")
+        if nested:
+            lines.append("    @nested {")
+        for k in range(keys):
+            lines.append(f'{indent}{identifier("key_", k)} = "value {k}"')
+        if nested:
+            lines.append("    }")
+        lines.append("}")
+
+    return "\n".join(lines) + "\n"
+
+
+def generate_paths(sections: int, keys: int, nested: bool = True) -> list[str]:
+    """Every key path of `generate_text(sections, keys, nested)`"""
+    middle = ".nested." if nested else "."
+
+    return [
+        identifier("section_", s) + middle + identifier("key_", k)
+        for s in range(sections)
+        for k in range(keys)
+    ]
@@ -14,3 +14,7 @@ cfg.set("default_username", "admin")
 cfg.save()
 ```
 """
+
+from .diff import diff, Change, ChangeType
+
+__all__ = ["diff", "Change", "ChangeType"]
@@ -1,20 +1,28 @@
 """Concrete syntax trees"""
 
 import aloe.symbols as symbols
+import operator
 import sys
 
+from bisect import bisect_left
 from typing import SupportsIndex
 from dataclasses import dataclass, field
-from collections.abc import Iterable
-from typing import Self
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any, Self
 from io import StringIO
 
+from aloe.path import parse_path
+
 EOL = symbols.NEWLINE
 DEFAULT_INDENT_STEP = 4
 
-type AST_ItemType = SectionNode | AssignmentNode | CommentNode | BlankLineNode
+type AST_ItemType = (
+    SectionNode | AssignmentNode | CommentNode | BlankLineNode | IncludeNode
+)
 type ArrayItemType = Value | CommentNode
 type AssignmentValueType = str | int | float | bool | Array | _NullType
+type Position = tuple[int, int]
+type KeyTuple = tuple[str, ...]
 
 
 @dataclass
@@ -34,6 +42,26 @@ class Value:
 @dataclass
 class Array:
     _items: list[ArrayItemType] = field(default_factory=list)
+    # Position in `_items` of every `Value`, comments are skipped
+    _positions: list[int] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        self._reindex()
+
+    def _reindex(self, start: int = 0) -> None:
+        """Rebuild the value positions of `_items[start:]`"""
+        first = bisect_left(self._positions, start)
+        del self._positions[first:]
+
+        for index in range(start, len(self._items)):
+            if isinstance(self._items[index], Value):
+                self._positions.append(index)
+
+    def _normalize_index(self, index: SupportsIndex) -> int:
+        index = operator.index(index)
+        return index + len(self._items) if index < 0 else index
 
     @classmethod
     def from_iter(cls, iter: Iterable[ArrayItemType | AssignmentValueType], /) -> Self:
@@ -51,11 +79,34 @@ class Array:
     def __iter__(self):
         return (i.value for i in self._items if isinstance(i, Value))
 
+    def __len__(self) -> int:
+        """Number of values, comments are not counted"""
+        return len(self._positions)
+
+    def __getitem__(self, index: SupportsIndex, /) -> AssignmentValueType:
+        """Return the value at `index`, comments are skipped"""
+        item = self._items[self._positions[index]]
+        assert isinstance(item, Value)
+        return item.value
+
+    def __setitem__(self, index: SupportsIndex, value: AssignmentValueType, /) -> None:
+        """Replace the value at `index` in place"""
+        item = self._items[self._positions[index]]
+        assert isinstance(item, Value)
+        item.value = value
+
+    def __delitem__(self, index: SupportsIndex, /) -> None:
+        """Remove the value at `index`, comments are kept"""
+        position = self._positions[index]
+        del self._items[position]
+        self._reindex(position)
+
     @property
     def values(self) -> list:
         return [i.value for i in self._items if isinstance(i, Value)]
 
     def append(self, value: AssignmentValueType, /) -> None:
+        self._positions.append(len(self._items))
         self._items.append(Value(value))
 
     def append_comment(self, text: str, /) -> None:
@@ -65,7 +116,10 @@ class Array:
         return [item for item in self._items if isinstance(item, Value)]
 
     def pop(self, index: SupportsIndex = -1, /) -> ArrayItemType:
-        return self._items.pop(index)
+        position = self._normalize_index(index)
+        item = self._items.pop(index)
+        self._reindex(position)
+        return item
 
     def index(
         self,
@@ -80,10 +134,14 @@ class Array:
         return self._items.count(value)
 
     def insert(self, index: SupportsIndex, object: ArrayItemType, /) -> None:
+        position = min(max(self._normalize_index(index), 0), len(self._items))
         self._items.insert(index, object)
+        self._reindex(position)
 
     def remove(self, value: ArrayItemType, /) -> None:
-        self._items.remove(value)
+        position = self._items.index(value)
+        del self._items[position]
+        self._reindex(position)
 
 
 @dataclass
@@ -95,6 +153,8 @@ class CommentNode:
 class AssignmentNode:
     key: str
     value: AssignmentValueType
+    # (line, column) of the key in the source, `None` for nodes built in code
+    position: Position | None = field(default=None, compare=False, repr=False)
 
 
 @dataclass
@@ -102,11 +162,82 @@ class BlankLineNode:
     pass
 
 
+@dataclass
+class IncludeNode:
+    """`@include "path"`, followed by the nodes of the file once loaded"""
+
+    path: str
+    position: Position | None = field(default=None, compare=False, repr=False)
+    # Number of nodes of the file that follow it in the scope once resolved,
+    # and the compiled file they were decoded from
+    count: int = field(default=0, compare=False, repr=False)
+    payload: bytes | None = field(default=None, compare=False, repr=False)
+
+
 @dataclass
 class SectionNode:
     name: str
     inline_lbrace: bool = True
     body: list[AST_ItemType] = field(default_factory=list)
+    # (line, column) of the section prefix in the source
+    position: Position | None = field(default=None, compare=False, repr=False)
+
+
+def scope_tables(
+    scope: list[AST_ItemType],
+) -> tuple[dict[str, AssignmentNode], dict[str, SectionNode]]:
+    """First assignment and first section of every name in `scope`"""
+    assignments: dict[str, AssignmentNode] = {}
+    sections: dict[str, SectionNode] = {}
+
+    for node in scope:
+        match node:
+            case AssignmentNode():
+                assignments.setdefault(node.key, node)
+            case SectionNode():
+                sections.setdefault(node.name, node)
+
+    return assignments, sections
+
+
+def select_element(
+    value: AssignmentValueType, indices: tuple[int, ...]
+) -> AssignmentValueType | None:
+    """Follow `indices` into nested arrays, `None` if an element is missing"""
+    for i in indices:
+        if not isinstance(value, Array):
+            return None
+        try:
+            value = value[i]
+        except IndexError:
+            return None
+
+    return value
+
+
+def same(a: object, b: object) -> bool:
+    """Structural equality where the types have to match, `1 == True == 1.0`"""
+    if type(a) is not type(b):
+        return False
+
+    match a, b:
+        case Array(), Array():
+            return len(a._items) == len(b._items) and all(
+                map(same, a._items, b._items)
+            )
+        case Value(), Value():
+            return same(a.value, b.value)
+        case AssignmentNode(), AssignmentNode():
+            return a.key == b.key and same(a.value, b.value)
+        case SectionNode(), SectionNode():
+            return (
+                a.name == b.name
+                and a.inline_lbrace == b.inline_lbrace
+                and len(a.body) == len(b.body)
+                and all(map(same, a.body, b.body))
+            )
+        case _:
+            return a == b
 
 
 @dataclass
@@ -120,6 +251,127 @@ class Document:
 
         return text
 
+    def to_dict(
+        self, null: Any = None, arrays: bool = True, comments: str | None = None
+    ) -> dict[str, Any]:
+        """
+        Plain dict of the document in one traversal, sections are nested dicts
+
+        `Null` values become `null`. With `arrays` arrays become lists,
+        otherwise the `Array` nodes are returned as they are, with their
+        comments. With `comments` the comments of every section are listed
+        under that key, otherwise they are dropped
+
+        Like `AloeDocument.get`, only the first key or section with a given
+        name is included, and a key wins over a section of the same name
+        """
+        return _scope_to_dict(self._items, null, arrays, comments)
+
+    def walk(
+        self,
+        prefix: str | None = None,
+        skip: Callable[[KeyTuple, "SectionNode"], bool] | None = None,
+    ) -> Iterator[tuple[KeyTuple, AssignmentValueType, AssignmentNode]]:
+        """
+        Yield `(path, value, node)` for every key, depth-first in document order
+
+        `path` is a tuple of names, the tuple of a section is shared by the
+        paths of its keys. Like `AloeDocument.get`, only the first key or
+        section with a given name is visited
+
+        With `prefix` (a dotted section path) only the keys under that
+        section are visited, sections for which `skip(path, section)` is true
+        are not entered. Only the sections being walked are kept in memory
+
+        Example:
+            ```python
+            def internal(path, section):
+                return section.name == "internal"
+
+            for path, value, _ in document.walk("services", skip=internal):
+                print("_".join(path).upper(), value)
+            ```
+        """
+        scope = self._items
+        path: KeyTuple = ()
+
+        if prefix is not None:
+            for name in parse_path(prefix)[0]:
+                _, sections = scope_tables(scope)
+                section = sections.get(name)
+
+                if section is None:
+                    return
+
+                scope = section.body
+                path += (name,)
+
+        # One frame per open section: its remaining nodes, its path and the
+        # names already visited in it
+        stack = [(iter(scope), path, set(), set())]
+
+        while stack:
+            nodes, path, keys, sections = stack[-1]
+
+            for node in nodes:
+                match node:
+                    case AssignmentNode() if node.key not in keys:
+                        keys.add(node.key)
+                        yield path + (node.key,), node.value, node
+                    case SectionNode() if node.name not in sections:
+                        sections.add(node.name)
+                        child = path + (node.name,)
+
+                        if skip is None or not skip(child, node):
+                            stack.append((iter(node.body), child, set(), set()))
+                            break
+            else:
+                stack.pop()
+
+
+def _scope_to_dict(
+    scope: list[AST_ItemType], null: Any, arrays: bool, comments: str | None
+) -> dict[str, Any]:
+    out: dict[str, Any] = {}
+    keys: set[str] = set()
+    sections: set[str] = set()
+
+    for node in scope:
+        match node:
+            case AssignmentNode() if node.key not in keys:
+                keys.add(node.key)
+                value = node.value
+
+                if value is Null:
+                    value = null
+                elif arrays and isinstance(value, Array):
+                    value = _array_to_list(value, null)
+
+                out[node.key] = value
+            case SectionNode() if node.name not in sections:
+                sections.add(node.name)
+
+                if node.name not in keys:
+                    out[node.name] = _scope_to_dict(node.body, null, arrays, comments)
+            case CommentNode() if comments is not None:
+                out.setdefault(comments, []).append(node.text)
+
+    return out
+
+
+def _array_to_list(array: Array, null: Any) -> list:
+    values = []
+
+    for value in array:
+        if value is Null:
+            value = null
+        elif isinstance(value, Array):
+            value = _array_to_list(value, null)
+
+        values.append(value)
+
+    return values
+
 
 @dataclass
 class DocumentSerializer:
@@ -163,15 +415,17 @@ class DocumentSerializer:
         indentation = " " * indent_by
         indentation_body = " " * indent_by_body
 
+        items = arr._items
+
         if self.compact:
             expanded = False
-            arr._items = [item for item in arr._items if isinstance(item, Value)]
+            items = arr.strip_comments()
 
         self.out.write(symbols.LBRACKET)
         if expanded:
             self.out.write(EOL)
 
-        for index, item in enumerate(arr._items):
+        for index, item in enumerate(items):
             match item:
                 case CommentNode():
                     self._helper_serialize_comment(item, indent_by_body)
@@ -181,7 +435,7 @@ class DocumentSerializer:
                         self.out.write(indentation_body)
                     self._helper_serialize_value(value, indent_by_body)
 
-            if index != len(arr._items) - 1 and not isinstance(item, CommentNode):
+            if index != len(items) - 1 and not isinstance(item, CommentNode):
                 self.out.write(symbols.COMMA)
                 if expanded:
                     self.out.write(EOL)
@@ -212,6 +466,12 @@ class DocumentSerializer:
         self.out.write(f"{symbols.COMMENT} {node.text}")
         self.out.write(EOL)
 
+    def _helper_serialize_include(self, node: IncludeNode, indent_by: int = 0) -> None:
+        self.out.write(" " * indent_by)
+        self.out.write(f"{symbols.SECTION_PREFIX}{symbols.INCLUDE} ")
+        self.out.write(self._helper_serialize_string(node.path))
+        self.out.write(EOL)
+
     def _helper_serialize_blank_line(self) -> None:
         if not self.compact:
             self.out.write(EOL)
@@ -244,7 +504,9 @@ class DocumentSerializer:
     def _helper_serialize_items(
         self, items: list[AST_ItemType], indent_by: int = 0
     ) -> None:
-        for item in items:
+        remaining = iter(items)
+
+        for item in remaining:
             match item:
                 case SectionNode():
                     self._helper_serialize_section(item, indent_by)
@@ -254,6 +516,12 @@ class DocumentSerializer:
                     self._helper_serialize_blank_line()
                 case AssignmentNode():
                     self._helper_serialize_assignment(item, indent_by)
+                case IncludeNode():
+                    self._helper_serialize_include(item, indent_by)
+
+                    # The nodes of the file are written as the directive
+                    for _ in range(item.count):
+                        next(remaining, None)
 
     def serialize(self) -> str:
         self._helper_serialize_items(self.root, 0)
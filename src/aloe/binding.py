@@ -0,0 +1,194 @@
+"""Binding of documents to dataclasses
+
+Sections map to dataclasses and keys to their fields, by name. The fields
+are read from the type hints once per class into a plan of converters, so
+binding is a single walk of the bound sections without any path parsing
+"""
+
+import dataclasses
+import types
+import typing
+
+from collections.abc import Callable
+from functools import cache
+from typing import Any
+
+from .ast import AST_ItemType, Array, AssignmentValueType, Null, scope_tables
+from .path import PATH_SEPARATOR
+
+# Converts the value of a key (or the body of a section) found at a path
+type _Converter = Callable[[Any, str], Any]
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class _Field:
+    name: str
+    convert: _Converter
+    # Dataclasses are bound from sections, everything else from keys
+    section: bool
+    required: bool
+
+
+def bind[T](cls: type[T], scope: list[AST_ItemType], prefix: str = "") -> T:
+    """
+    Build an instance of the dataclass `cls` from the section body `scope`
+
+    A missing key without a default raises a `KeyError`, a value that
+    doesn't match the field type raises a `ValueError`. Both name the dotted
+    path of the offending key, `prefix` is the path of `scope`
+    """
+    # Type checkers don't see `type[T]` as hashable for the cache, `type` is
+    klass: type = cls
+    return _build(klass, _plan(klass), scope, prefix)
+
+
+def _build(
+    cls: type, plan: tuple[_Field, ...], scope: list[AST_ItemType], prefix: str
+) -> Any:
+    assignments, sections = scope_tables(scope)
+    kwargs = {}
+
+    for field in plan:
+        path = prefix + field.name
+
+        if field.section:
+            section = sections.get(field.name)
+            if section is not None:
+                body = section.body
+                kwargs[field.name] = field.convert(body, path + PATH_SEPARATOR)
+                continue
+        else:
+            assignment = assignments.get(field.name)
+            if assignment is not None:
+                kwargs[field.name] = field.convert(assignment.value, path)
+                continue
+
+        if field.required:
+            raise KeyError(path)
+
+    return cls(**kwargs)
+
+
+@cache
+def _plan(cls: type) -> tuple[_Field, ...]:
+    """Fields of `cls` with their converters, computed once per class"""
+    if not dataclasses.is_dataclass(cls):
+        raise ValueError(f"{cls.__qualname__} is not a dataclass")
+
+    hints = typing.get_type_hints(cls)
+    plan = []
+
+    for field in dataclasses.fields(cls):
+        if not field.init:
+            continue
+
+        hint = hints[field.name]
+        required = (
+            field.default is dataclasses.MISSING
+            and field.default_factory is dataclasses.MISSING
+        )
+
+        section = _section_type(hint)
+
+        if section is not None:
+            plan.append(
+                _Field(field.name, _section_converter(section), True, required)
+            )
+        else:
+            plan.append(_Field(field.name, _converter(hint), False, required))
+
+    return tuple(plan)
+
+
+def _section_type(hint: Any) -> type | None:
+    """Dataclass bound from a section, for `T` and `T | None` hints"""
+    if isinstance(hint, type) and dataclasses.is_dataclass(hint):
+        return hint
+
+    if typing.get_origin(hint) in (typing.Union, types.UnionType):
+        args = typing.get_args(hint)
+        others = [arg for arg in args if arg is not types.NoneType]
+
+        if len(others) == 1 and len(others) != len(args):
+            return _section_type(others[0])
+
+    return None
+
+
+def _section_converter(cls: type) -> _Converter:
+    def convert(body: list[AST_ItemType], prefix: str) -> Any:
+        # Planned on first use, so classes can refer to themselves
+        return _build(cls, _plan(cls), body, prefix)
+
+    return convert
+
+
+def _converter(hint: Any) -> _Converter:
+    if hint is Any:
+        return lambda value, path: value
+
+    origin = typing.get_origin(hint)
+    args = typing.get_args(hint)
+
+    if origin is typing.Union or origin is types.UnionType:
+        return _optional_converter(hint, args)
+
+    if origin is list or (origin is tuple and len(args) == 2 and args[1] is ...):
+        return _array_converter(origin, _converter(args[0]) if args else None)
+
+    if hint is list or hint is tuple:
+        return _array_converter(hint, None)
+
+    if hint in (str, int, float, bool):
+        return _scalar_converter(hint)
+
+    raise ValueError(f"Unsupported field type {hint!r}")
+
+
+def _optional_converter(hint: Any, args: tuple) -> _Converter:
+    others = tuple(arg for arg in args if arg is not types.NoneType)
+
+    if len(others) != 1 or len(others) == len(args):
+        raise ValueError(f"Unsupported field type {hint!r}, only `T | None` is")
+
+    convert = _converter(others[0])
+
+    return lambda value, path: None if value is Null else convert(value, path)
+
+
+def _array_converter(origin: type, convert: _Converter | None) -> _Converter:
+    def convert_array(value: AssignmentValueType, path: str) -> Any:
+        if not isinstance(value, Array):
+            raise _mismatch(value, path, "array")
+        if convert is None:
+            return origin(value)
+
+        return origin(
+            convert(element, f"{path}[{i}]") for i, element in enumerate(value)
+        )
+
+    return convert_array
+
+
+def _scalar_converter(expected: type) -> _Converter:
+    def convert(value: AssignmentValueType, path: str) -> Any:
+        # `type() is` rejects `True` for an int field
+        if type(value) is expected:
+            return value
+        if expected is float and type(value) is int:
+            return float(value)
+
+        raise _mismatch(value, path, expected.__name__)
+
+    return convert
+
+
+def _mismatch(value: AssignmentValueType, path: str, expected: str) -> ValueError:
+    if value is Null:
+        found = "null"
+    elif isinstance(value, Array):
+        found = "array"
+    else:
+        found = type(value).__name__
+
+    return ValueError(f"{path!r}: expected {expected}, got {found}")
@@ -0,0 +1,196 @@
+"""Compiled cache of parsed documents
+
+Like `.pyc` files, `example.aloe` gets an `example.aloec` next to it that
+holds the parsed tree in a compact binary form, so loading an unchanged
+file skips lexing and parsing
+
+The cache is keyed by the source path, size, mtime and content hash: it is
+used directly when size and mtime match, and when only the mtime changed
+it is still used if the content hash matches
+"""
+
+import hashlib
+import marshal
+import os
+
+from .ast import (
+    AST_ItemType,
+    Array,
+    ArrayItemType,
+    AssignmentNode,
+    AssignmentValueType,
+    BlankLineNode,
+    CommentNode,
+    Document,
+    IncludeNode,
+    Null,
+    SectionNode,
+    Value,
+)
+from .files import write_atomic
+from .lexer import lex
+from .parser import parse
+
+CACHE_SUFFIX = "c"
+MAGIC = b"ALOEC"
+# Bumped whenever the encoding changes, older caches are regenerated
+FORMAT_VERSION = 3
+
+# Node tags of the encoded tree
+_ASSIGNMENT = 0
+_SECTION = 1
+_COMMENT = 2
+_BLANK_LINE = 3
+_INCLUDE = 4
+
+
+def cache_path(filename: str) -> str:
+    return filename + CACHE_SUFFIX
+
+
+def content_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+def encode(document: Document) -> bytes:
+    """Binary encoding of `document`"""
+    return marshal.dumps([_encode_node(node) for node in document._items])
+
+
+def decode(data: bytes) -> Document:
+    """Inverse of `encode`"""
+    return Document([_decode_node(node) for node in marshal.loads(data)])
+
+
+def load(filename: str) -> Document:
+    """
+    Parse `filename` through its compiled cache
+
+    The cache is (re)generated when it is missing or stale, failing to
+    write it is not an error
+    """
+    st = os.stat(filename)
+    path = os.path.abspath(filename)
+    header = _read_header(cache_path(filename))
+
+    if header is not None and header[0] != path:
+        header = None
+
+    if header is not None and header[1:3] == (st.st_size, st.st_mtime_ns):
+        return decode(header[4])
+
+    with open(filename, "r") as f:
+        text = f.read()
+
+    if header is not None and header[3] == content_hash(text):
+        payload = header[4]
+        document = decode(payload)
+    else:
+        document = parse(filename, text, lex(text))
+        payload = encode(document)
+
+    try:
+        write_atomic(
+            cache_path(filename),
+            marshal.dumps(
+                (
+                    MAGIC,
+                    FORMAT_VERSION,
+                    path,
+                    st.st_size,
+                    st.st_mtime_ns,
+                    content_hash(text),
+                    payload,
+                )
+            ),
+            durable=False,
+        )
+    except OSError:
+        pass
+
+    return document
+
+
+def _read_header(filename: str) -> tuple[str, int, int, bytes, bytes] | None:
+    try:
+        with open(filename, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    try:
+        magic, version, *header = marshal.loads(data)
+    except (EOFError, ValueError, TypeError):
+        return None
+
+    if magic != MAGIC or version != FORMAT_VERSION or len(header) != 5:
+        return None
+
+    path, size, mtime_ns, digest, payload = header
+
+    return path, size, mtime_ns, digest, payload
+
+
+def _encode_node(node: AST_ItemType) -> tuple:
+    match node:
+        case AssignmentNode():
+            return (_ASSIGNMENT, node.key, encode_value(node.value), node.position)
+        case SectionNode():
+            body = tuple(_encode_node(child) for child in node.body)
+            return (_SECTION, node.name, node.inline_lbrace, body, node.position)
+        case CommentNode():
+            return (_COMMENT, node.text)
+        case BlankLineNode():
+            return (_BLANK_LINE,)
+        case IncludeNode():
+            return (_INCLUDE, node.path, node.position)
+
+
+def encode_value(value: AssignmentValueType) -> object:
+    """Arrays become lists and `Null` becomes `None`, other values are kept"""
+    if isinstance(value, Array):
+        return [_encode_array_item(item) for item in value._items]
+    if value is Null:
+        return None
+
+    return value
+
+
+def _encode_array_item(item: ArrayItemType) -> object:
+    if isinstance(item, CommentNode):
+        return (_COMMENT, item.text)
+
+    return encode_value(item.value)
+
+
+def _decode_node(node: tuple) -> AST_ItemType:
+    tag = node[0]
+
+    if tag == _ASSIGNMENT:
+        return AssignmentNode(node[1], decode_value(node[2]), node[3])
+    if tag == _SECTION:
+        body = [_decode_node(child) for child in node[3]]
+        return SectionNode(node[1], node[2], body, node[4])
+    if tag == _COMMENT:
+        return CommentNode(node[1])
+    if tag == _INCLUDE:
+        return IncludeNode(node[1], node[2])
+
+    return BlankLineNode()
+
+
+def decode_value(value) -> AssignmentValueType:
+    """Inverse of `encode_value`"""
+    if value is None:
+        return Null
+    if isinstance(value, list):
+        return Array([_decode_array_item(item) for item in value])
+
+    return value
+
+
+def _decode_array_item(item: object) -> ArrayItemType:
+    if isinstance(item, tuple):
+        return CommentNode(item[1])
+
+    return Value(decode_value(item))
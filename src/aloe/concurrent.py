@@ -0,0 +1,249 @@
+"""Thread-safe documents
+
+Readers use the currently published document without taking any lock.
+Published documents are never mutated: writers serialize through a lock,
+copy the sections on the path they change (everything else is shared with
+the previous version) and atomically publish the new document
+"""
+
+import threading
+
+from collections.abc import Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from typing import Any, Self
+
+from .ast import (
+    AST_ItemType,
+    Array,
+    ArrayItemType,
+    AssignmentNode,
+    AssignmentValueType,
+    Document,
+    SectionNode,
+    Value,
+    DEFAULT_INDENT_STEP,
+)
+from .document import AloeDocument
+from .path import parse_path
+
+type KeyPaths = list[tuple[str, ...]]
+
+
+class ConcurrentAloeDocument:
+    """
+    `AloeDocument` that can be read and written from many threads
+
+    Reads are lock-free and always see a complete version of the document,
+    every write (or transaction) publishes a new version at once
+
+    Example:
+
+    ```python
+    from aloe.concurrent import ConcurrentAloeDocument
+
+    doc = ConcurrentAloeDocument.from_file("example.aloe")
+
+    # any thread
+    doc.get("network.port")
+
+    # any other thread
+    with doc.transaction() as tx:
+        tx.set("network.host", "0.0.0.0")
+        tx.set("network.port", 3000)
+    ```
+    """
+
+    def __init__(self, doc: AloeDocument):
+        self._lock = threading.Lock()
+        self._published = doc
+
+    @classmethod
+    def from_text(cls, text: str) -> Self:
+        return cls(AloeDocument.from_text(text))
+
+    @classmethod
+    def from_file(cls, filename: str) -> Self:
+        return cls(AloeDocument.from_file(filename))
+
+    @property
+    def snapshot(self) -> AloeDocument:
+        """
+        The current version of the document
+
+        .. note::
+            The snapshot is shared with other threads and must not be mutated
+        """
+        return self._published
+
+    @property
+    def filename(self) -> str | None:
+        return self._published.filename
+
+    def get(self, path: str) -> AssignmentValueType | None:
+        return self._published.get(path)
+
+    def get_many(self, paths: Iterable[str]) -> dict[str, AssignmentValueType | None]:
+        return self._published.get_many(paths)
+
+    def keys(self) -> Iterator[str]:
+        return iter(self._published.keys())
+
+    def items(self) -> Iterator[tuple[str, AssignmentValueType]]:
+        return self._published.items()
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._published
+
+    def __len__(self) -> int:
+        return len(self._published)
+
+    def save(
+        self,
+        filename: str | None = None,
+        compact: bool = False,
+        indent_level_step: int = DEFAULT_INDENT_STEP,
+        atomic: bool = False,
+    ) -> None:
+        self._published.save(filename, compact, indent_level_step, atomic)
+
+    def set(self, path: str, value: AssignmentValueType) -> None:
+        with self.transaction() as tx:
+            tx.set(path, value)
+
+    def update(self, values: Mapping[str, Any]) -> None:
+        with self.transaction() as tx:
+            tx.update(values)
+
+    def remove(self, path: str) -> None:
+        with self.transaction() as tx:
+            tx.remove(path)
+
+    def clear(self, path: str | None = None) -> None:
+        with self.transaction() as tx:
+            tx.clear(path)
+
+    @contextmanager
+    def transaction(self) -> Iterator["ConcurrentTransaction"]:
+        """
+        Batch mutations and publish them as one new version
+
+        Nothing is published if the block raises or a mutation fails
+        """
+        tx = ConcurrentTransaction()
+        yield tx
+
+        with self._lock:
+            doc = _fork(self._published, tx._paths)
+
+            for operation, args in tx._operations:
+                getattr(doc, operation)(*args)
+
+            self._published = doc
+
+
+class ConcurrentTransaction:
+    """Mutations buffered by `ConcurrentAloeDocument.transaction`"""
+
+    def __init__(self):
+        self._operations: list[tuple[str, tuple]] = []
+        # Key paths touched by the operations, copied before they are applied
+        self._paths: KeyPaths = []
+
+    def set(self, path: str, value: AssignmentValueType) -> None:
+        self._paths.append(parse_path(path)[0])
+        self._operations.append(("set", (path, value)))
+
+    def update(self, values: Mapping[str, Any]) -> None:
+        self._paths.extend(_mapping_paths(values))
+        self._operations.append(("update", (values,)))
+
+    def remove(self, path: str) -> None:
+        self._paths.append(parse_path(path)[0])
+        self._operations.append(("remove", (path,)))
+
+    def clear(self, path: str | None = None) -> None:
+        self._paths.append(() if path is None else parse_path(path)[0])
+        self._operations.append(("clear", (path,)))
+
+
+def _mapping_paths(
+    values: Mapping[str, Any], prefix: tuple[str, ...] = ()
+) -> Iterator[tuple[str, ...]]:
+    for path, value in values.items():
+        keys = prefix + parse_path(path)[0]
+
+        if isinstance(value, Mapping):
+            yield keys
+            yield from _mapping_paths(value, keys)
+        else:
+            yield keys
+
+
+def _fork(doc: AloeDocument, paths: KeyPaths) -> AloeDocument:
+    """
+    Copy of `doc` that can be mutated along `paths` without touching `doc`
+
+    Only the sections and the assignment named by each path are copied,
+    the rest of the tree is shared
+    """
+    root = list(doc.document._items)
+    # Nodes created by this fork, they are already private copies
+    copied: set[int] = set()
+
+    for keys in paths:
+        scope = root
+
+        for depth, key in enumerate(keys):
+            if depth == len(keys) - 1:
+                _copy_assignment(scope, key, copied)
+
+            section = _copy_section(scope, key, copied)
+
+            if section is None:
+                break
+
+            scope = section.body
+
+    return AloeDocument(Document(root), doc.filename)
+
+
+def _copy_section(
+    scope: list[AST_ItemType], name: str, copied: set[int]
+) -> SectionNode | None:
+    for index, node in enumerate(scope):
+        if isinstance(node, SectionNode) and node.name == name:
+            if id(node) not in copied:
+                node = SectionNode(
+                    node.name, node.inline_lbrace, list(node.body), node.position
+                )
+                scope[index] = node
+                copied.add(id(node))
+
+            return node
+
+    return None
+
+
+def _copy_assignment(scope: list[AST_ItemType], key: str, copied: set[int]) -> None:
+    for index, node in enumerate(scope):
+        if isinstance(node, AssignmentNode) and node.key == key:
+            if id(node) not in copied:
+                node = AssignmentNode(node.key, _copy_value(node.value), node.position)
+                scope[index] = node
+                copied.add(id(node))
+
+            return None
+
+
+def _copy_value(value: AssignmentValueType) -> AssignmentValueType:
+    if isinstance(value, Array):
+        return Array([_copy_item(item) for item in value._items])
+
+    return value
+
+
+def _copy_item(item: ArrayItemType) -> ArrayItemType:
+    if isinstance(item, Value):
+        return Value(_copy_value(item.value))
+
+    return item
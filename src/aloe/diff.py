@@ -0,0 +1,123 @@
+"""Structural diff between two documents"""
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+from enum import Enum, auto
+
+from .ast import (
+    AST_ItemType,
+    Array,
+    AssignmentValueType,
+    Document,
+    same,
+    scope_tables,
+)
+from .path import PATH_SEPARATOR
+
+
+class ChangeType(Enum):
+    ADDED = auto()
+    REMOVED = auto()
+    CHANGED = auto()
+
+
+@dataclass(frozen=True, slots=True)
+class Change:
+    type: ChangeType
+    path: str
+    # `None` for the side where the path doesn't exist
+    old: AssignmentValueType | None
+    new: AssignmentValueType | None
+
+
+def diff(old: Document, new: Document, elements: bool = True) -> Iterator[Change]:
+    """
+    Yield the keys that were added, removed or changed between `old` and `new`
+
+    Both documents are walked together, each section is matched by name
+    through a hash table so wide sections cost linear time, and subtrees
+    shared by both documents are skipped without being visited. Like
+    `AloeDocument.get`, only the first key or section with a given name is
+    compared. Formatting, comments and blank lines are ignored
+
+    With `elements` changes inside arrays are reported per element
+    (`dependencies[3]`), otherwise the whole key is reported as changed
+
+    Example:
+        ```python
+        for change in aloe.diff(old.document, new.document):
+            print(change.type.name, change.path)
+        ```
+    """
+    yield from _diff_scope(old._items, new._items, "", elements)
+
+
+def _diff_scope(
+    old: list[AST_ItemType], new: list[AST_ItemType], prefix: str, elements: bool
+) -> Iterator[Change]:
+    if old is new:
+        return
+
+    old_keys, old_sections = scope_tables(old)
+    new_keys, new_sections = scope_tables(new)
+
+    for key, node in old_keys.items():
+        path = prefix + key
+        other = new_keys.get(key)
+
+        if other is None:
+            yield Change(ChangeType.REMOVED, path, node.value, None)
+        elif other is not node:
+            yield from _diff_value(node.value, other.value, path, elements)
+
+    for key, node in new_keys.items():
+        if key not in old_keys:
+            yield Change(ChangeType.ADDED, prefix + key, None, node.value)
+
+    for name, section in old_sections.items():
+        path = prefix + name + PATH_SEPARATOR
+        other_section = new_sections.get(name)
+
+        if other_section is None:
+            yield from _all_keys(section.body, path, ChangeType.REMOVED)
+        elif other_section is not section:
+            yield from _diff_scope(section.body, other_section.body, path, elements)
+
+    for name, section in new_sections.items():
+        if name not in old_sections:
+            path = prefix + name + PATH_SEPARATOR
+            yield from _all_keys(section.body, path, ChangeType.ADDED)
+
+
+def _diff_value(
+    old: AssignmentValueType, new: AssignmentValueType, path: str, elements: bool
+) -> Iterator[Change]:
+    if not (elements and isinstance(old, Array) and isinstance(new, Array)):
+        if not same(old, new):
+            yield Change(ChangeType.CHANGED, path, old, new)
+        return
+
+    for index in range(max(len(old), len(new))):
+        element = f"{path}[{index}]"
+
+        if index >= len(new):
+            yield Change(ChangeType.REMOVED, element, old[index], None)
+        elif index >= len(old):
+            yield Change(ChangeType.ADDED, element, None, new[index])
+        else:
+            yield from _diff_value(old[index], new[index], element, elements)
+
+
+def _all_keys(
+    scope: list[AST_ItemType], prefix: str, type: ChangeType
+) -> Iterator[Change]:
+    keys, sections = scope_tables(scope)
+
+    for key, node in keys.items():
+        if type is ChangeType.ADDED:
+            yield Change(type, prefix + key, None, node.value)
+        else:
+            yield Change(type, prefix + key, node.value, None)
+
+    for name, section in sections.items():
+        yield from _all_keys(section.body, prefix + name + PATH_SEPARATOR, type)
@@ -1,16 +1,54 @@
 """high-level document class"""
 
 from .ast import (
+    AST_ItemType,
     Document,
+    Array,
     AssignmentNode,
+    CommentNode,
     SectionNode,
     Null,
+    Value,
     AssignmentValueType,
     DEFAULT_INDENT_STEP,
+    KeyTuple,
+    same,
+    scope_tables,
+    select_element,
 )
+from .diff import diff
+from .files import write_atomic
 from .lexer import lex
 from .parser import parse
-from typing import Self
+from .path import parse_path, PATH_SEPARATOR
+from .query import PathTrie
+from .subscriptions import Callback, Subscription, SubscriptionTrie
+from .symbols import LBRACKET
+from collections.abc import (
+    Callable,
+    Collection,
+    Iterable,
+    Iterator,
+    KeysView,
+    Mapping,
+)
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Self
+
+import aloe.binding
+import aloe.cache
+import aloe.include
+import asyncio
+import threading
+import weakref
+
+# Actions that revert a mutation, run in reverse order on rollback
+type _Undo = list[Callable[[], None]]
+# Called with the document and the paths that may have changed, see `_touch`
+type _Listener = Callable[["AloeDocument", Collection[str] | None], None]
 
 
 class AloeDocument:
@@ -40,30 +78,136 @@ class AloeDocument:
 
     def __init__(self, document: Document, filename: str | None = None):
         self.filename = filename
+        # Bumped by every mutation, used to validate cached lookups
+        self._generation = 0
+        # Called after every mutation, see `_add_listener`
+        self._listeners: list[weakref.WeakMethod] = []
+        # Dotted path -> assignment, built on first use by `_key_index`
+        self._index: dict[str, AssignmentNode] | None = None
+        # Built on first use by `query`, dropped by every mutation
+        self._trie: PathTrie | None = None
+        # See `subscribe`
+        self._subscriptions = SubscriptionTrie()
+        # Held by every mutation and by `save`, so a save from another
+        # thread never writes a half applied `update` or transaction
+        self._lock = threading.RLock()
         self.document = document
 
+    def __getstate__(self):
+        # Locks and weak references can't be pickled, see `aload`
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_listeners"] = []
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    @property
+    def document(self) -> Document:
+        return self._document
+
+    @document.setter
+    def document(self, document: Document) -> None:
+        with self._lock:
+            self._document = document
+            self._index = None
+            self._touch()
+
     @classmethod
     def from_text(cls, text: str) -> Self:
         tokens = lex(text)
         document = parse("text", text, tokens)
+        aloe.include.resolve(document, None, text)
         return cls(document)
 
     @classmethod
-    def from_file(cls, filename: str) -> Self:
+    def from_dict(cls, values: Mapping[str, Any], comments: str | None = None) -> Self:
+        """
+        Build a document from a plain mapping, the inverse of `Document.to_dict`
+
+        Nested mappings become sections, lists and tuples arrays and `None`
+        becomes `Null`. Keys are names, not dotted paths. With `comments`
+        the strings listed under that key become comments
+
+        The tree is built directly, without looking anything up
+
+        Example:
+            `from_dict({"name": "app", "database": {"port": 5432}})`
+        """
+        return cls(Document(_build_scope(values, comments)))
+
+    @classmethod
+    def from_file(cls, filename: str, cache: bool = False) -> Self:
+        """
+        Parse `filename`
+
+        With `cache` the parsed tree is stored in a compiled `.aloec` file
+        next to it, later loads of the unchanged file skip the parsing
+        """
+        if cache:
+            document = aloe.cache.load(filename)
+            aloe.include.resolve(document, filename)
+            return cls(document, filename)
+
         with open(filename, "r") as f:
             text = f.read()
 
             tokens = lex(text)
             document = parse(filename, text, tokens)
+            aloe.include.resolve(document, filename, text)
+
+            return cls(document, filename)
+
+    def reload(self) -> set[str]:
+        """
+        Parse `filename` again and replace the document
+
+        Sections that didn't change keep their nodes, the dotted paths of
+        keys that were added, removed or changed are returned
+
+        .. note::
+            If the parsing fails a `ParserSyntaxError` error is raised and
+            the document is left untouched
+        """
+        if self.filename is None:
+            raise ValueError("No filename: the document wasn't loaded from a file")
+
+        with open(self.filename, "r") as f:
+            text = f.read()
 
-            return cls(document)
+        document = parse(self.filename, text, lex(text))
+        aloe.include.resolve(document, self.filename, text)
+
+        with self._lock:
+            replaced: list[str] = []
+            _reuse_unchanged(self.document._items, document._items, "", replaced)
+            changed = {
+                change.path
+                for change in diff(self.document, document, elements=False)
+            }
+            self._document = document
+            self._index = None
+            self._touch(changed.union(replaced))
+
+        return changed
 
     def save(
         self,
         filename: str | None = None,
         compact: bool = False,
         indent_level_step: int = DEFAULT_INDENT_STEP,
+        atomic: bool = False,
     ) -> None:
+        """
+        Write the document to `filename`, or to the file it was loaded from
+
+        With `atomic` the text goes to a temporary file that is fsync'ed and
+        renamed over the target, a crash never leaves a truncated file.
+        Includes are written back as directives, a `ValueError` is raised if
+        the nodes they brought were changed
+        """
         path = filename if filename else self.filename
 
         if path is None:
@@ -71,120 +215,1158 @@ class AloeDocument:
                 "No filename provided: pass a filename or set self.filename by calling Cfg.from_file()"
             )
 
-        with open(path, "w") as f:
-            f.write(
-                self.document.to_text(
-                    compact=compact, indent_level_step=indent_level_step
-                )
+        with self._lock:
+            aloe.include.check_unchanged(self.document._items)
+            text = self.document.to_text(
+                compact=compact, indent_level_step=indent_level_step
             )
 
+        if atomic:
+            write_atomic(path, text)
+            return None
+
+        with open(path, "w") as f:
+            f.write(text)
+
+    @classmethod
+    async def aload(cls, filename: str, executor: Executor | None = None) -> Self:
+        """
+        `from_file` without blocking the event loop
+
+        Reading and parsing run in `executor`, the loop's default executor
+        if `None`. Pass a `ProcessPoolExecutor` to keep the parsing from
+        competing with the loop for the GIL
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, cls.from_file, filename)
+
+    @classmethod
+    async def aload_many(
+        cls,
+        filenames: Iterable[str],
+        limit: int = 8,
+        executor: Executor | None = None,
+    ) -> list[Self]:
+        """`aload` every file, at most `limit` at a time, in the given order"""
+        semaphore = asyncio.Semaphore(limit)
+
+        async def load(filename: str) -> Self:
+            async with semaphore:
+                return await cls.aload(filename, executor)
+
+        return await asyncio.gather(*(load(filename) for filename in filenames))
+
+    async def asave(
+        self,
+        filename: str | None = None,
+        compact: bool = False,
+        indent_level_step: int = DEFAULT_INDENT_STEP,
+        atomic: bool = False,
+        executor: Executor | None = None,
+    ) -> None:
+        """
+        `save` without blocking the event loop
+
+        .. note::
+            The document is serialized in `executor`, don't mutate it until
+            `asave` returns
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            executor, partial(self.save, filename, compact, indent_level_step, atomic)
+        )
+
+    def _touch(self, paths: Collection[str] | None = None) -> None:
+        """
+        Record a mutation: bump the generation and notify the listeners
+
+        `paths` are the dotted paths of the keys and sections that may have
+        changed (a section covers everything under it), `None` if anything
+        may have changed
+        """
+        self._generation += 1
+        self._trie = None
+
+        if self._listeners:
+            alive = []
+
+            for ref in self._listeners:
+                listener = ref()
+
+                if listener is not None:
+                    alive.append(ref)
+                    listener(self, paths)
+
+            self._listeners = alive
+
+        # After the listeners, the caches they keep are up to date
+        if self._subscriptions:
+            self._subscriptions.notify(paths)
+
+    def subscribe(self, prefix: str, callback: Callback) -> Subscription:
+        """
+        Call `callback(paths)` when something under `prefix` changes
+
+        `paths` are the dotted paths of the changed keys and sections under
+        `prefix`, or `prefix` itself when a section above it was removed or
+        cleared or the whole document may have changed. Bulk mutations,
+        `update` and transactions, call `callback` once with every path
+
+        Subscriptions are kept in a trie, a mutation only visits the
+        subscriptions on its path and below it
+
+        Example:
+            ```python
+            def reconfigure(paths):
+                pool.resize(doc.get("database.pool.size"))
+
+            subscription = doc.subscribe("database.pool", reconfigure)
+            ...
+            subscription.cancel()
+            ```
+        """
+        return self._subscriptions.add(prefix, callback)
+
+    def _add_listener(self, listener: _Listener) -> None:
+        """
+        Call the bound method `listener(doc, paths)` after every mutation,
+        see `_touch`
+
+        Only a weak reference is kept, the listener doesn't keep its object alive
+        """
+        self._listeners.append(weakref.WeakMethod(listener))
+
+    def _remove_listener(self, listener: _Listener) -> None:
+        self._listeners = [ref for ref in self._listeners if ref() != listener]
+
+    def _key_index(self) -> dict[str, AssignmentNode]:
+        if self._index is None:
+            self._index = dict(_iter_assignments(self.document._items))
+
+        return self._index
+
+    def keys(self) -> KeysView[str]:
+        """Dotted paths of every key in the document"""
+        return self._key_index().keys()
+
+    def items(self) -> Iterator[tuple[str, AssignmentValueType]]:
+        """`(dotted path, value)` of every key in the document"""
+        return ((path, node.value) for path, node in self._key_index().items())
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._key_index()
+
+    def __len__(self) -> int:
+        return len(self._key_index())
+
+    def walk(
+        self,
+        prefix: str | None = None,
+        skip: Callable[[KeyTuple, SectionNode], bool] | None = None,
+    ) -> Iterator[tuple[KeyTuple, AssignmentValueType, AssignmentNode]]:
+        """
+        Yield `(path, value, node)` for every key, see `Document.walk`
+
+        Example:
+            ```python
+            for path, value, _ in doc.walk("database"):
+                os.environ["_".join(path).upper()] = str(value)
+            ```
+        """
+        return self.document.walk(prefix, skip)
+
+    def query(self, pattern: str) -> Iterator[tuple[str, AssignmentValueType]]:
+        """
+        Yield `(dotted path, value)` of every key matching `pattern`, lazily
+
+        `*` matches any key or section, `**` any number of sections and
+        other segments can be `fnmatch` patterns, see `aloe.query`. Keys
+        are yielded depth-first, the keys of a section before its sub
+        sections
+
+        Example:
+            `query("services.*.port")`
+            `port` of every section in `services`
+
+            `query("**.timeout")`
+            every `timeout` in the document
+
+            `query("database.**")`
+            every key under `database`
+        """
+        trie = self._path_trie()
+
+        return ((path, node.value) for path, node in trie.query(pattern))
+
+    def _path_trie(self) -> PathTrie:
+        if self._trie is None:
+            self._trie = PathTrie(self.document._items)
+
+        return self._trie
+
+    def _find_section_body(self, keys: tuple[str, ...]) -> list[AST_ItemType] | None:
+        """
+        Same as `_find_scope(keys)`, through the section tables of the trie
+
+        The tables are kept until the next mutation, so this is a dictionary
+        lookup per section instead of a scan of its siblings
+        """
+        trie = self._path_trie()
+
+        for key in keys:
+            child = trie.sections.get(key)
+
+            if child is None:
+                return None
+
+            trie = child
+
+        return trie.body
+
+    def compile_path(self, path: str) -> "CompiledPath":
+        """
+        Compile `path` into a reusable accessor
+
+        The resolved node is cached until the document is mutated, so
+        repeated lookups of the same path skip the tree walk
+
+        Example:
+            ```python
+            timeout = doc.compile_path("database.pool.timeout")
+
+            timeout.get()
+            timeout.set(60)
+            ```
+        """
+        return CompiledPath(self, path)
+
+    def section(self, path: str) -> "SectionView":
+        """
+        View of the section at `path`, with paths relative to it
+
+        Nothing is copied, the view reads the section body of this document
+        and writes go through to it
+
+        Raises:
+            KeyError: The section doesn't exist
+
+        Example:
+            ```python
+            database = doc.section("database")
+
+            database.get("pool.timeout")
+            database.set("host", "db")
+            ```
+        """
+        return SectionView(self, path)
+
+    def bind[T](self, cls: type[T], path: str | None = None) -> T:
+        """
+        Build an instance of the dataclass `cls` from the section at `path`,
+        or from the whole document
+
+        Fields are matched by name: dataclass fields (or `Dataclass | None`
+        ones) are bound to sections, other fields to keys and their values
+        are checked against the type hints. A missing key raises a
+        `KeyError` unless the field has a default, a value of the wrong type
+        raises a `ValueError`
+
+        The binding is a snapshot, mutating the document afterwards doesn't
+        change the instance
+
+        Example:
+            ```python
+            @dataclass(slots=True)
+            class Pool:
+                timeout: float
+                max_connections: int = 10
+
+            pool = doc.bind(Pool, "database.pool")
+            pool.timeout
+            ```
+        """
+        if path is None:
+            return aloe.binding.bind(cls, self.document._items)
+
+        scope = self._find_scope(parse_path(path)[0])
+        if scope is None:
+            raise KeyError(path)
+
+        return aloe.binding.bind(cls, scope, path + PATH_SEPARATOR)
+
+    def _find_scope(
+        self,
+        keys: tuple[str, ...],
+        create: bool = False,
+        undo: _Undo | None = None,
+        scope: list[AST_ItemType] | None = None,
+    ) -> list[AST_ItemType] | None:
+        """
+        Return the body of the section at `keys`, `None` if it doesn't exist
+
+        Missing sections are appended when `create` is true. `keys` are
+        relative to `scope`, the document itself by default
+        """
+        if scope is None:
+            scope = self.document._items
+
+        for key in keys:
+            section = _find_section(scope, key)
+
+            if section is None:
+                if not create:
+                    return None
+
+                section = SectionNode(name=key, body=[])
+                scope.append(section)
+
+                if undo is not None:
+                    undo.append(partial(_remove_node, scope, section))
+
+            scope = section.body
+
+        return scope
+
+    def _lookup(
+        self, keys: tuple[str, ...], indices: tuple[int, ...]
+    ) -> AssignmentValueType | None:
+        scope = self._find_scope(keys[:-1])
+        if scope is None:
+            return None
+
+        node = _find_assignment(scope, keys[-1])
+        if node is None:
+            return None
+
+        return select_element(node.value, indices)
+
+    def _find_array(
+        self, keys: tuple[str, ...], indices: tuple[int, ...]
+    ) -> Array | None:
+        """Return the array that holds the element at `indices`"""
+        value = self._lookup(keys, indices[:-1])
+        return value if isinstance(value, Array) else None
+
     def get(self, path: str) -> AssignmentValueType | None:
         """
         Retrieve the value associated with a key in the Document
 
-        The key can be nested within sections using dot notation
+        The key can be nested within sections using dot notation, and
+        array elements can be selected by index
 
         Example:
             `get("network.port")`
             `network` is the section, `port` is the key
+
+            `get("dependencies[0][2]")`
+            third element of the first element of `dependencies`
+        """
+        keys, indices = parse_path(path)
+
+        if self._index is not None:
+            node = self._index.get(path.partition(LBRACKET)[0] if indices else path)
+            return None if node is None else select_element(node.value, indices)
+
+        return self._lookup(keys, indices)
+
+    def get_many(self, paths: Iterable[str]) -> dict[str, AssignmentValueType | None]:
         """
-        path_parts = path.split(".")
+        Retrieve the values of several paths, `None` for missing ones
 
-        current_scope = self.document._items
+        Paths are grouped by section so every section on the way is scanned
+        once, instead of once per path
 
-        for index, part in enumerate(path_parts):
-            for node in current_scope:
-                is_last_part = index == len(path_parts) - 1
+        Example:
+            `get_many(["database.host", "database.port"])`
+            -> `{"database.host": "localhost", "database.port": 5432}`
+        """
+        results: dict[str, AssignmentValueType | None] = dict.fromkeys(paths)
+
+        if self._index is not None:
+            for path in results:
+                results[path] = self.get(path)
+            return results
+
+        group = _PathGroup()
+
+        for path in results:
+            keys, indices = parse_path(path)
+            group.add(keys, (path, indices))
+
+        _get_many(self.document._items, group, results)
 
-                match node:
-                    case AssignmentNode():
-                        if is_last_part and node.key == part:
-                            return node.value
-                    case SectionNode():
-                        if node.name == part:
-                            current_scope = node.body
+        return results
 
     def set(self, path: str, value: AssignmentValueType) -> None:
-        path_parts = path.split(".")
-
-        current_scope = self.document._items
-
-        for index, part in enumerate(path_parts):
-            is_last_part = index == len(path_parts) - 1
-            part_found_in_scope: bool = False
-
-            for node in current_scope:
-                match node:
-                    case AssignmentNode():
-                        if is_last_part and node.key == part:
-                            part_found_in_scope = True
-                            node.value = value
-                            return None
-                    case SectionNode():
-                        if node.name == part:
-                            part_found_in_scope = True
-                            current_scope = node.body
-
-            if not part_found_in_scope:
-                if is_last_part:
-                    assignment = AssignmentNode(key=part, value=value)
-                    current_scope.append(assignment)
-                else:
-                    section = SectionNode(name=part, body=[])
-                    current_scope.append(section)
+        """
+        Set the value of a key, missing sections and keys are created
+
+        Array elements are replaced in place, the element must exist
+
+        Raises:
+            KeyError: The path points into an array that doesn't exist
+            IndexError: The array index is out of range
+        """
+        with self._lock:
+            try:
+                self._set(path, value)
+            finally:
+                self._touch([path.partition(LBRACKET)[0]])
+
+    def _set(
+        self, path: str, value: AssignmentValueType, undo: _Undo | None = None
+    ) -> None:
+        keys, indices = parse_path(path)
+
+        if indices:
+            array = self._find_array(keys, indices)
+            if array is None:
+                raise KeyError(path)
+
+            if undo is not None:
+                undo.append(partial(array.__setitem__, indices[-1], array[indices[-1]]))
+
+            array[indices[-1]] = value
+            return None
+
+        scope = self._find_scope(keys[:-1], create=True, undo=undo)
+        assert scope is not None
+
+        self._assign(scope, keys[-1], value, PATH_SEPARATOR.join(keys), undo)
+
+    def _assign(
+        self,
+        scope: list[AST_ItemType],
+        key: str,
+        value: AssignmentValueType,
+        path: str,
+        undo: _Undo | None,
+        node: AssignmentNode | None = None,
+    ) -> AssignmentNode:
+        """Set `key` in `scope`, `node` is its assignment if already known"""
+        if node is None:
+            node = _find_assignment(scope, key)
+
+        if node is None:
+            node = AssignmentNode(key=key, value=value)
+            scope.append(node)
+
+            if self._index is not None:
+                self._index[path] = node
+
+            if undo is not None:
+                undo.append(partial(_remove_node, scope, node))
+        else:
+            if undo is not None:
+                undo.append(partial(setattr, node, "value", node.value))
+
+            node.value = value
+
+        return node
+
+    def update(self, values: Mapping[str, Any]) -> None:
+        """
+        Set several values at once, missing sections and keys are created
+
+        Keys are paths like in `set`, nested mappings are sections
+
+        Example:
+            `update({"database": {"host": "db", "pool.timeout": 30}})`
+            is the same as
+            `set("database.host", "db")` then `set("database.pool.timeout", 30)`
+
+        Raises:
+            KeyError: A path points into an array that doesn't exist
+            IndexError: An array index is out of range
+        """
+        group = _PathGroup()
+        group.add_mapping(values)
+
+        with self._lock:
+            try:
+                self._update(self.document._items, group, "")
+            finally:
+                self._touch(group.paths())
+
+    def _update(
+        self,
+        scope: list[AST_ItemType],
+        group: "_PathGroup",
+        prefix: str,
+        undo: _Undo | None = None,
+    ) -> None:
+        assignments, sections = scope_tables(scope)
+
+        for name, is_section in group.order:
+            if is_section:
+                section = sections.get(name)
+
+                if section is None:
+                    section = SectionNode(name=name, body=[])
+                    scope.append(section)
+
+                    if undo is not None:
+                        undo.append(partial(_remove_node, scope, section))
+
+                child = group.sections[name]
+                path = prefix + name + PATH_SEPARATOR
+                self._update(section.body, child, path, undo)
+                continue
 
-                    if isinstance(current_scope[-1], SectionNode):
-                        current_scope = current_scope[-1].body
+            node = assignments.get(name)
+
+            for indices, value in group.keys[name]:
+                if not indices:
+                    node = self._assign(scope, name, value, prefix + name, undo, node)
+                    continue
+
+                array = node and select_element(node.value, indices[:-1])
+                if not isinstance(array, Array):
+                    raise KeyError(prefix + name)
+
+                if undo is not None:
+                    old = array[indices[-1]]
+                    undo.append(partial(array.__setitem__, indices[-1], old))
+
+                array[indices[-1]] = value
 
     def remove(self, path: str) -> None:
-        path_parts = path.split(".")
+        """Remove a key, a section or an array element, missing paths are ignored"""
+        with self._lock:
+            try:
+                self._remove(path)
+            finally:
+                self._touch([path.partition(LBRACKET)[0]])
+
+    def _remove(self, path: str, undo: _Undo | None = None) -> None:
+        keys, indices = parse_path(path)
+
+        if indices:
+            array = self._find_array(keys, indices)
+            if array is None:
+                return None
 
-        current_scope = self.document._items
-        remove_target: int | None = None
+            try:
+                position = array._positions[indices[-1]]
+            except IndexError:
+                return None
 
-        for index, part in enumerate(path_parts):
-            is_last_part = index == len(path_parts) - 1
+            item = array.pop(position)
 
-            for node_index, node in enumerate(current_scope):
-                match node:
-                    case AssignmentNode():
-                        if is_last_part and node.key == part:
-                            remove_target = node_index
-                            break
-                    case SectionNode():
-                        if node.name == part and is_last_part:
-                            remove_target = node_index
-                            break
-                        elif node.name == part:
-                            current_scope = node.body
+            if undo is not None:
+                undo.append(partial(array.insert, position, item))
+            return None
+
+        scope = self._find_scope(keys[:-1])
+        if scope is None:
+            return None
+
+        index = _find_item(scope, keys[-1])
+        if index is None:
+            return None
+
+        node = scope.pop(index)
+        assert isinstance(node, AssignmentNode | SectionNode)
 
-            if remove_target is not None:
-                break
+        if undo is not None:
+            undo.append(partial(scope.insert, index, node))
 
-        if remove_target is not None:
-            del current_scope[remove_target]
+        if self._index is not None:
+            key = PATH_SEPARATOR.join(keys)
+            self._unindex(key, node)
+            self._reindex_shadowed(key, scope, node)
 
     def clear(self, path: str | None = None) -> None:
+        """
+        Clear the whole document, a section body, or set a key to `Null`
+
+        Missing paths are ignored
+        """
+        with self._lock:
+            try:
+                self._clear(path)
+            finally:
+                self._touch(None if path is None else [path.partition(LBRACKET)[0]])
+
+    def _clear(self, path: str | None, undo: _Undo | None = None) -> None:
         if path is None:
+            if undo is not None:
+                items = self.document._items
+                undo.append(partial(_restore, items, list(items)))
+
             self.document._items.clear()
+
+            if self._index is not None:
+                self._index.clear()
+            return None
+
+        keys, indices = parse_path(path)
+
+        if indices:
+            array = self._find_array(keys, indices)
+            if array is None:
+                return None
+
+            try:
+                old = array[indices[-1]]
+            except IndexError:
+                return None
+
+            if undo is not None:
+                undo.append(partial(array.__setitem__, indices[-1], old))
+
+            array[indices[-1]] = Null
+            return None
+
+        scope = self._find_scope(keys[:-1])
+        if scope is None:
+            return None
+
+        index = _find_item(scope, keys[-1])
+        if index is None:
+            return None
+
+        match scope[index]:
+            case AssignmentNode() as node:
+                if undo is not None:
+                    undo.append(partial(setattr, node, "value", node.value))
+
+                node.value = Null
+            case SectionNode() as node:
+                if undo is not None:
+                    undo.append(partial(_restore, node.body, list(node.body)))
+
+                if self._index is not None:
+                    self._unindex(PATH_SEPARATOR.join(keys), node)
+                node.body.clear()
+
+    @contextmanager
+    def transaction(self, save: bool = False) -> Iterator["Transaction"]:
+        """
+        Batch mutations and apply them together when the block exits
+
+        Nothing is applied if the block raises, and if applying one of the
+        mutations fails the ones before it are rolled back. With `save`
+        the document is saved once, atomically, after the commit
+
+        The commit is all or nothing but not isolated: it is applied node by
+        node, other mutations and saves wait for it but a `get` from another
+        thread can see it half applied. Readers that need to see whole
+        commits share a `ConcurrentAloeDocument` instead
+
+        Example:
+            ```python
+            with doc.transaction(save=True) as tx:
+                tx.set("database.host", "db")
+                tx.remove("database.password")
+            ```
+        """
+        tx = Transaction(self)
+        yield tx
+        tx.commit(save=save)
+
+    def _rollback(self, undo: _Undo) -> None:
+        for action in reversed(undo):
+            action()
+
+        self._index = None
+        self._touch()
+
+    def _unindex(self, path: str, node: AssignmentNode | SectionNode) -> None:
+        """Drop `node` and everything below it from the key index"""
+        assert self._index is not None
+
+        match node:
+            case AssignmentNode():
+                if self._index.get(path) is node:
+                    del self._index[path]
+            case SectionNode():
+                for key, child in _iter_assignments(node.body, path):
+                    if self._index.get(key) is child:
+                        del self._index[key]
+
+    def _reindex_shadowed(
+        self,
+        path: str,
+        scope: list[AST_ItemType],
+        removed: AssignmentNode | SectionNode,
+    ) -> None:
+        """Index a duplicate of `removed` that was hidden behind it"""
+        assert self._index is not None
+
+        match removed:
+            case AssignmentNode():
+                node = _find_assignment(scope, removed.key)
+                if node is not None:
+                    self._index.setdefault(path, node)
+            case SectionNode():
+                section = _find_section(scope, removed.name)
+                if section is not None:
+                    for key, child in _iter_assignments(section.body, path):
+                        self._index.setdefault(key, child)
+
+
+class Transaction:
+    """
+    Mutations buffered by `AloeDocument.transaction`
+
+    The document is left untouched until `commit`, consecutive `set` and
+    `update` calls are merged and resolved in a single walk
+    """
+
+    def __init__(self, doc: AloeDocument):
+        self._doc = doc
+        self._operations: list[tuple[str, Any]] = []
+
+    def set(self, path: str, value: AssignmentValueType) -> None:
+        self.update({path: value})
+
+    def update(self, values: Mapping[str, Any]) -> None:
+        if self._operations and self._operations[-1][0] == "update":
+            self._operations[-1][1].add_mapping(values)
+        else:
+            group = _PathGroup()
+            group.add_mapping(values)
+            self._operations.append(("update", group))
+
+    def remove(self, path: str) -> None:
+        self._operations.append(("remove", path))
+
+    def clear(self, path: str | None = None) -> None:
+        self._operations.append(("clear", path))
+
+    def commit(self, save: bool = False) -> None:
+        """Apply the buffered mutations, everything is rolled back on error"""
+        with self._doc._lock:
+            self._commit(save)
+
+    def _commit(self, save: bool) -> None:
+        doc = self._doc
+        undo: _Undo = []
+        paths: list[str] | None = []
+
+        try:
+            for operation, argument in self._operations:
+                match operation:
+                    case "update":
+                        doc._update(doc.document._items, argument, "", undo)
+                    case "remove":
+                        doc._remove(argument, undo)
+                    case "clear":
+                        doc._clear(argument, undo)
+
+                if paths is None:
+                    continue
+                elif operation == "update":
+                    paths.extend(argument.paths())
+                elif argument is None:
+                    paths = None
+                else:
+                    paths.append(argument.partition(LBRACKET)[0])
+
+            if save:
+                doc.save(atomic=True)
+        except BaseException:
+            doc._rollback(undo)
+            raise
+        finally:
+            self._operations.clear()
+
+        doc._touch(paths)
+
+
+class CompiledPath:
+    """
+    Accessor for a fixed path of an `AloeDocument`
+
+    Created by `AloeDocument.compile_path`, the resolved assignment is
+    cached and revalidated against the document generation on every access
+    """
+
+    __slots__ = ("path", "_doc", "_keys", "_indices", "_generation", "_node")
+
+    def __init__(self, doc: AloeDocument, path: str):
+        self.path = path
+        self._doc = doc
+        self._keys, self._indices = parse_path(path)
+        self._generation = -1
+        self._node: AssignmentNode | None = None
+
+    def __repr__(self):
+        return f"CompiledPath({self.path!r})"
+
+    def _resolve(self) -> AssignmentNode | None:
+        scope = self._doc._find_scope(self._keys[:-1])
+        self._node = None if scope is None else _find_assignment(scope, self._keys[-1])
+        self._generation = self._doc._generation
+        return self._node
+
+    def get(self) -> AssignmentValueType | None:
+        """Same as `AloeDocument.get(path)`"""
+        if self._generation == self._doc._generation:
+            node = self._node
+        else:
+            node = self._resolve()
+
+        if node is None:
             return None
 
-        path_parts = path.split(".")
-
-        current_scope = self.document._items
-
-        for index, part in enumerate(path_parts):
-            is_last_part = index == len(path_parts) - 1
-
-            for node in current_scope:
-                match node:
-                    case AssignmentNode():
-                        if is_last_part and node.key == part:
-                            node.value = Null
-                            return None
-                    case SectionNode():
-                        if is_last_part:
-                            node.body.clear()
-                            return None
-                        if node.name == part:
-                            current_scope = node.body
+        return select_element(node.value, self._indices)
+
+    def set(self, value: AssignmentValueType) -> None:
+        """Same as `AloeDocument.set(path, value)`"""
+        with self._doc._lock:
+            if self._generation == self._doc._generation:
+                node = self._node
+            else:
+                node = self._resolve()
+
+            if node is None or self._indices:
+                self._doc.set(self.path, value)
+                return None
+
+            # Replacing a value keeps the cached node valid
+            node.value = value
+            self._doc._touch([PATH_SEPARATOR.join(self._keys)])
+            self._generation = self._doc._generation
+
+
+class SectionView:
+    """
+    Section of an `AloeDocument`, created by `AloeDocument.section`
+
+    The section body is resolved once, through the section tables of the
+    document, and kept until the section or one of its parents is removed
+    or replaced. Reads use the key index of the document when it is built,
+    writes are applied to the document with the full path so its index and
+    listeners stay up to date
+    """
+
+    __slots__ = ("path", "_doc", "_keys", "_prefix", "_body", "__weakref__")
+
+    def __init__(self, doc: AloeDocument, path: str):
+        keys, indices = parse_path(path)
+        if indices:
+            raise ValueError(f"Not a section path: {path!r}")
+
+        self.path = path
+        self._doc = doc
+        self._keys = keys
+        self._prefix = path + PATH_SEPARATOR
+        self._body = doc._find_section_body(keys)
+
+        if self._body is None:
+            raise KeyError(path)
+
+        doc._add_listener(self._changed)
+
+    def __repr__(self):
+        return f"SectionView({self.path!r})"
+
+    def _changed(self, doc: AloeDocument, paths: Collection[str] | None) -> None:
+        if self._body is None:
+            return None
+
+        if paths is None or any(
+            path == self.path or self._prefix.startswith(path + PATH_SEPARATOR)
+            for path in paths
+        ):
+            self._body = None
+
+    def _scope(self) -> list[AST_ItemType] | None:
+        """Body of the section, `None` if it was removed"""
+        if self._body is None:
+            self._body = self._doc._find_section_body(self._keys)
+
+        return self._body
+
+    def get(self, path: str) -> AssignmentValueType | None:
+        """Same as `AloeDocument.get`, relative to the section"""
+        keys, indices = parse_path(path)
+        index = self._doc._index
+
+        if index is not None:
+            key = path.partition(LBRACKET)[0] if indices else path
+            node = index.get(self._prefix + key)
+            return None if node is None else select_element(node.value, indices)
+
+        scope = self._scope()
+
+        for key in keys[:-1]:
+            if scope is None:
+                return None
+
+            section = _find_section(scope, key)
+            scope = None if section is None else section.body
+
+        node = None if scope is None else _find_assignment(scope, keys[-1])
+
+        return None if node is None else select_element(node.value, indices)
+
+    def __contains__(self, path: str) -> bool:
+        return self._prefix + path in self._doc._key_index()
+
+    def set(self, path: str, value: AssignmentValueType) -> None:
+        """Same as `AloeDocument.set`, relative to the section"""
+        keys, indices = parse_path(path)
+        body = self._scope()
+
+        if indices or body is None:
+            self._doc.set(self._prefix + path, value)
+            return None
+
+        # The section is already resolved, only walk the rest of the path
+        doc = self._doc
+
+        with doc._lock:
+            try:
+                scope = doc._find_scope(keys[:-1], create=True, scope=body)
+                assert scope is not None
+                doc._assign(scope, keys[-1], value, self._prefix + path, None)
+            finally:
+                doc._touch([self._prefix + path])
+
+    def remove(self, path: str) -> None:
+        """Same as `AloeDocument.remove`, relative to the section"""
+        self._doc.remove(self._prefix + path)
+
+    def clear(self, path: str | None = None) -> None:
+        """Same as `AloeDocument.clear`, the whole section body without `path`"""
+        self._doc.clear(self.path if path is None else self._prefix + path)
+
+    def section(self, path: str) -> "SectionView":
+        """View of a sub section"""
+        return SectionView(self._doc, self._prefix + path)
+
+    def walk(
+        self,
+        prefix: str | None = None,
+        skip: Callable[[KeyTuple, SectionNode], bool] | None = None,
+    ) -> Iterator[tuple[KeyTuple, AssignmentValueType, AssignmentNode]]:
+        """`(path, value, node)` of every key, paths are relative to the section"""
+        scope = self._scope()
+        if scope is None:
+            return iter(())
+
+        return Document(scope).walk(prefix, skip)
+
+
+@dataclass(slots=True)
+class _PathGroup:
+    """Paths of one scope, grouped by key and by section"""
+
+    keys: dict[str, list[tuple]] = field(default_factory=dict)
+    sections: dict[str, "_PathGroup"] = field(default_factory=dict)
+    # `(name, is_section)` in the order they were first added
+    order: list[tuple[str, bool]] = field(default_factory=list)
+
+    def section(self, name: str) -> "_PathGroup":
+        group = self.sections.get(name)
+
+        if group is None:
+            group = self.sections[name] = _PathGroup()
+            self.order.append((name, True))
+
+        return group
+
+    def add(self, keys: tuple[str, ...], leaf: tuple) -> None:
+        group = self
+
+        for key in keys[:-1]:
+            group = group.section(key)
+
+        leaves = group.keys.get(keys[-1])
+
+        if leaves is None:
+            leaves = group.keys[keys[-1]] = []
+            group.order.append((keys[-1], False))
+
+        leaves.append(leaf)
+
+    def paths(self, prefix: str = "") -> list[str]:
+        """Dotted paths of every key in the group"""
+        paths = []
+
+        for name, is_section in self.order:
+            if is_section:
+                paths.extend(self.sections[name].paths(prefix + name + PATH_SEPARATOR))
+            else:
+                paths.append(prefix + name)
+
+        return paths
+
+    def add_mapping(self, values: Mapping[str, Any]) -> None:
+        for path, value in values.items():
+            keys, indices = parse_path(path)
+
+            if isinstance(value, Mapping):
+                if indices:
+                    raise ValueError(f"Cannot assign a mapping to {path!r}")
+
+                group = self
+                for key in keys:
+                    group = group.section(key)
+
+                group.add_mapping(value)
+            else:
+                self.add(keys, (indices, value))
+
+
+def _build_scope(values: Mapping[str, Any], comments: str | None) -> list[AST_ItemType]:
+    scope: list[AST_ItemType] = []
+
+    for key, value in values.items():
+        if key == comments:
+            scope.extend(CommentNode(text) for text in value)
+        elif isinstance(value, Mapping):
+            scope.append(SectionNode(name=key, body=_build_scope(value, comments)))
+        else:
+            scope.append(AssignmentNode(key=key, value=_from_plain(value, key)))
+
+    return scope
+
+
+def _from_plain(value: Any, key: str) -> AssignmentValueType:
+    match value:
+        case None:
+            return Null
+        case _ if value is Null:
+            return Null
+        case list() | tuple():
+            return Array([Value(_from_plain(element, key)) for element in value])
+        case str() | bool() | int() | float() | Array():
+            return value
+
+    raise ValueError(f"Cannot convert {type(value).__name__} value of {key!r}")
+
+
+def _get_many(
+    scope: list[AST_ItemType],
+    group: _PathGroup,
+    results: dict[str, AssignmentValueType | None],
+) -> None:
+    assignments, sections = scope_tables(scope)
+
+    for key, leaves in group.keys.items():
+        node = assignments.get(key)
+
+        if node is not None:
+            for path, indices in leaves:
+                results[path] = select_element(node.value, indices)
+
+    for name, child in group.sections.items():
+        section = sections.get(name)
+
+        if section is not None:
+            _get_many(section.body, child, results)
+
+
+def _iter_assignments(
+    scope: list[AST_ItemType], prefix: str | None = None
+) -> Iterator[tuple[str, AssignmentNode]]:
+    """
+    Yield `(dotted path, node)` for every reachable assignment under `scope`
+
+    Like `get`, only the first key or section with a given name is reachable
+    """
+    keys: set[str] = set()
+    sections: set[str] = set()
+    prefix = "" if prefix is None else prefix + PATH_SEPARATOR
+
+    for node in scope:
+        match node:
+            case AssignmentNode() if node.key not in keys:
+                keys.add(node.key)
+                yield prefix + node.key, node
+            case SectionNode() if node.name not in sections:
+                sections.add(node.name)
+                yield from _iter_assignments(node.body, prefix + node.name)
+
+
+def _reuse_unchanged(
+    old: list[AST_ItemType],
+    new: list[AST_ItemType],
+    prefix: str = "",
+    replaced: list[str] | None = None,
+) -> None:
+    """
+    Replace the sections of `new` that are equal to those in `old`
+
+    The paths of the sections of `old` that are not reused are added to
+    `replaced`
+    """
+    _, sections = scope_tables(old)
+
+    for index, node in enumerate(new):
+        if not isinstance(node, SectionNode):
+            continue
+
+        previous = sections.pop(node.name, None)
+
+        if previous is None:
+            continue
+
+        if same(previous, node):
+            _move_positions(previous, node)
+            new[index] = previous
+        else:
+            if replaced is not None:
+                replaced.append(prefix + node.name)
+
+            path = prefix + node.name + PATH_SEPARATOR
+            _reuse_unchanged(previous.body, node.body, path, replaced)
+
+    if replaced is not None:
+        replaced.extend(prefix + name for name in sections)
+
+
+def _move_positions(old: AST_ItemType, new: AST_ItemType) -> None:
+    """Give `old` the source positions of `new`, the same tree parsed again"""
+    match old, new:
+        case AssignmentNode(), AssignmentNode():
+            old.position = new.position
+        case SectionNode(), SectionNode():
+            old.position = new.position
+
+            for old_child, new_child in zip(old.body, new.body):
+                _move_positions(old_child, new_child)
+
+
+def _remove_node(scope: list[AST_ItemType], node: AST_ItemType) -> None:
+    """Remove `node` itself from `scope`, not the first node equal to it"""
+    for index, item in enumerate(scope):
+        if item is node:
+            del scope[index]
+            return None
+
+
+def _restore(scope: list[AST_ItemType], items: list[AST_ItemType]) -> None:
+    scope[:] = items
+
+
+def _find_section(scope: list[AST_ItemType], name: str) -> SectionNode | None:
+    for node in scope:
+        if isinstance(node, SectionNode) and node.name == name:
+            return node
+
+    return None
+
+
+def _find_assignment(scope: list[AST_ItemType], key: str) -> AssignmentNode | None:
+    for node in scope:
+        if isinstance(node, AssignmentNode) and node.key == key:
+            return node
+
+    return None
+
+
+def _find_item(scope: list[AST_ItemType], name: str) -> int | None:
+    """Index of the first assignment or section called `name`"""
+    for index, node in enumerate(scope):
+        match node:
+            case AssignmentNode() if node.key == name:
+                return index
+            case SectionNode() if node.name == name:
+                return index
+
+    return None
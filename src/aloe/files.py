@@ -0,0 +1,62 @@
+"""File helpers"""
+
+import os
+import stat
+import tempfile
+
+from contextlib import suppress
+
+# Mode of a file created by `write_atomic`, existing files keep theirs
+DEFAULT_FILE_MODE = 0o644
+
+
+def write_atomic(path: str, data: str | bytes, durable: bool = True) -> None:
+    """
+    Replace the content of `path` without ever leaving it half written
+
+    `data` is written to a temporary file in the same directory, which is
+    then renamed over `path`. With `durable` the temporary file and the
+    directory are fsync'ed, so the new content survives a crash as well
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp = tempfile.mkstemp(
+        prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory
+    )
+
+    try:
+        with open(fd, "wb" if isinstance(data, bytes) else "w") as f:
+            f.write(data)
+            f.flush()
+
+            if durable:
+                os.fsync(f.fileno())
+
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = DEFAULT_FILE_MODE
+
+        os.chmod(temp, mode)
+        os.replace(temp, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(temp)
+        raise
+
+    if durable:
+        fsync_directory(directory)
+
+
+def fsync_directory(directory: str) -> None:
+    """Persist the entries of `directory`, a no-op where it isn't supported"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return None
+
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -0,0 +1,432 @@
+"""Flat, read-only images of documents
+
+An image is a single buffer that can be memory-mapped from a file or put in
+a `multiprocessing.shared_memory` segment, so many processes share one
+physical copy of a large document. `ConfigImage` answers lookups straight
+from the buffer and only decodes the values that are asked for
+
+Layout, every integer is little-endian:
+
+    header    magic, version, counts and offsets of the tables below
+    entries   (key offset, key length, value offset) sorted by key
+    slots     (crc32 of the key, entry index + 1) open-addressing hash table,
+              0 marks an empty slot
+    sections  (path offset, path length, first entry, end entry) sorted by
+              path, the keys of a section are a contiguous range of entries
+    heap      utf-8 keys and section paths, tagged values
+
+Values start with a one byte tag, followed by:
+
+    null, false, true    nothing
+    int                  i64, or a decimal string if it doesn't fit
+    float                f64
+    string               u32 length, utf-8 bytes
+    array                u32 count, count u32 offsets of the elements
+"""
+
+import mmap
+import struct
+import zlib
+
+from bisect import bisect_left
+from collections.abc import Iterator
+from multiprocessing.shared_memory import SharedMemory
+from typing import Self
+
+from .ast import (
+    AST_ItemType,
+    Array,
+    AssignmentValueType,
+    Document,
+    Null,
+    scope_tables,
+)
+from .files import write_atomic
+from .path import PATH_SEPARATOR, parse_path
+from .symbols import LBRACKET
+
+MAGIC = b"ALOEIMG\0"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<8sIIIIIIIII")
+_ENTRY = struct.Struct("<III")
+_SLOT = struct.Struct("<II")
+_SECTION = struct.Struct("<IIII")
+_U32 = struct.Struct("<I")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+
+_NULL = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3
+_BIG_INT = 4
+_FLOAT = 5
+_STRING = 6
+_ARRAY = 7
+
+_I64_MIN = -(2**63)
+_I64_MAX = 2**63 - 1
+
+
+def build_image(document: Document) -> bytes:
+    """
+    Encode `document` as an image
+
+    Like `AloeDocument.get`, only the first key or section with a given name
+    is included
+    """
+    keys: list[tuple[bytes, AssignmentValueType]] = []
+    sections: list[bytes] = []
+    _collect(document._items, "", keys, sections)
+    keys.sort(key=lambda item: item[0])
+    sections.sort()
+
+    slot_count = 1
+    while slot_count < 2 * len(keys):
+        slot_count *= 2
+
+    # Table sizes only depend on the counts, so the heap offset is known
+    # upfront and every offset can be written as an absolute one
+    entries_offset = _HEADER.size
+    slots_offset = entries_offset + len(keys) * _ENTRY.size
+    sections_offset = slots_offset + slot_count * _SLOT.size
+    heap_offset = sections_offset + len(sections) * _SECTION.size
+
+    heap = _Heap(heap_offset)
+    entries = bytearray()
+
+    for key, value in keys:
+        entries += _ENTRY.pack(heap.put(key), len(key), heap.put_value(value))
+
+    slots = [(0, 0)] * slot_count
+    mask = slot_count - 1
+
+    for index, (key, _) in enumerate(keys):
+        crc = zlib.crc32(key)
+        slot = crc & mask
+
+        while slots[slot][1]:
+            slot = (slot + 1) & mask
+
+        slots[slot] = (crc, index + 1)
+
+    sorted_keys = [key for key, _ in keys]
+    section_table = bytearray()
+
+    for path in sections:
+        prefix = path + PATH_SEPARATOR.encode()
+        start = bisect_left(sorted_keys, prefix)
+        end = bisect_left(sorted_keys, _prefix_end(prefix), start)
+        section_table += _SECTION.pack(heap.put(path), len(path), start, end)
+
+    size = heap_offset + len(heap.data)
+
+    if size > 0xFFFFFFFF:
+        raise ValueError("Document too large for an image (4 GiB maximum)")
+
+    header = _HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        size,
+        len(keys),
+        entries_offset,
+        slot_count,
+        slots_offset,
+        len(sections),
+        sections_offset,
+        heap_offset,
+    )
+
+    return b"".join(
+        [
+            header,
+            entries,
+            b"".join(_SLOT.pack(*slot) for slot in slots),
+            section_table,
+            heap.data,
+        ]
+    )
+
+
+def write_image(document: Document, filename: str) -> None:
+    """Write the image of `document` to `filename`, atomically"""
+    write_atomic(filename, build_image(document))
+
+
+def share_image(document: Document, name: str | None = None) -> SharedMemory:
+    """
+    Put the image of `document` in a new shared memory segment
+
+    Other processes open it with `ConfigImage.attach(segment.name)`, the
+    creator is responsible for `close()` and `unlink()`
+    """
+    data = build_image(document)
+    segment = SharedMemory(name=name, create=True, size=len(data))
+    segment.buf[: len(data)] = data
+
+    return segment
+
+
+class ConfigImage:
+    """
+    Read-only document backed by an image
+
+    Example:
+
+    ```python
+    from aloe.image import ConfigImage, write_image
+
+    write_image(AloeDocument.from_file("example.aloe").document, "example.img")
+
+    # in every worker
+    config = ConfigImage.open("example.img")
+    config.get("database.pool.timeout")
+    ```
+    """
+
+    def __init__(self, buffer, _owner=None):
+        self._buffer = memoryview(buffer)
+        # Object that owns the memory (mmap, shared memory), closed with us
+        self._owner = _owner
+
+        (
+            magic,
+            version,
+            size,
+            self._key_count,
+            self._entries,
+            self._slot_count,
+            self._slots,
+            self._section_count,
+            self._sections,
+            _,
+        ) = _HEADER.unpack_from(self._buffer)
+
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Not an aloe image, or an image of another version")
+
+        if size > len(self._buffer):
+            raise ValueError("Truncated aloe image")
+
+        self._buffer = self._buffer[:size]
+        self._mask = self._slot_count - 1
+
+    @classmethod
+    def open(cls, filename: str) -> Self:
+        """Memory-map the image file `filename`"""
+        with open(filename, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return cls(mapping, mapping)
+
+    @classmethod
+    def attach(cls, name: str) -> Self:
+        """Use the image in the shared memory segment `name`"""
+        segment = SharedMemory(name=name, track=False)
+
+        return cls(segment.buf, segment)
+
+    def close(self) -> None:
+        self._buffer.release()
+
+        if self._owner is not None:
+            self._owner.close()
+            self._owner = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _find(self, key: bytes) -> int | None:
+        """Index of the entry of `key`"""
+        crc = zlib.crc32(key)
+        slot = crc & self._mask
+
+        while True:
+            slot_crc, index = _SLOT.unpack_from(self._buffer, self._slots + slot * 8)
+
+            if not index:
+                return None
+
+            if slot_crc == crc and self._entry_key(index - 1) == key:
+                return index - 1
+
+            slot = (slot + 1) & self._mask
+
+    def _entry(self, index: int) -> tuple[int, int, int]:
+        return _ENTRY.unpack_from(self._buffer, self._entries + index * _ENTRY.size)
+
+    def _entry_key(self, index: int) -> memoryview:
+        offset, length, _ = self._entry(index)
+        return self._buffer[offset : offset + length]
+
+    def get(self, path: str) -> AssignmentValueType | None:
+        """Same as `AloeDocument.get`"""
+        if LBRACKET in path:
+            _, indices = parse_path(path)
+            key = path.partition(LBRACKET)[0]
+        else:
+            indices, key = (), path
+
+        index = self._find(key.encode())
+        if index is None:
+            return None
+
+        offset = self._entry(index)[2]
+
+        for i in indices:
+            offset = self._element(offset, i)
+            if offset is None:
+                return None
+
+        return self._value(offset)
+
+    def __contains__(self, path: str) -> bool:
+        return self._find(path.encode()) is not None
+
+    def __len__(self) -> int:
+        return self._key_count
+
+    def keys(self, section: str | None = None) -> Iterator[str]:
+        """Dotted paths of every key, or of the keys under `section`, sorted"""
+        if section is None:
+            start, end = 0, self._key_count
+        else:
+            bounds = self._section_range(section)
+            if bounds is None:
+                return
+            start, end = bounds
+
+        for index in range(start, end):
+            yield str(self._entry_key(index), "utf-8")
+
+    def sections(self) -> Iterator[str]:
+        """Dotted paths of every section, sorted"""
+        for index in range(self._section_count):
+            yield str(self._section_path(index), "utf-8")
+
+    def _section(self, index: int) -> tuple[int, int, int, int]:
+        offset = self._sections + index * _SECTION.size
+        return _SECTION.unpack_from(self._buffer, offset)
+
+    def _section_path(self, index: int) -> memoryview:
+        offset, length, _, _ = self._section(index)
+        return self._buffer[offset : offset + length]
+
+    def _section_range(self, section: str) -> tuple[int, int] | None:
+        path = section.encode()
+        low, high = 0, self._section_count
+
+        while low < high:
+            middle = (low + high) // 2
+
+            if bytes(self._section_path(middle)) < path:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < self._section_count and self._section_path(low) == path:
+            _, _, start, end = self._section(low)
+            return start, end
+
+        return None
+
+    def _element(self, offset: int, index: int) -> int | None:
+        if self._buffer[offset] != _ARRAY:
+            return None
+
+        (count,) = _U32.unpack_from(self._buffer, offset + 1)
+
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            return None
+
+        return _U32.unpack_from(self._buffer, offset + 5 + index * 4)[0]
+
+    def _value(self, offset: int) -> AssignmentValueType:
+        buffer = self._buffer
+        tag = buffer[offset]
+
+        if tag == _STRING:
+            (length,) = _U32.unpack_from(buffer, offset + 1)
+            return str(buffer[offset + 5 : offset + 5 + length], "utf-8")
+        if tag == _INT:
+            return _I64.unpack_from(buffer, offset + 1)[0]
+        if tag == _FLOAT:
+            return _F64.unpack_from(buffer, offset + 1)[0]
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+        if tag == _NULL:
+            return Null
+        if tag == _BIG_INT:
+            (length,) = _U32.unpack_from(buffer, offset + 1)
+            return int(str(buffer[offset + 5 : offset + 5 + length], "ascii"))
+
+        (count,) = _U32.unpack_from(buffer, offset + 1)
+        elements = _U32.unpack_from
+        return Array.from_iter(
+            self._value(elements(buffer, offset + 5 + i * 4)[0]) for i in range(count)
+        )
+
+
+def _collect(
+    scope: list[AST_ItemType],
+    prefix: str,
+    keys: list[tuple[bytes, AssignmentValueType]],
+    sections: list[bytes],
+) -> None:
+    assignments, children = scope_tables(scope)
+
+    for key, node in assignments.items():
+        keys.append(((prefix + key).encode(), node.value))
+
+    for name, section in children.items():
+        path = prefix + name
+        sections.append(path.encode())
+        _collect(section.body, path + PATH_SEPARATOR, keys, sections)
+
+
+def _prefix_end(prefix: bytes) -> bytes:
+    """Smallest key greater than every key starting with `prefix`"""
+    return prefix[:-1] + bytes([prefix[-1] + 1])
+
+
+class _Heap:
+    """Heap of an image being built, `base` is its offset in the image"""
+
+    def __init__(self, base: int):
+        self.base = base
+        self.data = bytearray()
+
+    def put(self, data: bytes) -> int:
+        offset = self.base + len(self.data)
+        self.data += data
+        return offset
+
+    def put_value(self, value: AssignmentValueType) -> int:
+        if isinstance(value, Array):
+            elements = [self.put_value(element) for element in value]
+            offsets = b"".join(_U32.pack(element) for element in elements)
+            return self.put(bytes([_ARRAY]) + _U32.pack(len(elements)) + offsets)
+
+        match value:
+            case bool():
+                return self.put(bytes([_TRUE if value else _FALSE]))
+            case int() if _I64_MIN <= value <= _I64_MAX:
+                return self.put(bytes([_INT]) + _I64.pack(value))
+            case int():
+                digits = str(value).encode()
+                return self.put(bytes([_BIG_INT]) + _U32.pack(len(digits)) + digits)
+            case float():
+                return self.put(bytes([_FLOAT]) + _F64.pack(value))
+            case str():
+                data = value.encode()
+                return self.put(bytes([_STRING]) + _U32.pack(len(data)) + data)
+            case _:
+                return self.put(bytes([_NULL]))
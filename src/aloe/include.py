@@ -0,0 +1,203 @@
+"""`@include` directives
+
+    @include "common/logging.aloe"
+
+    @database {
+        @include "pools.aloe"
+    }
+
+The nodes of the file are inserted after the include, its path is
+relative to the including file. The include stays in the tree and the
+document is saved with the directive instead of the nodes, changing one
+of those nodes makes saving fail rather than lose the change
+
+Every included file is parsed once and kept, keyed by its path and
+revalidated by mtime and size, so a fragment included from many places is
+only lexed and parsed again when it changes. Each include gets its own copy
+of the nodes, decoded from the compiled form of `aloe.cache`
+"""
+
+import os
+
+from dataclasses import dataclass, replace
+
+import aloe.cache
+
+from .ast import AST_ItemType, Document, IncludeNode, SectionNode, same
+from .lexer import lex
+from .parser import ParserSyntaxError, parse
+
+
+@dataclass(frozen=True, slots=True)
+class _Fragment:
+    mtime_ns: int
+    size: int
+    # `aloe.cache.encode` of the file, its own includes are left unresolved
+    payload: bytes
+    has_includes: bool
+
+
+# Absolute path -> parsed file
+_fragments: dict[str, _Fragment] = {}
+
+
+def clear_cache() -> None:
+    """Forget every parsed file"""
+    _fragments.clear()
+
+
+def resolve(document: Document, source: str | None, text: str | None = None) -> None:
+    """
+    Insert the nodes of the includes of `document`, read from the file
+    `source`, after them
+
+    Without `source` paths are relative to the working directory. A missing
+    file or an include cycle raise a `ParserSyntaxError` pointing at the
+    include, syntax errors in an included file point into that file
+    """
+    if source is None:
+        directory, stack = os.getcwd(), []
+    else:
+        path = os.path.abspath(source)
+        directory, stack = os.path.dirname(path), [path]
+
+    if _has_includes(document._items):
+        _resolve_scope(document._items, directory, source or "text", text, stack)
+
+
+def check_unchanged(scope: list[AST_ItemType]) -> None:
+    """
+    Raise a `ValueError` if nodes brought by an include of `scope` changed
+
+    The includes are saved as directives, the changes would be lost
+    """
+    for index, node in enumerate(scope):
+        match node:
+            case IncludeNode() if node.payload is not None:
+                nodes = _unresolved(scope[index + 1 : index + 1 + node.count])
+                original = aloe.cache.decode(node.payload)._items
+
+                if len(nodes) != len(original) or not all(map(same, nodes, original)):
+                    raise ValueError(
+                        f"The nodes included from {node.path!r} were changed, "
+                        "saving would lose the changes"
+                    )
+            case SectionNode():
+                check_unchanged(node.body)
+
+
+def _unresolved(scope: list[AST_ItemType]) -> list[AST_ItemType]:
+    """`scope` without the nodes of its includes"""
+    items: list[AST_ItemType] = []
+    skip = 0
+
+    for node in scope:
+        if skip:
+            skip -= 1
+            continue
+
+        match node:
+            case IncludeNode():
+                skip = node.count
+                items.append(node)
+            case SectionNode():
+                items.append(replace(node, body=_unresolved(node.body)))
+            case _:
+                items.append(node)
+
+    return items
+
+
+def _has_includes(scope: list[AST_ItemType]) -> bool:
+    for node in scope:
+        match node:
+            case IncludeNode():
+                return True
+            case SectionNode() if _has_includes(node.body):
+                return True
+
+    return False
+
+
+def _resolve_scope(
+    scope: list[AST_ItemType],
+    directory: str,
+    source: str,
+    text: str | None,
+    stack: list[str],
+) -> None:
+    """`stack` holds the absolute paths of the files being included"""
+    resolved: list[AST_ItemType] = []
+
+    for node in scope:
+        match node:
+            case IncludeNode():
+                path = os.path.abspath(os.path.join(directory, node.path))
+
+                if path in stack:
+                    cycle = " -> ".join([*stack, path])
+                    raise _error(f"Include cycle: {cycle}", node, source, text)
+
+                try:
+                    fragment = _load(path)
+                except OSError as e:
+                    message = f"Cannot include {node.path!r}: {e.strerror}"
+                    raise _error(message, node, source, text) from None
+
+                items = aloe.cache.decode(fragment.payload)._items
+
+                if fragment.has_includes:
+                    parent = os.path.dirname(path)
+                    _resolve_scope(items, parent, path, None, [*stack, path])
+
+                node.count = len(items)
+                node.payload = fragment.payload
+                resolved.append(node)
+                resolved.extend(items)
+            case SectionNode():
+                _resolve_scope(node.body, directory, source, text, stack)
+                resolved.append(node)
+            case _:
+                resolved.append(node)
+
+    scope[:] = resolved
+
+
+def _load(path: str) -> _Fragment:
+    st = os.stat(path)
+    fragment = _fragments.get(path)
+
+    if fragment is not None and (fragment.mtime_ns, fragment.size) == (
+        st.st_mtime_ns,
+        st.st_size,
+    ):
+        return fragment
+
+    with open(path, "r") as f:
+        text = f.read()
+
+    document = parse(path, text, lex(text))
+    fragment = _Fragment(
+        st.st_mtime_ns,
+        st.st_size,
+        aloe.cache.encode(document),
+        _has_includes(document._items),
+    )
+    _fragments[path] = fragment
+
+    return fragment
+
+
+def _error(
+    message: str, node: IncludeNode, source: str, text: str | None
+) -> ParserSyntaxError:
+    if text is None:
+        try:
+            with open(source, "r") as f:
+                text = f.read()
+        except OSError:
+            text = ""
+
+    return ParserSyntaxError(
+        source=source, text=text, message=message, position=node.position or (1, 1)
+    )
@@ -0,0 +1,264 @@
+"""`${path}` references in string values
+
+    host = "db.internal"
+    url = "postgres://${database.host}:${database.port}/app"
+    port = "${defaults.port}"
+
+A string that is a single reference takes the value of the referenced key,
+with its type, otherwise the referenced values are formatted into the
+string. `$${` is a literal `${`
+"""
+
+import re
+
+from collections.abc import Collection
+from dataclasses import dataclass
+
+from .ast import Array, AssignmentValueType, Null, Position, select_element
+from .document import AloeDocument
+from .path import PATH_SEPARATOR, parse_path
+from .symbols import LBRACKET
+
+_REFERENCE = re.compile(r"\$\{([^}]*)\}")
+_ESCAPED = "$${"
+
+
+class InterpolationError(ValueError):
+    """Unknown reference or reference cycle, `position` is the offending key's"""
+
+    def __init__(
+        self, message: str, path: str, source: str | None, position: Position | None
+    ):
+        super().__init__(message)
+        self.message = message
+        self.path = path
+        self.source = source
+        self.position = position
+
+    def __str__(self):
+        if self.position is None:
+            return f"{self.path}: {self.message}"
+
+        line, column = self.position
+        return f"{self.source or '<text>'}:{line}:{column}: {self.path}: {self.message}"
+
+
+@dataclass(frozen=True, slots=True)
+class _Template:
+    # Literal text and references alternate, starting with text
+    parts: tuple[str, ...]
+
+    @property
+    def references(self) -> tuple[str, ...]:
+        return self.parts[1::2]
+
+
+class Interpolator:
+    """
+    Values of `doc` with their references resolved
+
+    The references of every key are parsed once into a dependency graph and
+    resolved values are memoized. A mutation of the document only drops the
+    memoized values of the keys that depend on what changed
+
+    Example:
+
+    ```python
+    from aloe.interpolate import Interpolator
+
+    config = Interpolator(AloeDocument.from_file("example.aloe"))
+
+    config.get("database.url")
+    ```
+    """
+
+    def __init__(self, doc: AloeDocument):
+        self.doc = doc
+        # Key path -> template, only for the strings with references
+        self._templates: dict[str, _Template] | None = None
+        # Referenced key path -> key paths whose template references it
+        self._dependents: dict[str, set[str]] = {}
+        self._resolved: dict[str, AssignmentValueType | None] = {}
+
+        doc._add_listener(self._changed)
+
+    def get(self, path: str) -> AssignmentValueType | None:
+        """
+        Same as `AloeDocument.get`, with the references resolved
+
+        Raises:
+            InterpolationError: A reference is unknown or part of a cycle
+        """
+        if LBRACKET not in path:
+            try:
+                return self._resolved[path]
+            except KeyError:
+                return self._resolve(path, [])
+
+        key = path.partition(LBRACKET)[0]
+        _, indices = parse_path(path)
+
+        try:
+            value = self._resolved[key]
+        except KeyError:
+            value = self._resolve(key, [])
+
+        return None if value is None else select_element(value, indices)
+
+    def _graph(self) -> dict[str, _Template]:
+        if self._templates is None:
+            self._templates = {}
+            self._dependents.clear()
+
+            for key, node in self.doc._key_index().items():
+                self._add_template(key, node.value)
+
+        return self._templates
+
+    def _add_template(self, key: str, value: AssignmentValueType) -> None:
+        if not (isinstance(value, str) and "$" in value):
+            return None
+
+        # Escaped references are hidden from the pattern, then restored
+        parts = _REFERENCE.split(value.replace(_ESCAPED, "\0"))
+        if len(parts) == 1 and _ESCAPED not in value:
+            return None
+
+        assert self._templates is not None
+        template = _Template(tuple(part.replace("\0", "${") for part in parts))
+        self._templates[key] = template
+
+        for reference in template.references:
+            target = reference.partition(LBRACKET)[0]
+            self._dependents.setdefault(target, set()).add(key)
+
+    def _remove_template(self, key: str) -> None:
+        assert self._templates is not None
+        template = self._templates.pop(key, None)
+
+        if template is None:
+            return None
+
+        for reference in template.references:
+            target = reference.partition(LBRACKET)[0]
+            dependents = self._dependents.get(target)
+
+            if dependents is not None:
+                dependents.discard(key)
+
+    def _resolve(self, key: str, stack: list[str]) -> AssignmentValueType | None:
+        node = self.doc._key_index().get(key)
+
+        if node is None:
+            value = None
+        elif (template := self._graph().get(key)) is None:
+            value = node.value
+        else:
+            if key in stack:
+                cycle = stack[stack.index(key) :] + [key]
+                raise self._error(f"Reference cycle {' -> '.join(cycle)}", cycle[0])
+
+            stack.append(key)
+            value = self._render(key, template, stack)
+            stack.pop()
+
+        self._resolved[key] = value
+
+        return value
+
+    def _render(
+        self, key: str, template: _Template, stack: list[str]
+    ) -> AssignmentValueType:
+        parts = template.parts
+
+        # A single reference keeps the type of the referenced value
+        if len(parts) == 3 and not parts[0] and not parts[2]:
+            return self._reference(key, parts[1], stack)
+
+        text = []
+
+        for i, part in enumerate(parts):
+            text.append(
+                part if i % 2 == 0 else _format(self._reference(key, part, stack))
+            )
+
+        return "".join(text)
+
+    def _reference(
+        self, key: str, reference: str, stack: list[str]
+    ) -> AssignmentValueType:
+        try:
+            _, indices = parse_path(reference)
+        except ValueError:
+            raise self._error(f"Invalid reference ${{{reference}}}", key) from None
+
+        target = reference.partition(LBRACKET)[0]
+
+        try:
+            value = self._resolved[target]
+        except KeyError:
+            value = self._resolve(target, stack)
+
+        if value is not None:
+            value = select_element(value, indices)
+
+        if value is None:
+            raise self._error(f"Unknown reference ${{{reference}}}", key)
+
+        return value
+
+    def _error(self, message: str, key: str) -> InterpolationError:
+        node = self.doc._key_index().get(key)
+        position = None if node is None else node.position
+        return InterpolationError(message, key, self.doc.filename, position)
+
+    def _changed(self, doc: AloeDocument, paths: Collection[str] | None) -> None:
+        if paths is None or self._templates is None:
+            self._templates = None
+            self._resolved.clear()
+            return None
+
+        index = doc._key_index()
+        changed: list[str] = []
+
+        for path in paths:
+            if path in index or path in self._resolved or path in self._templates:
+                keys = [path]
+            else:
+                # A section, or a key that was removed
+                prefix = path + PATH_SEPARATOR
+                keys = [path]
+                keys.extend(k for k in self._resolved if k.startswith(prefix))
+                keys.extend(k for k in self._templates if k.startswith(prefix))
+                keys.extend(k for k in index if k.startswith(prefix))
+
+            for key in keys:
+                self._remove_template(key)
+                node = index.get(key)
+
+                if node is not None:
+                    self._add_template(key, node.value)
+
+            changed.extend(keys)
+
+        # Drop the changed keys and, transitively, everything depending on them
+        while changed:
+            key = changed.pop()
+            self._resolved.pop(key, None)
+            changed.extend(
+                dependent
+                for dependent in self._dependents.get(key, ())
+                if dependent in self._resolved
+            )
+
+
+def _format(value: AssignmentValueType) -> str:
+    match value:
+        case bool():
+            return "true" if value else "false"
+        case Array():
+            return "[" + ", ".join(_format(element) for element in value) + "]"
+        case _ if value is Null:
+            return "null"
+
+    return str(value)
@@ -0,0 +1,253 @@
+"""Write-ahead journal of document mutations
+
+`example.aloe` gets an `example.aloe-journal` next to it. Every mutation of
+the document appends one record to the journal instead of rewriting the
+whole file, loading replays the journal over the file and compaction saves
+the file and empties the journal
+
+A record holds the state of the changed paths after the mutation (a key's
+value, a removed path or a cleared section) rather than the operation, so
+replaying a record more than once gives the same document. A compaction
+interrupted between the save and the truncation is harmless
+
+Records are framed by their length and checksum. A crash in the middle of
+an append leaves a torn record at the end, which is dropped when the
+journal is replayed
+"""
+
+import marshal
+import os
+import struct
+import threading
+import zlib
+
+from collections.abc import Collection
+from typing import Self
+
+import aloe.cache
+
+from .ast import DEFAULT_INDENT_STEP
+from .document import AloeDocument
+from .files import fsync_directory
+from .path import parse_path
+
+JOURNAL_SUFFIX = "-journal"
+# Journal size in bytes above which the document is compacted
+DEFAULT_COMPACT_SIZE = 1 << 20
+
+# Length and crc32 of the payload
+_RECORD_HEADER = struct.Struct("<II")
+
+# Operations of a record
+_SET = 0
+_REMOVE = 1
+_CLEAR = 2
+
+
+def journal_path(filename: str) -> str:
+    return filename + JOURNAL_SUFFIX
+
+
+def replay(doc: AloeDocument, filename: str) -> int:
+    """
+    Apply the records of the journal `filename` to `doc`, return their number
+
+    A torn or corrupted record ends the journal, it and everything after it
+    are cut off the file
+    """
+    try:
+        with open(filename, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return 0
+
+    offset = 0
+    records = 0
+
+    while offset + _RECORD_HEADER.size <= len(data):
+        length, checksum = _RECORD_HEADER.unpack_from(data, offset)
+        start = offset + _RECORD_HEADER.size
+        payload = data[start : start + length]
+
+        if len(payload) != length or zlib.crc32(payload) != checksum:
+            break
+
+        try:
+            operations = marshal.loads(payload)
+        except (EOFError, ValueError, TypeError):
+            break
+
+        _apply(doc, operations)
+        offset = start + length
+        records += 1
+
+    if offset != len(data):
+        with open(filename, "r+b") as f:
+            f.truncate(offset)
+
+    return records
+
+
+def _apply(doc: AloeDocument, operations: list[tuple]) -> None:
+    with doc.transaction() as tx:
+        for operation, path, value in operations:
+            if operation == _SET:
+                tx.set(path, aloe.cache.decode_value(value))
+            elif operation == _REMOVE:
+                tx.remove(path)
+            else:
+                tx.clear(path)
+
+
+class Journal:
+    """
+    Record the mutations of `doc` in the journal of `filename`
+
+    Each `set`, `remove`, `clear`, `update` or transaction appends a single
+    record, the document itself is only written by `compact`, which runs
+    automatically once the journal grows past `threshold` bytes. With
+    `durable` every record is fsync'ed before the mutation returns
+
+    Mutations the journal can't describe as the state of a few paths (the
+    whole document cleared or replaced, a reloaded section) compact right
+    away
+
+    Example:
+
+    ```python
+    from aloe.journal import Journal
+
+    with Journal.open("state.aloe") as journal:
+        for i in range(10_000):
+            journal.doc.set("counter", i)
+    # 10k appends, the file itself is written once the journal is big enough
+    ```
+    """
+
+    def __init__(
+        self,
+        doc: AloeDocument,
+        filename: str | None = None,
+        threshold: int = DEFAULT_COMPACT_SIZE,
+        durable: bool = False,
+        compact: bool = False,
+        indent_level_step: int = DEFAULT_INDENT_STEP,
+    ):
+        filename = filename if filename else doc.filename
+        if filename is None:
+            raise ValueError("No filename: pass one or load the document from a file")
+
+        self.doc = doc
+        self.filename = filename
+        self.threshold = threshold
+        self.durable = durable
+        self.compact_output = compact
+        self.indent_level_step = indent_level_step
+        # Number of records appended and of compactions
+        self.records = 0
+        self.compactions = 0
+        self._lock = threading.Lock()
+        self._fd = os.open(
+            journal_path(filename), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644
+        )
+        self._size = os.fstat(self._fd).st_size
+
+        doc._add_listener(self._changed)
+
+    @classmethod
+    def open(cls, filename: str, **kwargs) -> Self:
+        """
+        Load `filename`, replay its journal and keep journaling
+
+        `kwargs` are passed to `Journal`
+        """
+        doc = AloeDocument.from_file(filename)
+        replay(doc, journal_path(filename))
+
+        return cls(doc, filename, **kwargs)
+
+    @property
+    def size(self) -> int:
+        """Size of the journal in bytes"""
+        return self._size
+
+    def _changed(self, doc: AloeDocument, paths: Collection[str] | None) -> None:
+        operations = None if paths is None else _operations(doc, paths)
+
+        if operations is None:
+            self.compact()
+            return None
+
+        payload = marshal.dumps(operations)
+        record = _RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+        with self._lock:
+            os.write(self._fd, record)
+
+            if self.durable:
+                os.fsync(self._fd)
+
+            self._size += len(record)
+            self.records += 1
+
+            full = self._size > self.threshold
+
+        if full:
+            self.compact()
+
+    def compact(self) -> None:
+        """Save the document and empty the journal"""
+        # The document first, like a mutation calling `_changed`
+        with self.doc._lock, self._lock:
+            self.doc.save(
+                self.filename,
+                compact=self.compact_output,
+                indent_level_step=self.indent_level_step,
+                atomic=True,
+            )
+            # The records are in the file now, a crash before the
+            # truncation replays them over it, which changes nothing
+            os.ftruncate(self._fd, 0)
+            os.fsync(self._fd)
+            fsync_directory(os.path.dirname(os.path.abspath(self.filename)))
+
+            self._size = 0
+            self.compactions += 1
+
+    def close(self) -> None:
+        """Stop following the document, the journal is kept until next load"""
+        self.doc._remove_listener(self._changed)
+
+        with self._lock:
+            if self._fd != -1:
+                os.close(self._fd)
+                self._fd = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _operations(doc: AloeDocument, paths: Collection[str]) -> list[tuple] | None:
+    """State of `paths` in `doc`, `None` if a path is a section with keys"""
+    operations = []
+
+    for path in paths:
+        value = doc.get(path)
+
+        if value is not None:
+            operations.append((_SET, path, aloe.cache.encode_value(value)))
+            continue
+
+        scope = doc._find_scope(parse_path(path)[0])
+
+        if scope is None:
+            operations.append((_REMOVE, path, None))
+        elif not scope:
+            operations.append((_CLEAR, path, None))
+        else:
+            return None
+
+    return operations
@@ -76,8 +76,12 @@ def lex(text: str) -> list[Token]:
 
         return ch
 
-    def push_token(type: TokenType, value: TokenValueType = None) -> None:
-        value = value
+    def push_token(
+        type: TokenType,
+        value: TokenValueType = None,
+        position: tuple[int, int] | None = None,
+    ) -> None:
+        """`position` is where the token starts, defaults to the current one"""
 
         match type:
             case TokenType.EQUALS:
@@ -99,7 +103,10 @@ def lex(text: str) -> list[Token]:
             case TokenType.NEWLINE:
                 value = symbols.NEWLINE
 
-        tokens.append(Token(type=type, value=value, position=state.into_tuple()))
+        if position is None:
+            position = state.into_tuple()
+
+        tokens.append(Token(type=type, value=value, position=position))
 
     while state.index < len(text):
         ch = text[state.index]
@@ -132,6 +139,7 @@ def lex(text: str) -> list[Token]:
             push_token(TokenType.EQUALS)
             advance()
         elif ch == symbols.COMMENT:
+            start = state.into_tuple()
             advance()
 
             if text[state.index].isspace():
@@ -143,11 +151,12 @@ def lex(text: str) -> list[Token]:
                 buffer += text[state.index]
                 advance()
 
-            push_token(TokenType.COMMENT, buffer)
+            push_token(TokenType.COMMENT, buffer, start)
         elif ch == symbols.SECTION_PREFIX:
             push_token(TokenType.SECTION_PREFIX)
             advance()
         elif ch.isalpha() or ch == "_":
+            start = state.into_tuple()
             buffer = ""
 
             while state.index < len(text) and (
@@ -157,14 +166,15 @@ def lex(text: str) -> list[Token]:
                 advance()
 
             if buffer.lower() == "true":
-                push_token(TokenType.BOOLEAN, True)
+                push_token(TokenType.BOOLEAN, True, start)
             elif buffer.lower() == "false":
-                push_token(TokenType.BOOLEAN, False)
+                push_token(TokenType.BOOLEAN, False, start)
             elif buffer.lower() == "null":
-                push_token(TokenType.NULL)
+                push_token(TokenType.NULL, position=start)
             else:
-                push_token(TokenType.IDENTIFIER, buffer)
+                push_token(TokenType.IDENTIFIER, buffer, start)
         elif ch.isdigit() or ch == "-":
+            start = state.into_tuple()
             buffer = ""
 
             while state.index < len(text) and (
@@ -174,12 +184,13 @@ def lex(text: str) -> list[Token]:
                 advance()
 
             if is_number(buffer):
-                push_token(TokenType.NUMBER, int(buffer))
+                push_token(TokenType.NUMBER, int(buffer), start)
             elif is_float(buffer):
-                push_token(TokenType.NUMBER, float(buffer))
+                push_token(TokenType.NUMBER, float(buffer), start)
             else:
-                push_token(TokenType.IDENTIFIER, buffer)
+                push_token(TokenType.IDENTIFIER, buffer, start)
         elif ch == symbols.DOUBLE_QUOTE:
+            start = state.into_tuple()
             advance()
 
             buffer = ""
@@ -194,7 +205,7 @@ def lex(text: str) -> list[Token]:
             if text[state.index] == symbols.DOUBLE_QUOTE:
                 advance()
 
-            push_token(TokenType.STRING, buffer)
+            push_token(TokenType.STRING, buffer, start)
         else:
             push_token(TokenType.ILLEGAL, ch)
             advance()
@@ -0,0 +1,176 @@
+"""Layered documents"""
+
+import threading
+
+from collections import OrderedDict
+from collections.abc import Collection, Iterator
+
+from .ast import AssignmentValueType, select_element
+from .document import AloeDocument
+from .path import PATH_SEPARATOR, parse_path
+from .symbols import LBRACKET
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+class AloeStack:
+    """
+    Ordered layers of documents, later layers override earlier ones
+
+    Sections are merged: a key is looked up in every layer, from the last to
+    the first, so a layer only has to contain the keys it overrides. Keys
+    are replaced as a whole, arrays are not merged
+
+    The last `cache_size` lookups are cached, a mutation or reload of one
+    of the layers drops the cached paths at or under the paths it changed
+
+    Example:
+
+    ```python
+    from aloe.overlay import AloeStack
+
+    config = AloeStack(
+        AloeDocument.from_file("defaults.aloe"),
+        AloeDocument.from_file("production.aloe"),
+        AloeDocument.from_file("local.aloe"),
+    )
+
+    config.get("database.pool.timeout")
+    ```
+    """
+
+    def __init__(self, *layers: AloeDocument, cache_size: int = DEFAULT_CACHE_SIZE):
+        self._layers: list[AloeDocument] = []
+        self.cache_size = cache_size
+        # Path -> value, least recently used first
+        self._cache: OrderedDict[str, AssignmentValueType | None] = OrderedDict()
+        # Bumped by `push` and `pop`, see `_state`
+        self._version = 0
+        self._lock = threading.Lock()
+
+        for layer in layers:
+            self.push(layer)
+
+    @property
+    def layers(self) -> tuple[AloeDocument, ...]:
+        """Layers from the lowest to the highest priority"""
+        return tuple(self._layers)
+
+    def push(self, layer: AloeDocument) -> None:
+        """Add `layer` on top of the others"""
+        with self._lock:
+            self._layers.append(layer)
+            self._version += 1
+            self._cache.clear()
+
+        layer._add_listener(self._layer_changed)
+
+    def pop(self) -> AloeDocument:
+        """Remove the top layer"""
+        with self._lock:
+            layer = self._layers.pop()
+            self._version += 1
+            self._cache.clear()
+
+        layer._remove_listener(self._layer_changed)
+
+        return layer
+
+    def _layer_changed(
+        self, layer: AloeDocument, paths: Collection[str] | None
+    ) -> None:
+        with self._lock:
+            if paths is None:
+                self._cache.clear()
+                return None
+
+            changed = set(paths)
+            stale = [path for path in self._cache if _under(path, changed)]
+
+            for path in stale:
+                del self._cache[path]
+
+    def _state(self) -> tuple[int, ...]:
+        """Changes whenever a cached value may become stale"""
+        return (self._version, *(layer._generation for layer in self._layers))
+
+    def get(self, path: str) -> AssignmentValueType | None:
+        """Value of `path` in the highest layer that has it, `None` if none does"""
+        with self._lock:
+            try:
+                value = self._cache[path]
+            except KeyError:
+                pass
+            else:
+                self._cache.move_to_end(path)
+                return value
+
+            state = self._state()
+            layers = list(self._layers)
+
+        _, indices = parse_path(path)
+        key = path.partition(LBRACKET)[0] if indices else path
+        value = None
+
+        for layer in reversed(layers):
+            node = layer._key_index().get(key)
+
+            if node is not None:
+                value = node.value
+                break
+
+        if value is not None:
+            value = select_element(value, indices)
+
+        with self._lock:
+            # A layer changed while resolving, the value may already be stale
+            if self._state() == state:
+                self._cache[path] = value
+
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return value
+
+    def layer_of(self, path: str) -> AloeDocument | None:
+        """The layer `path` is resolved from"""
+        key = path.partition(LBRACKET)[0]
+
+        for layer in reversed(self._layers):
+            if key in layer:
+                return layer
+
+        return None
+
+    def keys(self) -> Iterator[str]:
+        """Dotted paths of every key, in the order of the first layer they are in"""
+        seen: set[str] = set()
+
+        for layer in self._layers:
+            for key in layer.keys():
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+
+    def items(self) -> Iterator[tuple[str, AssignmentValueType | None]]:
+        return ((key, self.get(key)) for key in self.keys())
+
+    def __contains__(self, path: str) -> bool:
+        return any(path in layer for layer in self._layers)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.keys())
+
+
+def _under(path: str, changed: set[str]) -> bool:
+    """`path` is at or under one of the `changed` paths"""
+    key = path.partition(LBRACKET)[0]
+
+    while True:
+        if key in changed:
+            return True
+
+        key, separator, _ = key.rpartition(PATH_SEPARATOR)
+
+        if not separator:
+            return False
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from aloe.lexer import TokenType, Token
+import aloe.symbols as symbols
 from aloe.ast import (
     AST_ItemType,
     Document,
@@ -8,6 +9,7 @@ from aloe.ast import (
     CommentNode,
     BlankLineNode,
     AssignmentNode,
+    IncludeNode,
     Null,
 )
 
@@ -241,6 +243,7 @@ def parse(source: str, text: str, tokens: list[Token]) -> Document:
                         AssignmentNode(
                             key=str(prev_token.value),
                             value=value,
+                            position=prev_token.position,
                         )
                     )
                     advance(2)
@@ -248,7 +251,11 @@ def parse(source: str, text: str, tokens: list[Token]) -> Document:
                     # TODO: parse array
                     advance()
                     current_scope.append(
-                        AssignmentNode(key=str(prev_token.value), value=parse_array())
+                        AssignmentNode(
+                            key=str(prev_token.value),
+                            value=parse_array(),
+                            position=prev_token.position,
+                        )
                     )
                 advance()
             case TokenType.SECTION_PREFIX:
@@ -261,6 +268,17 @@ def parse(source: str, text: str, tokens: list[Token]) -> Document:
                         "Expected an identifier after section prefix", next_token
                     )
 
+                if (
+                    next_token.value == symbols.INCLUDE
+                    and brace_token is not None
+                    and brace_token.type == TokenType.STRING
+                ):
+                    current_scope.append(
+                        IncludeNode(str(brace_token.value), position=token.position)
+                    )
+                    advance(3)
+                    continue
+
                 if brace_token:
                     if brace_token.type == TokenType.LBRACE:
                         is_inline = True
@@ -268,7 +286,11 @@ def parse(source: str, text: str, tokens: list[Token]) -> Document:
                         is_inline = False
 
                 sections.append(
-                    SectionNode(str(next_token.value), inline_lbrace=is_inline)
+                    SectionNode(
+                        str(next_token.value),
+                        inline_lbrace=is_inline,
+                        position=token.position,
+                    )
                 )
                 advance(2)
             case TokenType.LBRACE:
@@ -0,0 +1,54 @@
+"""Dotted key paths
+
+A path is a dot separated list of keys, optionally followed by array indices:
+
+    network.port
+    dependencies[3]
+    dependencies[0][2]
+"""
+
+from functools import lru_cache
+
+import aloe.symbols as symbols
+
+PATH_SEPARATOR = "."
+
+type KeyPath = tuple[tuple[str, ...], tuple[int, ...]]
+
+
+@lru_cache(maxsize=8192)
+def parse_path(path: str) -> KeyPath:
+    """
+    Split `path` into its keys and the trailing array indices
+
+    Example:
+        `parse_path("a.b[0][2]")` -> `(("a", "b"), (0, 2))`
+    """
+    head, bracket, tail = path.partition(symbols.LBRACKET)
+
+    keys = tuple(head.split(PATH_SEPARATOR))
+    if not all(keys):
+        raise ValueError(f"Invalid path: {path!r}")
+
+    indices: list[int] = []
+
+    if bracket:
+        tail = bracket + tail
+
+        while tail:
+            if not tail.startswith(symbols.LBRACKET):
+                raise ValueError(f"Invalid path: {path!r} (indices must come last)")
+
+            index, rbracket, tail = tail[1:].partition(symbols.RBRACKET)
+
+            if not rbracket:
+                raise ValueError(f"Invalid path: {path!r} (missing ']')")
+
+            try:
+                indices.append(int(index))
+            except ValueError:
+                raise ValueError(
+                    f"Invalid path: {path!r} (index {index!r} is not an integer)"
+                ) from None
+
+    return keys, tuple(indices)
@@ -0,0 +1,158 @@
+"""Wildcard queries over the keys of a document
+
+A pattern is a dotted path where a segment can be:
+
+    name     the key or section `name`
+    *        any single key or section
+    **       any number of sections, including none
+    glob     a `fnmatch` pattern such as `pool_*`, matched against the names
+
+The last segment names keys, the others sections. `database.**` selects
+every key under `database`, `**.timeout` every `timeout` in the document
+"""
+
+from collections.abc import Iterator
+from fnmatch import fnmatchcase
+
+from .ast import AST_ItemType, AssignmentNode, scope_tables
+from .path import PATH_SEPARATOR
+
+ANY = "*"
+ANY_DEPTH = "**"
+_GLOB_CHARACTERS = frozenset("*?[")
+
+
+class PathTrie:
+    """
+    Keys and sections of a section body, by name
+
+    Children are built the first time they are visited, so a query only
+    pays for the part of the document it reaches. Like `AloeDocument.get`
+    only the first key or section with a given name is reachable
+    """
+
+    __slots__ = ("_body", "_keys", "_sections")
+
+    def __init__(self, body: list[AST_ItemType]):
+        self._body = body
+        self._keys: dict[str, AssignmentNode] | None = None
+        self._sections: dict[str, PathTrie] | None = None
+
+    def _expand(self) -> tuple[dict[str, AssignmentNode], dict[str, "PathTrie"]]:
+        keys, sections = scope_tables(self._body)
+        self._keys = keys
+        self._sections = {name: PathTrie(node.body) for name, node in sections.items()}
+
+        return self._keys, self._sections
+
+    @property
+    def body(self) -> list[AST_ItemType]:
+        return self._body
+
+    @property
+    def keys(self) -> dict[str, AssignmentNode]:
+        if self._keys is None:
+            return self._expand()[0]
+
+        return self._keys
+
+    @property
+    def sections(self) -> dict[str, "PathTrie"]:
+        if self._sections is None:
+            return self._expand()[1]
+
+        return self._sections
+
+    def query(self, pattern: str) -> Iterator[tuple[str, AssignmentNode]]:
+        """
+        `(dotted path, node)` of the keys matching `pattern`, yielded lazily
+
+        An invalid pattern raises a `ValueError` right away
+        """
+        segments = _parse_pattern(pattern)
+        matches = _match(self, segments, 0, "")
+
+        if segments.count(ANY_DEPTH) < 2:
+            return matches
+
+        return _unique(matches)
+
+
+def _unique(
+    matches: Iterator[tuple[str, AssignmentNode]],
+) -> Iterator[tuple[str, AssignmentNode]]:
+    """Several `**` can match the same key in more than one way"""
+    seen: set[int] = set()
+
+    for path, node in matches:
+        if id(node) not in seen:
+            seen.add(id(node))
+            yield path, node
+
+
+def _parse_pattern(pattern: str) -> list[str]:
+    segments: list[str] = []
+
+    for segment in pattern.split(PATH_SEPARATOR):
+        if not segment:
+            raise ValueError(f"Empty segment in pattern {pattern!r}")
+
+        # `**.**` is the same as `**`
+        if segment == ANY_DEPTH and segments and segments[-1] == ANY_DEPTH:
+            continue
+
+        segments.append(segment)
+
+    return segments
+
+
+def _names(table: dict, segment: str) -> Iterator[str]:
+    """Names in `table` matched by `segment`"""
+    if segment == ANY:
+        yield from table
+    elif _GLOB_CHARACTERS.isdisjoint(segment):
+        if segment in table:
+            yield segment
+    else:
+        yield from (name for name in table if fnmatchcase(name, segment))
+
+
+def _match(
+    trie: PathTrie, segments: list[str], i: int, prefix: str
+) -> Iterator[tuple[str, AssignmentNode]]:
+    segment = segments[i]
+
+    if segment == ANY_DEPTH:
+        if i == len(segments) - 1:
+            yield from _all_keys(trie, prefix)
+            return
+
+        # `**` matching no section, then one more section and still `**`
+        yield from _match(trie, segments, i + 1, prefix)
+
+        for name, child in trie.sections.items():
+            yield from _match(child, segments, i, prefix + name + PATH_SEPARATOR)
+
+        return
+
+    if i == len(segments) - 1:
+        keys = trie.keys
+
+        for name in _names(keys, segment):
+            yield prefix + name, keys[name]
+
+        return
+
+    sections = trie.sections
+
+    for name in _names(sections, segment):
+        child = sections[name]
+        yield from _match(child, segments, i + 1, prefix + name + PATH_SEPARATOR)
+
+
+def _all_keys(trie: PathTrie, prefix: str) -> Iterator[tuple[str, AssignmentNode]]:
+    for name, node in trie.keys.items():
+        yield prefix + name, node
+
+    for name, child in trie.sections.items():
+        yield from _all_keys(child, prefix + name + PATH_SEPARATOR)
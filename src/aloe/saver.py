@@ -0,0 +1,129 @@
+"""Coalesced saving of documents"""
+
+import threading
+
+from collections.abc import Callable, Collection
+from typing import Protocol
+
+from .ast import DEFAULT_INDENT_STEP
+from .document import AloeDocument
+
+DEFAULT_SAVE_INTERVAL = 1.0
+
+
+class Cancellable(Protocol):
+    def cancel(self) -> None: ...
+
+
+type Scheduler = Callable[[float, Callable[[], None]], Cancellable]
+
+
+def thread_timer(delay: float, callback: Callable[[], None]) -> Cancellable:
+    """Call `callback` from a daemon thread after `delay` seconds"""
+    timer = threading.Timer(delay, callback)
+    timer.daemon = True
+    timer.start()
+
+    return timer
+
+
+class CoalescingSaver:
+    """
+    Save a document at most once per `interval` while it is being mutated
+
+    The first mutation schedules a save `interval` seconds later, every
+    mutation until then is written by that same save
+
+    By default the save runs on a timer thread, in an asyncio program pass
+    `scheduler=loop.call_later` to save from the event loop instead. The
+    save holds the lock of the document, it waits for a mutation or a
+    transaction in progress and never writes it half applied
+
+    Example:
+
+    ```python
+    from aloe.saver import CoalescingSaver
+
+    with CoalescingSaver(doc, interval=0.5):
+        for i in range(10_000):
+            doc.set("counter", i)
+    # one or a few writes instead of 10k
+    ```
+    """
+
+    def __init__(
+        self,
+        doc: AloeDocument,
+        interval: float = DEFAULT_SAVE_INTERVAL,
+        filename: str | None = None,
+        atomic: bool = True,
+        compact: bool = False,
+        indent_level_step: int = DEFAULT_INDENT_STEP,
+        scheduler: Scheduler = thread_timer,
+    ):
+        self.doc = doc
+        self.interval = interval
+        self.filename = filename
+        self.atomic = atomic
+        self.compact = compact
+        self.indent_level_step = indent_level_step
+        # Number of times the document was written
+        self.saves = 0
+        self._scheduler = scheduler
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._pending: Cancellable | None = None
+
+        doc._add_listener(self._changed)
+
+    def _changed(self, doc: AloeDocument, paths: Collection[str] | None) -> None:
+        with self._lock:
+            self._dirty = True
+
+            if self._pending is None:
+                self._pending = self._scheduler(self.interval, self.flush)
+
+    @property
+    def dirty(self) -> bool:
+        """The document has changes that aren't saved yet"""
+        return self._dirty
+
+    def flush(self) -> None:
+        """Save now if there are unsaved changes"""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.cancel()
+                self._pending = None
+
+            if not self._dirty:
+                return None
+
+            self._dirty = False
+
+        # `save` holds the lock of the document while serializing it, a
+        # mutation running on another thread is never half written
+        try:
+            self.doc.save(
+                self.filename,
+                compact=self.compact,
+                indent_level_step=self.indent_level_step,
+                atomic=self.atomic,
+            )
+        except BaseException:
+            with self._lock:
+                self._dirty = True
+            raise
+
+        with self._lock:
+            self.saves += 1
+
+    def close(self) -> None:
+        """Save the pending changes and stop following the document"""
+        self.doc._remove_listener(self._changed)
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,466 @@
+"""Validation of documents against schemas
+
+A schema is itself an aloe document. Every section of the schema describes
+the key or section of the same name, with these rules:
+
+    type        one of the names in `TYPES` or an array of them, defaults
+                to "section"
+    required    the key or section must be present, defaults to false
+    values      array of the allowed values
+    min, max    bounds of numbers
+    min_length  bounds of the length of strings and arrays
+    max_length
+    items       type name, or array of them, of the elements of an array
+
+Sections also accept:
+
+    strict      keys and sections that are not described are rejected
+    allowed     array of the names of the allowed sub sections
+
+Example:
+
+```
+@database {
+    required = true
+
+    @port {
+        type = "int"
+        required = true
+        min = 1
+        max = 65535
+    }
+}
+```
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Self
+
+from .ast import (
+    AST_ItemType,
+    Array,
+    AssignmentNode,
+    AssignmentValueType,
+    Document,
+    Null,
+    Position,
+    SectionNode,
+    same,
+    scope_tables,
+)
+from .document import AloeDocument
+from .parser import ParserSyntaxError
+from .path import PATH_SEPARATOR
+
+TYPES = frozenset(
+    ["string", "int", "float", "number", "bool", "null", "array", "section", "any"]
+)
+
+_KEY_RULES = frozenset(
+    ["type", "required", "values", "min", "max", "min_length", "max_length", "items"]
+)
+_SECTION_RULES = frozenset(["type", "required", "strict", "allowed"])
+
+
+class SchemaError(ValueError):
+    """Invalid schema, `position` is where the offending rule is"""
+
+    def __init__(self, message: str, source: str | None, position: Position | None):
+        super().__init__(message)
+        self.message = message
+        self.source = source
+        self.position = position
+
+    def __str__(self):
+        return _located(self.source, self.position, self.message)
+
+
+@dataclass(frozen=True, slots=True)
+class Violation:
+    # Dotted path of the offending key or section, "" for the whole file
+    path: str
+    message: str
+    source: str | None = None
+    position: Position | None = None
+
+    def __str__(self):
+        message = f"{self.path}: {self.message}" if self.path else self.message
+        return _located(self.source, self.position, message)
+
+
+@dataclass(slots=True)
+class _Rule:
+    section: bool
+    required: bool = False
+    # `None` accepts any type
+    types: frozenset[str] | None = None
+    values: tuple[AssignmentValueType, ...] | None = None
+    minimum: int | float | None = None
+    maximum: int | float | None = None
+    min_length: int | None = None
+    max_length: int | None = None
+    items: frozenset[str] | None = None
+    strict: bool = False
+    allowed: frozenset[str] | None = None
+    children: dict[str, "_Rule"] = field(default_factory=dict)
+    # Names of the required keys and sections, checked once the scope is walked
+    required_keys: tuple[str, ...] = ()
+    required_sections: tuple[str, ...] = ()
+
+
+class Schema:
+    """
+    Compiled schema
+
+    The schema is checked and compiled once, then `validate` checks a
+    document in a single walk and reports every violation
+
+    Example:
+
+    ```python
+    from aloe.schema import Schema
+
+    schema = Schema.from_file("config.schema.aloe")
+
+    for violation in schema.validate(doc.document, doc.filename):
+        print(violation)
+
+    # many files with the same schema
+    for filename, violations in schema.validate_files(filenames).items():
+        ...
+    ```
+    """
+
+    def __init__(self, document: Document, source: str | None = None):
+        """Compile `document`, raise a `SchemaError` if it isn't a valid schema"""
+        self._source = source
+        self._root = _Rule(section=True)
+        self._compile_scope(self._root, document._items)
+
+    @classmethod
+    def from_text(cls, text: str) -> Self:
+        return cls(AloeDocument.from_text(text).document)
+
+    @classmethod
+    def from_file(cls, filename: str) -> Self:
+        return cls(AloeDocument.from_file(filename).document, filename)
+
+    def validate(
+        self, document: Document, source: str | None = None
+    ) -> list[Violation]:
+        """Violations of `document`, `source` is the file it was read from"""
+        violations: list[Violation] = []
+        _validate_scope(self._root, document._items, "", None, source, violations)
+
+        return violations
+
+    def validate_files(
+        self, filenames: Iterable[str], cache: bool = False
+    ) -> dict[str, list[Violation]]:
+        """
+        Violations of every file in `filenames`
+
+        A file that fails to parse or can't be read has its syntax error or
+        the reading error as the only violation, `cache` is passed to
+        `AloeDocument.from_file`
+        """
+        results = {}
+
+        for filename in filenames:
+            try:
+                doc = AloeDocument.from_file(filename, cache=cache)
+            except ParserSyntaxError as e:
+                results[filename] = [Violation("", e.message, filename, e.position)]
+            except OSError as e:
+                results[filename] = [Violation("", e.strerror or str(e), filename)]
+            else:
+                results[filename] = self.validate(doc.document, filename)
+
+        return results
+
+    def _error(
+        self, message: str, node: AssignmentNode | SectionNode | None
+    ) -> SchemaError:
+        position = None if node is None else node.position
+        return SchemaError(message, self._source, position)
+
+    def _compile_scope(self, rule: _Rule, scope: list[AST_ItemType]) -> None:
+        assignments, sections = scope_tables(scope)
+
+        for name in assignments:
+            if name not in _SECTION_RULES:
+                raise self._error(f"Unknown section rule {name!r}", assignments[name])
+
+        rule.required = self._bool(assignments.get("required"))
+        rule.strict = self._bool(assignments.get("strict"))
+
+        if "allowed" in assignments:
+            rule.allowed = frozenset(self._strings(assignments["allowed"]))
+
+        for name, section in sections.items():
+            rule.children[name] = self._compile(section)
+
+        rule.required_keys = tuple(
+            name
+            for name, child in rule.children.items()
+            if child.required and not child.section
+        )
+        rule.required_sections = tuple(
+            name
+            for name, child in rule.children.items()
+            if child.required and child.section
+        )
+
+    def _compile(self, section: SectionNode) -> _Rule:
+        assignments, sections = scope_tables(section.body)
+        type_node = assignments.get("type")
+        types = frozenset(["section"])
+
+        if type_node is not None:
+            types = self._types(type_node)
+
+        if "section" in types:
+            if len(types) > 1:
+                message = "'section' can't be mixed with other types"
+                raise self._error(message, type_node)
+
+            rule = _Rule(section=True)
+            self._compile_scope(rule, section.body)
+            return rule
+
+        if sections:
+            sub = next(iter(sections.values()))
+            raise self._error("Only sections can describe sub sections", sub)
+
+        for name in assignments:
+            if name not in _KEY_RULES:
+                raise self._error(f"Unknown key rule {name!r}", assignments[name])
+
+        rule = _Rule(section=False, required=self._bool(assignments.get("required")))
+
+        if "any" not in types:
+            rule.types = _expand(types)
+        if "items" in assignments:
+            node = assignments["items"]
+            items = self._types(node)
+
+            if "section" in items:
+                raise self._error("Array elements can't be sections", node)
+
+            rule.items = None if "any" in items else _expand(items)
+        if "values" in assignments:
+            node = assignments["values"]
+            if not isinstance(node.value, Array):
+                raise self._error("Expected an array of values", node)
+            rule.values = tuple(node.value)
+
+        rule.minimum = self._number(assignments.get("min"))
+        rule.maximum = self._number(assignments.get("max"))
+        rule.min_length = self._length(assignments.get("min_length"))
+        rule.max_length = self._length(assignments.get("max_length"))
+
+        for low, high, name in (
+            (rule.minimum, rule.maximum, "max"),
+            (rule.min_length, rule.max_length, "max_length"),
+        ):
+            if low is not None and high is not None and low > high:
+                message = f"{name!r} is less than its minimum"
+                raise self._error(message, assignments[name])
+
+        return rule
+
+    def _types(self, node: AssignmentNode) -> frozenset[str]:
+        types = frozenset(self._strings(node))
+
+        for name in types - TYPES:
+            raise self._error(f"Unknown type {name!r}", node)
+
+        return types
+
+    def _strings(self, node: AssignmentNode) -> list[str]:
+        values = node.value if isinstance(node.value, Array) else [node.value]
+        strings = [value for value in values if isinstance(value, str)]
+
+        if len(strings) != len(values):
+            raise self._error(f"{node.key!r} must be a string or strings", node)
+
+        return strings
+
+    def _bool(self, node: AssignmentNode | None) -> bool:
+        if node is None:
+            return False
+        if not isinstance(node.value, bool):
+            raise self._error(f"{node.key!r} must be a boolean", node)
+
+        return node.value
+
+    def _number(self, node: AssignmentNode | None) -> int | float | None:
+        if node is None:
+            return None
+        # `bool` is an `int` but not a number here
+        if isinstance(node.value, bool) or not isinstance(node.value, int | float):
+            raise self._error(f"{node.key!r} must be a number", node)
+
+        return node.value
+
+    def _length(self, node: AssignmentNode | None) -> int | None:
+        if node is None:
+            return None
+        if type(node.value) is not int or node.value < 0:
+            raise self._error(f"{node.key!r} must be a positive integer", node)
+
+        return node.value
+
+
+def _expand(types: frozenset[str]) -> frozenset[str]:
+    return types | {"int", "float"} if "number" in types else types
+
+
+def _type_of(value: AssignmentValueType) -> str:
+    match value:
+        case bool():
+            return "bool"
+        case int():
+            return "int"
+        case float():
+            return "float"
+        case str():
+            return "string"
+        case Array():
+            return "array"
+
+    return "null"
+
+
+def _located(source: str | None, position: Position | None, message: str) -> str:
+    if position is not None:
+        line, column = position
+        return f"{source or '<text>'}:{line}:{column}: {message}"
+    if source is not None:
+        return f"{source}: {message}"
+
+    return message
+
+
+def _validate_scope(
+    rule: _Rule,
+    scope: list[AST_ItemType],
+    prefix: str,
+    position: Position | None,
+    source: str | None,
+    out: list[Violation],
+) -> None:
+    keys: set[str] = set()
+    sections: set[str] = set()
+
+    for node in scope:
+        match node:
+            case AssignmentNode():
+                name, seen = node.key, keys
+            case SectionNode():
+                name, seen = node.name, sections
+            case _:
+                continue
+
+        path = prefix + name
+        kind = "section" if seen is sections else "key"
+
+        if name in seen:
+            message = f"Duplicate {kind}, only the first one is used"
+            out.append(Violation(path, message, source, node.position))
+            continue
+
+        seen.add(name)
+
+        if kind == "section" and rule.allowed is not None and name not in rule.allowed:
+            out.append(Violation(path, "Section not allowed", source, node.position))
+            continue
+
+        child = rule.children.get(name)
+
+        if child is None:
+            if rule.strict:
+                message = f"Unexpected {kind}"
+                out.append(Violation(path, message, source, node.position))
+        elif isinstance(node, SectionNode):
+            if child.section:
+                path += PATH_SEPARATOR
+                _validate_scope(child, node.body, path, node.position, source, out)
+            else:
+                message = f"Expected {_expected(child.types)}, got a section"
+                out.append(Violation(path, message, source, node.position))
+        elif child.section:
+            message = f"Expected a section, got {_type_of(node.value)}"
+            out.append(Violation(path, message, source, node.position))
+        else:
+            _validate_value(child, node.value, path, node.position, source, out)
+
+    for name in rule.required_keys:
+        if name not in keys:
+            path = prefix + name
+            out.append(Violation(path, "Missing required key", source, position))
+
+    for name in rule.required_sections:
+        if name not in sections:
+            path = prefix + name
+            out.append(Violation(path, "Missing required section", source, position))
+
+
+def _validate_value(
+    rule: _Rule,
+    value: AssignmentValueType,
+    path: str,
+    position: Position | None,
+    source: str | None,
+    out: list[Violation],
+) -> None:
+    kind = _type_of(value)
+
+    if rule.types is not None and kind not in rule.types:
+        message = f"Expected {_expected(rule.types)}, got {kind}"
+        out.append(Violation(path, message, source, position))
+        return
+
+    if rule.values is not None and not any(same(value, v) for v in rule.values):
+        message = f"{_show(value)} is not one of the allowed values"
+        out.append(Violation(path, message, source, position))
+
+    if kind in ("int", "float") and isinstance(value, int | float):
+        if rule.minimum is not None and value < rule.minimum:
+            message = f"{value} is less than the minimum {rule.minimum}"
+            out.append(Violation(path, message, source, position))
+        if rule.maximum is not None and value > rule.maximum:
+            message = f"{value} is more than the maximum {rule.maximum}"
+            out.append(Violation(path, message, source, position))
+
+    if isinstance(value, str | Array):
+        length = len(value)
+
+        if rule.min_length is not None and length < rule.min_length:
+            message = f"Length {length} is less than the minimum {rule.min_length}"
+            out.append(Violation(path, message, source, position))
+        if rule.max_length is not None and length > rule.max_length:
+            message = f"Length {length} is more than the maximum {rule.max_length}"
+            out.append(Violation(path, message, source, position))
+
+    if rule.items is not None and isinstance(value, Array):
+        for index, element in enumerate(value):
+            if _type_of(element) not in rule.items:
+                message = f"Expected {_expected(rule.items)}, got {_type_of(element)}"
+                element_path = f"{path}[{index}]"
+                out.append(Violation(element_path, message, source, position))
+
+
+def _expected(types: frozenset[str] | None) -> str:
+    if types is None:
+        return "any"
+
+    return " or ".join(sorted(types))
+
+
+def _show(value: AssignmentValueType) -> str:
+    if value is Null:
+        return "null"
+
+    return repr(value)
@@ -0,0 +1,294 @@
+"""Sidecar index of the sections of a file
+
+`example.aloe` gets an `example.aloei` next to it that holds, for every
+section, the byte ranges of its own body: its keys, comments and blank
+lines, without its sub sections. Looking a key up seeks to those ranges
+and lexes and parses only them, instead of the whole file
+
+The index is keyed by the source path, size, mtime and content hash, like
+the compiled cache of `aloe.cache`, and rebuilt when the file changed
+"""
+
+import marshal
+import os
+
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import Self
+
+from .ast import AssignmentNode, AssignmentValueType, select_element
+from .cache import content_hash
+from .document import AloeDocument
+from .files import write_atomic
+from .lexer import Token, TokenType, lex
+from .parser import parse
+from .path import PATH_SEPARATOR, parse_path
+from .symbols import INCLUDE, NEWLINE
+
+INDEX_SUFFIX = "i"
+MAGIC = b"ALOEI"
+# Bumped whenever the layout changes, older indexes are rebuilt
+FORMAT_VERSION = 1
+
+type Ranges = tuple[tuple[int, int], ...]
+
+
+def index_path(filename: str) -> str:
+    return filename + INDEX_SUFFIX
+
+
+class SectionIndex:
+    """
+    Byte ranges of the sections of `filename`, `""` is the top level
+
+    Like `AloeDocument.get`, only the first section with a given name is
+    indexed. Files with includes are not indexed, `get` loads them whole.
+    `get` checks the size and mtime of the file against the ones indexed and
+    loads the index again when the file changed
+
+    Example:
+
+    ```python
+    from aloe.section_index import SectionIndex
+
+    index = SectionIndex.load("huge.aloe")
+
+    index.get("services.billing.replicas")
+    ```
+    """
+
+    __slots__ = ("filename", "sections", "includes", "size", "mtime_ns")
+
+    def __init__(
+        self,
+        filename: str,
+        sections: dict[str, Ranges],
+        includes: bool,
+        size: int = -1,
+        mtime_ns: int = -1,
+    ):
+        self.filename = filename
+        self.sections = sections
+        self.includes = includes
+        # Of the indexed file, -1 if unknown
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    @classmethod
+    def load(cls, filename: str) -> Self:
+        """
+        Read the index of `filename`, building it if it is missing or stale
+
+        Failing to write the index is not an error
+        """
+        st = os.stat(filename)
+        path = os.path.abspath(filename)
+        header = _read_header(index_path(filename))
+
+        if header is not None and header[0] != path:
+            header = None
+
+        if header is not None and header[1:3] == (st.st_size, st.st_mtime_ns):
+            return cls(filename, header[5], header[4], st.st_size, st.st_mtime_ns)
+
+        with open(filename, "rb") as f:
+            data = f.read()
+            st = os.fstat(f.fileno())
+
+        text = data.decode()
+        digest = content_hash(text)
+
+        if header is not None and header[3] == digest:
+            index = cls(filename, header[5], header[4])
+        else:
+            index = cls.build(filename, text)
+
+        index.size = st.st_size
+        index.mtime_ns = st.st_mtime_ns
+
+        try:
+            write_atomic(
+                index_path(filename),
+                marshal.dumps(
+                    (
+                        MAGIC,
+                        FORMAT_VERSION,
+                        path,
+                        st.st_size,
+                        st.st_mtime_ns,
+                        digest,
+                        index.includes,
+                        index.sections,
+                    )
+                ),
+                durable=False,
+            )
+        except OSError:
+            pass
+
+        return index
+
+    @classmethod
+    def build(cls, filename: str, text: str) -> Self:
+        """
+        Index `text`, the content of `filename`
+
+        The whole text is parsed first, a syntax error raises a
+        `ParserSyntaxError` and nothing is indexed
+        """
+        tokens = lex(text)
+        parse(filename, text, tokens)
+
+        return cls(filename, *_index_tokens(text, tokens))
+
+    def get(self, path: str) -> AssignmentValueType | None:
+        """Same as `AloeDocument.from_file(filename).get(path)`"""
+        keys, indices = parse_path(path)
+
+        with open(self.filename, "rb") as f:
+            st = os.fstat(f.fileno())
+
+            if (st.st_size, st.st_mtime_ns) != (self.size, self.mtime_ns):
+                self._reload()
+
+                # Changed again since it was opened
+                if (st.st_size, st.st_mtime_ns) != (self.size, self.mtime_ns):
+                    return self.get(path)
+
+            if self.includes:
+                return AloeDocument.from_file(self.filename).get(path)
+
+            ranges = self.sections.get(PATH_SEPARATOR.join(keys[:-1]))
+
+            if ranges is None:
+                return None
+
+            chunks = []
+
+            for start, end in ranges:
+                f.seek(start)
+                chunks.append(f.read(end - start).decode())
+
+        text = NEWLINE.join(chunks)
+
+        for node in parse(self.filename, text, lex(text))._items:
+            if isinstance(node, AssignmentNode) and node.key == keys[-1]:
+                return select_element(node.value, indices)
+
+        return None
+
+    def _reload(self) -> None:
+        index = self.load(self.filename)
+        self.sections = index.sections
+        self.includes = index.includes
+        self.size = index.size
+        self.mtime_ns = index.mtime_ns
+
+
+def lookup(filename: str, path: str) -> AssignmentValueType | None:
+    """`get` a single key of `filename` through its index"""
+    return SectionIndex.load(filename).get(path)
+
+
+def _read_header(filename: str) -> tuple | None:
+    try:
+        with open(filename, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    try:
+        magic, version, *header = marshal.loads(data)
+    except (EOFError, ValueError, TypeError):
+        return None
+
+    if magic != MAGIC or version != FORMAT_VERSION or len(header) != 6:
+        return None
+
+    return tuple(header)
+
+
+@dataclass(slots=True)
+class _Frame:
+    """Section being indexed"""
+
+    path: str
+    indexed: bool
+    # Start of the range being read
+    start: int
+    ranges: list[tuple[int, int]] = field(default_factory=list)
+    # Names of the sections in it, only the first one of a name is indexed
+    names: set[str] = field(default_factory=set)
+
+    def close_range(self, end: int) -> None:
+        if self.start < end:
+            self.ranges.append((self.start, end))
+
+
+def _index_tokens(text: str, tokens: list[Token]) -> tuple[dict[str, Ranges], bool]:
+    """Own byte ranges of every section, and whether there are includes"""
+    offset = _ByteOffsets(text)
+    sections: dict[str, Ranges] = {}
+    includes = False
+    stack = [_Frame("", True, 0)]
+    remaining: Iterator[Token] = iter(tokens)
+
+    for token in remaining:
+        match token.type:
+            case TokenType.SECTION_PREFIX:
+                name_token = next(remaining)
+                brace = next(remaining)
+
+                while brace.type in (TokenType.NEWLINE, TokenType.BLANK_LINE):
+                    brace = next(remaining)
+
+                if name_token.value == INCLUDE and brace.type == TokenType.STRING:
+                    includes = True
+                    continue
+
+                parent = stack[-1]
+                name = str(name_token.value)
+                parent.close_range(offset(token.position))
+
+                path = parent.path + PATH_SEPARATOR + name if parent.path else name
+                indexed = parent.indexed and name not in parent.names
+                stack.append(_Frame(path, indexed, offset(brace.position) + 1))
+                parent.names.add(name)
+            case TokenType.RBRACE:
+                frame = stack.pop()
+                end = offset(token.position)
+                frame.close_range(end)
+
+                if frame.indexed:
+                    sections[frame.path] = tuple(frame.ranges)
+
+                stack[-1].start = end + 1
+            case TokenType.EOF:
+                stack[0].close_range(offset.size)
+                sections[""] = tuple(stack[0].ranges)
+
+    return sections, includes
+
+
+class _ByteOffsets:
+    """Byte offset of a `(line, column)` position of `text`"""
+
+    def __init__(self, text: str):
+        self._lines = text.split(NEWLINE)
+        self._starts = [0]
+
+        for line in self._lines:
+            self._starts.append(self._starts[-1] + len(line.encode()) + 1)
+
+        # The last line has no newline
+        self.size = self._starts[-1] - 1
+
+    def __call__(self, position: tuple[int, int]) -> int:
+        line, column = position
+        text = self._lines[line - 1]
+        start = self._starts[line - 1]
+
+        if text.isascii():
+            return start + column - 1
+
+        return start + len(text[: column - 1].encode())
@@ -0,0 +1,284 @@
+"""Directory of documents, loaded on demand
+
+    root/
+        acme.aloe
+        globex/
+            eu.aloe
+
+`acme.database.port` is `database.port` of `root/acme.aloe` and
+`globex.eu.database.port` is `database.port` of `root/globex/eu.aloe`
+"""
+
+import os
+import threading
+
+from collections import OrderedDict
+from collections.abc import Collection, Sequence
+from dataclasses import dataclass
+
+from .ast import AssignmentValueType
+from .document import AloeDocument
+from .path import PATH_SEPARATOR, parse_path
+
+FILE_SUFFIX = ".aloe"
+DEFAULT_MAX_DOCUMENTS = 1024
+DEFAULT_MAX_BYTES = 256 << 20
+
+
+@dataclass(slots=True)
+class _Entry:
+    doc: AloeDocument
+    mtime_ns: int
+    # Size of the file, the estimated size of the document in memory
+    size: int
+    # Changed since it was loaded or saved, kept until `save`
+    dirty: bool = False
+
+
+class AloeStore:
+    """
+    Documents of the `.aloe` files under `root`, addressed by dotted paths
+
+    Every file is parsed the first time it is used and kept in an LRU
+    bounded by `max_documents` and by `max_bytes`, the total size of the
+    files standing in for the memory of their documents. Every access
+    stats the file, a document whose file changed is parsed again and one
+    whose file was removed is dropped
+
+    A document changed through the store is pinned: it is neither evicted
+    nor parsed again, even if its file changed or was removed, until `save`
+    writes it back
+
+    Example:
+
+    ```python
+    from aloe.store import AloeStore
+
+    store = AloeStore("tenants", max_documents=500)
+
+    store.get("acme.database.port")
+    store.document("acme").set("database.port", 5433)
+    store.save()
+
+    print(store.hits, store.misses, store.evictions)
+    ```
+    """
+
+    def __init__(
+        self,
+        root: str,
+        max_documents: int = DEFAULT_MAX_DOCUMENTS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.root = root
+        self.max_documents = max_documents
+        self.max_bytes = max_bytes
+        # Lookups served by a cached document, that had to parse a file and
+        # documents dropped to stay within the limits
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # Filename -> entry, least recently used first
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        """Number of cached documents"""
+        return len(self._entries)
+
+    @property
+    def bytes(self) -> int:
+        """Estimated size of the cached documents"""
+        return self._bytes
+
+    def filename(self, name: str) -> str:
+        """
+        File of the document `name`, a dotted path like `globex.eu`
+
+        Raises:
+            ValueError: A part of `name` is empty, absolute or a path, it
+                would name a file outside of `root`
+        """
+        segments = name.split(PATH_SEPARATOR)
+        _check_segments(name, segments)
+
+        return os.path.join(self.root, *segments) + FILE_SUFFIX
+
+    def document(self, name: str) -> AloeDocument:
+        """
+        Document of the file `name`, see `filename`
+
+        Raises:
+            KeyError: The file doesn't exist
+        """
+        doc = self._load(self.filename(name))
+
+        if doc is None:
+            raise KeyError(name)
+
+        return doc
+
+    def get(self, path: str) -> AssignmentValueType | None:
+        """
+        Value at `path`: the name of a document followed by a path in it
+
+        The shortest prefix of `path` that names a file is the document,
+        `None` is returned when there is no such file or no such key
+        """
+        keys, _ = parse_path(path)
+
+        for i in range(1, len(keys)):
+            _check_segments(path, keys[i - 1 : i])
+            doc = self._load(os.path.join(self.root, *keys[:i]) + FILE_SUFFIX)
+
+            if doc is not None:
+                return doc.get(path.split(PATH_SEPARATOR, i)[i])
+
+        return None
+
+    def save(self) -> int:
+        """
+        Write the changed documents to their files, return their number
+
+        They are no longer pinned once saved, and evicted if the store is over
+        its limits
+        """
+        with self._lock:
+            changed = [
+                (filename, entry)
+                for filename, entry in self._entries.items()
+                if entry.dirty
+            ]
+
+            for _, entry in changed:
+                entry.dirty = False
+
+        for filename, entry in changed:
+            try:
+                entry.doc.save(filename, atomic=True)
+                st = os.stat(filename)
+            except BaseException:
+                with self._lock:
+                    entry.dirty = True
+                raise
+
+            with self._lock:
+                # A change made meanwhile marked it dirty again
+                if self._entries.get(filename) is entry:
+                    self._bytes += st.st_size - entry.size
+
+                entry.mtime_ns, entry.size = st.st_mtime_ns, st.st_size
+
+        with self._lock:
+            self._evict()
+
+        return len(changed)
+
+    def invalidate(self, name: str | None = None) -> None:
+        """Forget the document `name`, or every document, unsaved or not"""
+        if name is not None:
+            self._drop(self.filename(name))
+            return None
+
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _changed(self, doc: AloeDocument, paths: Collection[str] | None) -> None:
+        with self._lock:
+            entry = self._entries.get(doc.filename or "")
+
+            if entry is not None and entry.doc is doc:
+                entry.dirty = True
+
+    def _load(self, filename: str) -> AloeDocument | None:
+        """Document of `filename`, `None` if there is no such file"""
+        try:
+            st: os.stat_result | None = os.stat(filename)
+        except OSError:
+            st = None
+
+        with self._lock:
+            entry = self._entries.get(filename)
+
+            if entry is not None and (
+                entry.dirty
+                or (
+                    st is not None
+                    and (entry.mtime_ns, entry.size) == (st.st_mtime_ns, st.st_size)
+                )
+            ):
+                self._entries.move_to_end(filename)
+                self.hits += 1
+                return entry.doc
+
+        if st is None:
+            self._drop(filename)
+            return None
+
+        # Parsed outside the lock, other files stay available meanwhile
+        doc = AloeDocument.from_file(filename)
+
+        with self._lock:
+            self.misses += 1
+            previous = self._entries.get(filename)
+
+            # Changed by another thread while this one was parsing
+            if previous is not None and previous.dirty:
+                self._entries.move_to_end(filename)
+                return previous.doc
+
+            if previous is not None:
+                del self._entries[filename]
+                self._bytes -= previous.size
+
+            self._entries[filename] = _Entry(doc, st.st_mtime_ns, st.st_size)
+            self._bytes += st.st_size
+            self._evict()
+
+        doc._add_listener(self._changed)
+
+        return doc
+
+    def _evict(self) -> None:
+        """
+        Drop the least recently used documents that are over the limits
+
+        The most recently used document and the changed ones are kept even
+        if they are over the limits
+        """
+        for filename in list(self._entries)[:-1]:
+            if (
+                len(self._entries) <= self.max_documents
+                and self._bytes <= self.max_bytes
+            ):
+                break
+
+            entry = self._entries[filename]
+
+            if not entry.dirty:
+                del self._entries[filename]
+                self._bytes -= entry.size
+                self.evictions += 1
+
+    def _drop(self, filename: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(filename, None)
+
+            if entry is not None:
+                self._bytes -= entry.size
+
+
+def _check_segments(name: str, segments: Sequence[str]) -> None:
+    """Reject the segments that would lead out of the root"""
+    for segment in segments:
+        if (
+            not segment
+            or segment in (os.curdir, os.pardir)
+            or os.path.isabs(segment)
+            or os.path.splitdrive(segment)[0]
+            or os.sep in segment
+            or (os.altsep is not None and os.altsep in segment)
+        ):
+            raise ValueError(f"Invalid document name: {name!r}")
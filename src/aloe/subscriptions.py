@@ -0,0 +1,137 @@
+"""Subscriptions to the changes under a path
+
+Subscriptions are stored in a trie of path segments, a change of
+`database.pool.timeout` only visits the nodes for `database`,
+`database.pool` and `database.pool.timeout`, whatever the number of
+subscriptions elsewhere in the document
+"""
+
+from collections.abc import Callable, Collection
+
+from .path import PATH_SEPARATOR, parse_path
+
+# Called with the changed paths under the subscribed prefix
+type Callback = Callable[[list[str]], None]
+
+
+class Subscription:
+    """Returned by `AloeDocument.subscribe`, `cancel` stops the notifications"""
+
+    __slots__ = ("prefix", "callback", "_node")
+
+    def __init__(self, prefix: str, callback: Callback, node: "SubscriptionTrie"):
+        self.prefix = prefix
+        self.callback = callback
+        self._node: SubscriptionTrie | None = node
+
+    def __repr__(self):
+        return f"Subscription({self.prefix!r})"
+
+    @property
+    def active(self) -> bool:
+        return self._node is not None
+
+    def cancel(self) -> None:
+        """Stop the notifications, cancelling twice is harmless"""
+        if self._node is not None:
+            self._node._remove(self)
+            self._node = None
+
+
+class SubscriptionTrie:
+    """A node per path segment, holding the subscriptions to that path"""
+
+    __slots__ = ("_parent", "_name", "_children", "_subscriptions")
+
+    def __init__(self, parent: "SubscriptionTrie | None" = None, name: str = ""):
+        self._parent = parent
+        self._name = name
+        self._children: dict[str, SubscriptionTrie] = {}
+        self._subscriptions: list[Subscription] = []
+
+    def __bool__(self) -> bool:
+        return bool(self._children or self._subscriptions)
+
+    def add(self, prefix: str, callback: Callback) -> Subscription:
+        keys, indices = parse_path(prefix)
+        if indices:
+            raise ValueError(f"Cannot subscribe to an array element: {prefix!r}")
+
+        node = self
+
+        for key in keys:
+            child = node._children.get(key)
+
+            if child is None:
+                child = node._children[key] = SubscriptionTrie(node, key)
+
+            node = child
+
+        subscription = Subscription(prefix, callback, node)
+        node._subscriptions.append(subscription)
+
+        return subscription
+
+    def _remove(self, subscription: Subscription) -> None:
+        self._subscriptions.remove(subscription)
+        node = self
+
+        # Drop the nodes that no longer lead to a subscription
+        while node._parent is not None and not node:
+            del node._parent._children[node._name]
+            node = node._parent
+
+    def notify(self, paths: Collection[str] | None) -> None:
+        """
+        Call every subscription whose prefix is above or below one of `paths`
+
+        Each callback is called once, with the matching paths in order. A
+        path below the prefix is passed as is, a path above it (a removed or
+        cleared section) is passed as the prefix itself. `None` means
+        anything may have changed, every callback gets its own prefix
+        """
+        matches: dict[Subscription, list[str]] = {}
+
+        if paths is None:
+            for subscription in self._all():
+                matches[subscription] = [subscription.prefix]
+        else:
+            for path in paths:
+                self._match(path, matches)
+
+        for subscription, changed in matches.items():
+            # A callback can cancel the subscriptions that come after it
+            if subscription.active:
+                subscription.callback(changed)
+
+    def _match(self, path: str, matches: dict[Subscription, list[str]]) -> None:
+        node = self
+
+        for key in path.split(PATH_SEPARATOR):
+            child = node._children.get(key)
+
+            if child is None:
+                return None
+
+            node = child
+
+            for subscription in node._subscriptions:
+                matches.setdefault(subscription, []).append(path)
+
+        for child in node._children.values():
+            for subscription in child._all():
+                changed = matches.setdefault(subscription, [])
+
+                if not changed or changed[-1] != subscription.prefix:
+                    changed.append(subscription.prefix)
+
+    def _all(self) -> list[Subscription]:
+        subscriptions: list[Subscription] = []
+        stack = [self]
+
+        while stack:
+            node = stack.pop()
+            subscriptions.extend(node._subscriptions)
+            stack.extend(node._children.values())
+
+        return subscriptions
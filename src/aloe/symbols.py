@@ -10,3 +10,5 @@ RBRACKET = "]"
 COMMA = ","
 NEWLINE = "\n"
 DOUBLE_QUOTE = '"'
+# `@include "path"`, a section prefix followed by this name and a string
+INCLUDE = "include"
@@ -0,0 +1,231 @@
+"""Hot reloading of documents loaded from files"""
+
+import heapq
+import os
+import sys
+import threading
+import time
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from .document import AloeDocument
+
+type Subscriber = Callable[[AloeDocument, set[str]], None]
+type ErrorHandler = Callable[[AloeDocument, Exception], None]
+type FileSignature = tuple[int, int, int]
+
+DEFAULT_INTERVAL = 1.0
+DEFAULT_MAX_INTERVAL = 30.0
+
+
+def file_signature(filename: str) -> FileSignature | None:
+    """`(mtime_ns, size, inode)` of `filename`, `None` if it can't be stat'ed"""
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return None
+
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+@dataclass(order=True)
+class _WatchedFile:
+    due: float
+    interval: float = field(compare=False)
+    doc: AloeDocument = field(compare=False)
+    signature: FileSignature | None = field(compare=False)
+    # Set by `Watcher.remove`, the entry may be out of the queue being polled
+    removed: bool = field(default=False, compare=False)
+
+
+class Watcher:
+    """
+    Poll files of `AloeDocument.from_file` documents and reload them on change
+
+    Every file has its own polling interval: it starts at `interval`, doubles
+    each time the file is found unchanged, up to `max_interval`, and resets
+    once the file changes. A poll only stats the files that are due, at most
+    `batch_size` of them
+
+    Example:
+
+    ```python
+    from aloe.watch import Watcher
+
+    watcher = Watcher()
+    watcher.add(AloeDocument.from_file("example.aloe"))
+    watcher.subscribe(lambda doc, changed: print(doc.filename, changed))
+    watcher.start()
+    ```
+    """
+
+    def __init__(
+        self,
+        interval: float = DEFAULT_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        batch_size: int = 1024,
+        on_error: ErrorHandler | None = None,
+    ):
+        if not 0 < interval <= max_interval:
+            raise ValueError("Expected 0 < interval <= max_interval")
+
+        self.interval = interval
+        self.max_interval = max_interval
+        self.batch_size = batch_size
+        self.on_error = on_error
+        self._queue: list[_WatchedFile] = []
+        # Entries popped by a poll that is running, not in the queue
+        self._in_poll: list[_WatchedFile] = []
+        self._subscribers: list[Subscriber] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def add(self, *docs: AloeDocument) -> None:
+        for doc in docs:
+            if doc.filename is None:
+                raise ValueError("Only documents loaded from a file can be watched")
+
+            entry = _WatchedFile(
+                due=time.monotonic() + self.interval,
+                interval=self.interval,
+                doc=doc,
+                signature=file_signature(doc.filename),
+            )
+
+            with self._lock:
+                heapq.heappush(self._queue, entry)
+
+    def remove(self, doc: AloeDocument) -> None:
+        with self._lock:
+            for entry in self._in_poll:
+                if entry.doc is doc:
+                    entry.removed = True
+
+            self._queue = [entry for entry in self._queue if entry.doc is not doc]
+            heapq.heapify(self._queue)
+
+    def subscribe(self, callback: Subscriber) -> None:
+        """`callback(doc, changed_paths)` is called after every reload"""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Subscriber) -> None:
+        self._subscribers.remove(callback)
+
+    def poll(self, now: float | None = None) -> list[tuple[AloeDocument, set[str]]]:
+        """
+        Stat the files that are due and reload the ones that changed
+
+        Returns the reloaded documents with the paths that changed
+        """
+        if now is None:
+            now = time.monotonic()
+
+        due: list[_WatchedFile] = []
+
+        with self._lock:
+            while (
+                self._queue
+                and self._queue[0].due <= now
+                and len(due) < self.batch_size
+            ):
+                due.append(heapq.heappop(self._queue))
+
+            self._in_poll.extend(due)
+
+        reloaded: list[tuple[AloeDocument, set[str]]] = []
+
+        try:
+            for entry in due:
+                changed = self._check(entry)
+
+                if changed is None:
+                    entry.interval = min(entry.interval * 2, self.max_interval)
+                else:
+                    entry.interval = self.interval
+
+                    if changed:
+                        reloaded.append((entry.doc, changed))
+
+                entry.due = now + entry.interval
+        finally:
+            polled = {id(entry) for entry in due}
+
+            with self._lock:
+                self._in_poll = [e for e in self._in_poll if id(e) not in polled]
+
+                for entry in due:
+                    if not entry.removed:
+                        heapq.heappush(self._queue, entry)
+
+        for doc, changed in reloaded:
+            for callback in list(self._subscribers):
+                callback(doc, changed)
+
+        return reloaded
+
+    def _check(self, entry: _WatchedFile) -> set[str] | None:
+        """Changed paths, `None` if the file is unchanged"""
+        assert entry.doc.filename is not None
+
+        signature = file_signature(entry.doc.filename)
+
+        # A missing file is most likely being replaced, keep the old document
+        if signature is None or signature == entry.signature:
+            return None
+
+        entry.signature = signature
+
+        # Besides syntax errors, a half written file can fail to lex or to
+        # decode, the document is kept whatever the error
+        try:
+            return entry.doc.reload()
+        except Exception as err:
+            if self.on_error is not None:
+                self.on_error(entry.doc, err)
+            return set()
+
+    def next_due(self) -> float | None:
+        """`time.monotonic()` at which the next file is due"""
+        with self._lock:
+            return self._queue[0].due if self._queue else None
+
+    def start(self) -> None:
+        """Poll from a daemon thread until `stop` is called"""
+        if self._thread is not None:
+            return None
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="aloe-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception:
+                # A failing subscriber or error handler doesn't stop the
+                # reloading, the error is reported like an uncaught one
+                sys.excepthook(*sys.exc_info())
+
+            due = self.next_due()
+            timeout = self.interval if due is None else due - time.monotonic()
+            self._stop.wait(max(timeout, 0))
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+from aloe.document import AloeDocument
+
+
+def large_text(sections: int) -> str:
+    section = "@section {\n" + '    key = "value"\n' * 40 + "}\n"
+    return section * sections
+
+
+def test_aload_asave(tmp_path):
+    path = tmp_path / "config.aloe"
+    path.write_text("key = 1\n")
+
+    async def main():
+        doc = await AloeDocument.aload(str(path))
+        doc.set("key", 2)
+        await doc.asave()
+
+    asyncio.run(main())
+
+    assert path.read_text() == "key = 2\n"
+
+
+def test_aload_many(tmp_path):
+    paths = []
+
+    for i in range(10):
+        path = tmp_path / f"{i}.aloe"
+        path.write_text(f"key = {i}\n")
+        paths.append(str(path))
+
+    docs = asyncio.run(AloeDocument.aload_many(paths, limit=3))
+
+    assert [doc.get("key") for doc in docs] == list(range(10))
+    assert [doc.filename for doc in docs] == paths
+
+
+def test_aload_keeps_event_loop_responsive(tmp_path):
+    path = tmp_path / "large.aloe"
+    path.write_text(large_text(150))
+
+    start = time.perf_counter()
+    AloeDocument.from_file(str(path))
+    blocking = time.perf_counter() - start
+
+    async def main() -> float:
+        max_lag = 0.0
+        loading = asyncio.ensure_future(AloeDocument.aload(str(path)))
+
+        while not loading.done():
+            before = time.perf_counter()
+            await asyncio.sleep(0.001)
+            max_lag = max(max_lag, time.perf_counter() - before - 0.001)
+
+        await loading
+        return max_lag
+
+    max_lag = asyncio.run(main())
+
+    # the loop keeps running while the file is parsed: its worst stall is a
+    # fraction of the time a blocking load takes
+    assert max_lag < blocking / 4, (max_lag, blocking)
@@ -0,0 +1,129 @@
+from dataclasses import dataclass, field
+
+import pytest
+
+from aloe.document import AloeDocument
+
+TEXT = """name = "app"
+debug = true
+ratio = 2
+tags = ["a", "b"]
+fallback = null
+
+@database {
+    host = "localhost"
+    port = 5432
+
+    @pool {
+        timeout = 1.5
+        sizes = [[1, 2], [3]]
+    }
+}
+"""
+
+
+@dataclass(slots=True)
+class Pool:
+    timeout: float
+    sizes: list[tuple[int, ...]]
+    max_connections: int = 10
+
+
+@dataclass(slots=True)
+class Database:
+    host: str
+    port: int
+    pool: Pool
+
+
+@dataclass(slots=True)
+class Config:
+    name: str
+    debug: bool
+    ratio: float
+    database: Database
+    tags: list[str] = field(default_factory=list)
+    fallback: str | None = "default"
+    missing: str | None = None
+
+
+def test_bind():
+    config = AloeDocument.from_text(TEXT).bind(Config)
+
+    assert config == Config(
+        name="app",
+        debug=True,
+        ratio=2.0,
+        database=Database("localhost", 5432, Pool(1.5, [(1, 2), (3,)])),
+        tags=["a", "b"],
+        fallback=None,
+    )
+    assert type(config.ratio) is float
+    assert config.database.pool.max_connections == 10
+
+
+def test_bind_section():
+    pool = AloeDocument.from_text(TEXT).bind(Pool, "database.pool")
+
+    assert pool.timeout == 1.5
+
+    with pytest.raises(KeyError):
+        AloeDocument.from_text(TEXT).bind(Pool, "database.missing")
+
+
+def test_bind_optional_section():
+    @dataclass
+    class Optional:
+        database: Database | None = None
+        cache: Pool | None = None
+
+    config = AloeDocument.from_text(TEXT).bind(Optional)
+
+    assert config.database == Database("localhost", 5432, Pool(1.5, [(1, 2), (3,)]))
+    assert config.cache is None
+
+
+def test_bind_errors():
+    @dataclass
+    class Port:
+        port: str
+
+    @dataclass
+    class Debug:
+        debug: int
+
+    @dataclass
+    class Missing:
+        user: str
+
+    @dataclass
+    class Tags:
+        tags: list[str]
+
+    doc = AloeDocument.from_text(TEXT)
+
+    with pytest.raises(ValueError, match="'database.port': expected str, got int"):
+        doc.bind(Port, "database")
+
+    # `true` is not an int
+    with pytest.raises(ValueError, match="'debug'"):
+        doc.bind(Debug)
+
+    with pytest.raises(KeyError, match="database.user"):
+        doc.bind(Missing, "database")
+
+    with pytest.raises(ValueError, match="expected array, got str"):
+        AloeDocument.from_text('tags = "a"').bind(Tags)
+
+    with pytest.raises(ValueError, match="not a dataclass"):
+        doc.bind(dict)
+
+
+def test_bind_is_a_snapshot():
+    doc = AloeDocument.from_text(TEXT)
+    database = doc.bind(Database, "database")
+
+    doc.set("database.port", 1)
+
+    assert database.port == 5432
+    assert doc.bind(Database, "database").port == 1
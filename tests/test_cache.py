@@ -0,0 +1,91 @@
+import os
+
+import aloe.cache as cache
+
+from aloe.document import AloeDocument
+
+TEXT = """# comment
+name = "app"
+nothing = null
+flags = [true, 1, 1.5, null, # comment
+    "s", [1, [2]]]
+
+@database
+{
+    port = 5432
+
+    @pool {
+        timeout = 30
+    }
+}
+"""
+
+
+def test_encode_decode_roundtrip():
+    document = AloeDocument.from_text(TEXT).document
+
+    decoded = cache.decode(cache.encode(document))
+
+    assert decoded._items == document._items
+    assert decoded.to_text() == document.to_text()
+    assert AloeDocument(decoded).get("flags[0]") is True
+    assert decoded._items[1].position == document._items[1].position == (2, 1)
+
+
+def test_from_file_cache(tmp_path, monkeypatch):
+    path = tmp_path / "config.aloe"
+    path.write_text(TEXT)
+
+    cold = AloeDocument.from_file(str(path), cache=True)
+
+    assert os.path.exists(cache.cache_path(str(path)))
+
+    # a warm load never lexes or parses
+    def fail(*args):
+        raise AssertionError("parsed")
+
+    monkeypatch.setattr(cache, "parse", fail)
+
+    warm = AloeDocument.from_file(str(path), cache=True)
+
+    assert warm.document._items == cold.document._items
+    assert warm.filename == str(path)
+
+
+def test_from_file_cache_invalidated(tmp_path):
+    path = tmp_path / "config.aloe"
+    path.write_text("key = 1\n")
+
+    assert AloeDocument.from_file(str(path), cache=True).get("key") == 1
+
+    path.write_text("key = 22\n")
+
+    assert AloeDocument.from_file(str(path), cache=True).get("key") == 22
+
+
+def test_from_file_cache_same_content_new_mtime(tmp_path, monkeypatch):
+    path = tmp_path / "config.aloe"
+    path.write_text("key = 1\n")
+
+    AloeDocument.from_file(str(path), cache=True)
+
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    def fail(*args):
+        raise AssertionError("parsed")
+
+    monkeypatch.setattr(cache, "parse", fail)
+
+    assert AloeDocument.from_file(str(path), cache=True).get("key") == 1
+
+
+def test_from_file_cache_corrupted(tmp_path):
+    path = tmp_path / "config.aloe"
+    path.write_text("key = 1\n")
+
+    with open(cache.cache_path(str(path)), "wb") as f:
+        f.write(b"garbage")
+
+    assert AloeDocument.from_file(str(path), cache=True).get("key") == 1
+    assert AloeDocument.from_file(str(path), cache=True).get("key") == 1
@@ -1,5 +1,7 @@
+import pytest
+
 from aloe.document import AloeDocument
-from aloe.ast import Array, Null
+from aloe.ast import Array, CommentNode, Null
 
 
 def test_cfg_get_string():
@@ -113,3 +115,666 @@ def test_cfg_clear_key():
     doc.clear("string")
 
     assert doc.get("string") is Null
+
+
+def test_cfg_get_array_element():
+    text = """array = [
+        # comment
+        1,
+        # comment
+        2,
+        [3, 4]
+    ]
+    """
+
+    doc = AloeDocument.from_text(text)
+
+    assert doc.get("array[0]") == 1
+    assert doc.get("array[1]") == 2
+    assert doc.get("array[2][1]") == 4
+    assert doc.get("array[-1][0]") == 3
+    assert doc.get("array[3]") is None
+    assert doc.get("array[0][0]") is None
+
+
+def test_cfg_get_nested_array_element():
+    text = """@section {
+        array = [[1, 2, 3], [4, 5, 6]]
+    }
+    """
+
+    doc = AloeDocument.from_text(text)
+
+    assert doc.get("section.array[1][2]") == 6
+
+
+def test_cfg_set_array_element_in_place():
+    text = """array = [1, # comment
+        2, 3]
+    """
+
+    doc = AloeDocument.from_text(text)
+    array = doc.get("array")
+
+    doc.set("array[1]", 20)
+
+    assert doc.get("array") is array
+    assert doc.get("array[1]") == 20
+    assert doc.document.to_text() == (
+        "array = [\n    1,\n    # comment\n    20,\n    3\n]\n"
+    )
+
+
+def test_cfg_set_array_element_out_of_range():
+    text = """array = [1, 2, 3]
+    """
+
+    doc = AloeDocument.from_text(text)
+
+    with pytest.raises(IndexError):
+        doc.set("array[3]", 4)
+
+    with pytest.raises(KeyError):
+        doc.set("missing[0]", 4)
+
+
+def test_cfg_remove_array_element():
+    text = """array = [1, 2, [3, 4]]
+    """
+
+    doc = AloeDocument.from_text(text)
+
+    doc.remove("array[0]")
+    doc.remove("array[1][0]")
+
+    assert doc.get("array") == Array.from_iter([2, Array.from_iter([4])])
+
+
+def test_cfg_clear_array_element():
+    text = """array = [1, 2, 3]
+    """
+
+    doc = AloeDocument.from_text(text)
+
+    doc.clear("array[1]")
+
+    assert doc.get("array[1]") is Null
+
+
+def test_cfg_get_missing_section_does_not_fall_through():
+    text = """port = 1
+    """
+
+    doc = AloeDocument.from_text(text)
+
+    assert doc.get("network.port") is None
+
+
+def test_cfg_clear_section_by_name():
+    text = """@first {
+        a = 1
+    }
+    @second {
+        b = 2
+    }
+    """
+
+    doc = AloeDocument.from_text(text)
+
+    doc.clear("second")
+
+    assert doc.get("first.a") == 1
+    assert doc.get("second.b") is None
+
+
+def test_array_value_positions_follow_comments():
+    array = Array.from_iter([1, 2, 3])
+
+    array.insert(0, CommentNode("first"))
+    array.insert(2, CommentNode("middle"))
+    array.append_comment("last")
+    array.append(4)
+
+    assert len(array) == 4
+    assert [array[i] for i in range(len(array))] == [1, 2, 3, 4]
+
+    array.pop(0)
+    array.remove(CommentNode("middle"))
+
+    assert array[1] == 2
+    assert array[-1] == 4
+
+    del array[0]
+
+    assert array.values == [2, 3, 4]
+    assert array[0] == 2
+
+
+def test_array_invalid_path():
+    doc = AloeDocument.from_text("")
+
+    with pytest.raises(ValueError):
+        doc.get("array[x]")
+
+    with pytest.raises(ValueError):
+        doc.get("array[0].key")
+
+
+def test_cfg_compile_path():
+    text = """@database {
+        @pool {
+            timeout = 30
+        }
+    }
+    """
+
+    doc = AloeDocument.from_text(text)
+    timeout = doc.compile_path("database.pool.timeout")
+
+    assert timeout.get() == 30
+
+    timeout.set(60)
+
+    assert timeout.get() == 60
+    assert doc.get("database.pool.timeout") == 60
+
+
+def test_cfg_compile_path_revalidates_after_mutation():
+    text = """@database {
+        timeout = 30
+    }
+    """
+
+    doc = AloeDocument.from_text(text)
+    timeout = doc.compile_path("database.timeout")
+    missing = doc.compile_path("database.port")
+
+    assert timeout.get() == 30
+    assert missing.get() is None
+
+    doc.remove("database.timeout")
+    doc.set("database.port", 5432)
+
+    assert timeout.get() is None
+    assert missing.get() == 5432
+
+    doc.set("database.timeout", 10)
+
+    assert timeout.get() == 10
+
+
+def test_cfg_compile_path_array_element():
+    text = """array = [1, 2, 3]
+    """
+
+    doc = AloeDocument.from_text(text)
+    element = doc.compile_path("array[1]")
+
+    element.set(20)
+
+    assert element.get() == 20
+    assert doc.get("array") == Array.from_iter([1, 20, 3])
+
+
+def test_cfg_compile_path_replaced_document():
+    doc = AloeDocument.from_text("key = 1")
+    key = doc.compile_path("key")
+
+    assert key.get() == 1
+
+    doc.document = AloeDocument.from_text("key = 2").document
+
+    assert key.get() == 2
+
+
+def test_cfg_keys():
+    text = """name = "app"
+    @database {
+        host = "localhost"
+        @pool {
+            timeout = 30
+        }
+    }
+    """
+
+    doc = AloeDocument.from_text(text)
+
+    assert list(doc.keys()) == ["name", "database.host", "database.pool.timeout"]
+    assert dict(doc.items())["database.pool.timeout"] == 30
+    assert "database.host" in doc
+    assert "database" not in doc
+    assert len(doc) == 3
+
+
+def test_cfg_keys_follow_mutations():
+    text = """@database {
+        host = "localhost"
+        @pool {
+            timeout = 30
+        }
+    }
+    """
+
+    doc = AloeDocument.from_text(text)
+
+    assert len(doc) == 2
+
+    doc.set("database.port", 5432)
+    doc.set("cache.redis.host", "redis")
+
+    assert "database.port" in doc
+    assert doc.get("cache.redis.host") == "redis"
+    assert len(doc) == 4
+
+    doc.remove("database.pool")
+
+    assert "database.pool.timeout" not in doc
+    assert len(doc) == 3
+
+    doc.clear("database")
+
+    assert set(doc.keys()) == {"cache.redis.host"}
+
+    doc.clear()
+
+    assert len(doc) == 0
+
+
+def test_cfg_keys_duplicate_key_revealed_on_remove():
+    text = """key = 1
+    key = 2
+    """
+
+    doc = AloeDocument.from_text(text)
+
+    assert dict(doc.items()) == {"key": 1}
+
+    doc.remove("key")
+
+    assert dict(doc.items()) == {"key": 2}
+    assert doc.get("key") == 2
+
+
+def test_cfg_get_many():
+    text = """name = "app"
+    array = [1, 2, 3]
+    @database {
+        host = "localhost"
+        @pool {
+            timeout = 30
+        }
+    }
+    """
+
+    doc = AloeDocument.from_text(text)
+
+    paths = ["database.pool.timeout", "name", "array[1]", "database.host", "missing"]
+
+    expected = {
+        "database.pool.timeout": 30,
+        "name": "app",
+        "array[1]": 2,
+        "database.host": "localhost",
+        "missing": None,
+    }
+
+    assert doc.get_many(paths) == expected
+
+    # same answers once the key index exists
+    assert len(doc) == 4
+    assert doc.get_many(paths) == expected
+
+
+def test_cfg_update():
+    text = """@database {
+        host = "localhost"
+        array = [1, 2, 3]
+    }
+    """
+
+    doc = AloeDocument.from_text(text)
+
+    assert "database.host" in doc
+
+    doc.update(
+        {
+            "database": {"host": "db", "pool.timeout": 30, "array[0]": 10},
+            "database.port": 5432,
+            "cache": {"redis": {"host": "redis"}},
+            "name": "app",
+        }
+    )
+
+    assert doc.get_many(
+        ["database.host", "database.pool.timeout", "database.port", "name"]
+    ) == {
+        "database.host": "db",
+        "database.pool.timeout": 30,
+        "database.port": 5432,
+        "name": "app",
+    }
+    assert doc.get("database.array") == Array.from_iter([10, 2, 3])
+    assert doc.get("cache.redis.host") == "redis"
+    assert "cache.redis.host" in doc
+
+
+def test_cfg_update_matches_set():
+    a = AloeDocument.from_text("")
+    b = AloeDocument.from_text("")
+
+    a.update({"x.y": 1, "x": {"z": 2}, "w": 3})
+
+    b.set("x.y", 1)
+    b.set("x.z", 2)
+    b.set("w", 3)
+
+    assert a.document.to_text() == b.document.to_text()
+
+
+def test_cfg_transaction():
+    text = """@database {
+        host = "localhost"
+        password = "secret"
+        array = [1, 2, 3]
+    }
+    """
+
+    doc = AloeDocument.from_text(text)
+
+    with doc.transaction() as tx:
+        tx.set("database.host", "db")
+        tx.set("database.pool.timeout", 30)
+        tx.remove("database.password")
+        tx.set("database.array[0]", 10)
+        tx.clear("database.array[1]")
+
+        # nothing is visible before the commit
+        assert doc.get("database.host") == "localhost"
+        assert doc.get("database.pool.timeout") is None
+
+    assert doc.get_many(
+        ["database.host", "database.pool.timeout", "database.password"]
+    ) == {
+        "database.host": "db",
+        "database.pool.timeout": 30,
+        "database.password": None,
+    }
+    assert doc.get("database.array") == Array.from_iter([10, Null, 3])
+
+
+def test_cfg_transaction_exception_in_block():
+    doc = AloeDocument.from_text("key = 1")
+
+    with pytest.raises(RuntimeError):
+        with doc.transaction() as tx:
+            tx.set("key", 2)
+            raise RuntimeError
+
+    assert doc.get("key") == 1
+
+
+def test_cfg_transaction_rollback():
+    text = """name = "app"
+    array = [1, 2]
+    @database {
+        host = "localhost"
+    }
+    """
+
+    doc = AloeDocument.from_text(text)
+    before = doc.document.to_text()
+
+    assert len(doc) == 3
+
+    with pytest.raises(KeyError):
+        with doc.transaction() as tx:
+            tx.set("name", "other")
+            tx.set("cache.redis.host", "redis")
+            tx.remove("database")
+            tx.remove("array[0]")
+            tx.clear()
+            tx.set("array[0]", 1)
+
+    assert doc.document.to_text() == before
+    assert doc.get("database.host") == "localhost"
+    assert set(doc.keys()) == {"name", "array", "database.host"}
+
+
+def test_cfg_transaction_save(tmp_path):
+    path = tmp_path / "config.aloe"
+    path.write_text("key = 1\n")
+
+    doc = AloeDocument.from_file(str(path))
+
+    with doc.transaction(save=True) as tx:
+        tx.set("key", 2)
+        tx.set("other", 3)
+
+    assert path.read_text() == "key = 2\nother = 3\n"
+
+
+def test_query():
+    doc = AloeDocument.from_text(
+        """timeout = 1
+
+@services {
+    @web {
+        port = 80
+        timeout = 2
+    }
+
+    @worker {
+        port = 81
+
+        @pool {
+            timeout = 3
+        }
+    }
+}
+
+@database {
+    port = 5432
+    pool_size = 4
+    pool_timeout = 5
+}
+"""
+    )
+
+    assert list(doc.query("services.*.port")) == [
+        ("services.web.port", 80),
+        ("services.worker.port", 81),
+    ]
+    assert list(doc.query("**.timeout")) == [
+        ("timeout", 1),
+        ("services.web.timeout", 2),
+        ("services.worker.pool.timeout", 3),
+    ]
+    assert list(doc.query("services.**")) == [
+        ("services.web.port", 80),
+        ("services.web.timeout", 2),
+        ("services.worker.port", 81),
+        ("services.worker.pool.timeout", 3),
+    ]
+    assert list(doc.query("database.pool_*")) == [
+        ("database.pool_size", 4),
+        ("database.pool_timeout", 5),
+    ]
+    assert list(doc.query("**.worker.**.timeout")) == [
+        ("services.worker.pool.timeout", 3),
+    ]
+    assert list(doc.query("**.**.timeout")) == list(doc.query("**.timeout"))
+    assert list(doc.query("missing.*")) == []
+
+    with pytest.raises(ValueError):
+        doc.query("services..port")
+
+
+def test_query_after_mutation():
+    doc = AloeDocument.from_text("@a {\n    x = 1\n}\n")
+
+    assert list(doc.query("*.x")) == [("a.x", 1)]
+
+    doc.set("b.x", 2)
+    doc.remove("a.x")
+
+    assert list(doc.query("*.x")) == [("b.x", 2)]
+
+
+def test_walk():
+    doc = AloeDocument.from_text(
+        """name = "app"
+
+@database {
+    port = 5432
+
+    @pool {
+        timeout = 30
+    }
+
+    @internal {
+        secret = "x"
+    }
+
+    port = 1
+}
+
+@logging {
+    level = "debug"
+}
+"""
+    )
+
+    assert [(path, value) for path, value, _ in doc.walk()] == [
+        (("name",), "app"),
+        (("database", "port"), 5432),
+        (("database", "pool", "timeout"), 30),
+        (("database", "internal", "secret"), "x"),
+        (("logging", "level"), "debug"),
+    ]
+    assert [path for path, _, _ in doc.walk("database.pool")] == [
+        ("database", "pool", "timeout")
+    ]
+    assert list(doc.walk("missing")) == []
+
+    def internal(path, section):
+        return section.name == "internal"
+
+    paths = [path for path, _, _ in doc.walk(skip=internal)]
+    assert ("database", "internal", "secret") not in paths
+    assert ("logging", "level") in paths
+
+    path, value, node = next(doc.walk("logging"))
+    assert node.value == value == "debug"
+
+
+def test_to_dict():
+    doc = AloeDocument.from_text(
+        """# top
+name = "app"
+nothing = null
+flags = [true, null, # inside
+    [1, 2]]
+
+@database {
+    port = 5432
+    port = 1
+
+    @pool {
+        # pool comment
+        timeout = 30
+    }
+}
+"""
+    )
+
+    assert doc.document.to_dict() == {
+        "name": "app",
+        "nothing": None,
+        "flags": [True, None, [1, 2]],
+        "database": {"port": 5432, "pool": {"timeout": 30}},
+    }
+
+    values = doc.document.to_dict(null="NULL", arrays=False, comments="#")
+
+    assert values["#"] == ["top"]
+    assert values["nothing"] == "NULL"
+    assert values["flags"] is doc.get("flags")
+    assert values["database"]["pool"]["#"] == ["pool comment"]
+
+
+def test_from_dict():
+    values = {
+        "#": ["top"],
+        "name": "app",
+        "nothing": None,
+        "flags": [True, None, (1, 2)],
+        "database": {"port": 5432, "pool": {"timeout": 30}},
+    }
+
+    doc = AloeDocument.from_dict(values, comments="#")
+
+    assert doc.get("nothing") is Null
+    assert doc.get("flags[2][1]") == 2
+    assert doc.get("database.pool.timeout") == 30
+    assert isinstance(doc.document._items[0], CommentNode)
+    assert AloeDocument.from_text(doc.document.to_text()).document.to_dict(
+        comments="#"
+    ) == dict(values, flags=[True, None, [1, 2]])
+
+    with pytest.raises(ValueError):
+        AloeDocument.from_dict({"tags": {"a", "b"}})
+
+
+def test_section_view():
+    doc = AloeDocument.from_text(
+        """@database {
+    host = "localhost"
+    ports = [5432, 5433]
+
+    @pool {
+        timeout = 30
+    }
+}
+"""
+    )
+
+    database = doc.section("database")
+    body = doc.document._items[0].body
+
+    assert database.get("host") == "localhost"
+    assert database.get("ports[1]") == 5433
+    assert database.get("pool.timeout") == 30
+    assert database.get("missing") is None
+    assert "pool.timeout" in database
+
+    # Writes go through to the document, the section body isn't copied
+    database.set("user", "admin")
+    database.section("pool").set("size", 10)
+    database.remove("host")
+
+    assert doc.get("database.user") == "admin"
+    assert doc.get("database.pool.size") == 10
+    database.set("cache.ttl", 60)
+    database.set("ports[0]", 6432)
+
+    assert doc.get("database.host") is None
+    assert doc.get("database.cache.ttl") == 60
+    assert doc.get("database.ports[0]") == 6432
+    assert doc.document._items[0].body is body
+    assert [(path, value) for path, value, _ in database.walk("pool")] == [
+        (("pool", "timeout"), 30),
+        (("pool", "size"), 10),
+    ]
+
+    # Lookups through the key index
+    assert len(doc) == 5
+    assert database.get("pool.size") == 10
+
+    doc.remove("database")
+    assert database.get("user") is None
+    assert list(database.walk()) == []
+
+    with pytest.raises(KeyError):
+        doc.section("database")
+    with pytest.raises(ValueError):
+        doc.section("ports[0]")
@@ -0,0 +1,129 @@
+import threading
+
+import pytest
+
+from aloe.concurrent import ConcurrentAloeDocument
+
+TEXT = """@counters {
+    a = 0
+    b = 0
+}
+
+@shared {
+    array = [1, 2, 3]
+    @nested {
+        key = "value"
+    }
+}
+"""
+
+
+def test_concurrent_get_set():
+    doc = ConcurrentAloeDocument.from_text(TEXT)
+
+    doc.set("counters.a", 1)
+    doc.update({"counters": {"b": 2}, "new.key": 3})
+    doc.remove("shared.nested")
+    doc.clear("shared.array[0]")
+
+    assert doc.get_many(["counters.a", "counters.b", "new.key"]) == {
+        "counters.a": 1,
+        "counters.b": 2,
+        "new.key": 3,
+    }
+    assert doc.get("shared.nested.key") is None
+    assert "new.key" in doc
+
+
+def test_concurrent_snapshots_are_never_mutated():
+    doc = ConcurrentAloeDocument.from_text(TEXT)
+    before = doc.snapshot
+    text = before.document.to_text()
+
+    doc.set("counters.a", 1)
+    doc.set("shared.array[1]", 20)
+    doc.remove("shared.nested.key")
+    doc.set("shared.nested.other", 1)
+    doc.clear("counters")
+
+    assert before.document.to_text() == text
+    assert doc.snapshot is not before
+
+    # changed sections are copied
+    assert doc.snapshot.document._items[-1] is not before.document._items[-1]
+    assert doc.get("shared.array[1]") == 20
+    assert before.get("shared.array[1]") == 2
+
+
+def test_concurrent_unchanged_sections_are_shared():
+    doc = ConcurrentAloeDocument.from_text(TEXT)
+    before = doc.snapshot
+
+    doc.set("counters.a", 1)
+
+    assert doc.snapshot.document._items[-1] is before.document._items[-1]
+
+
+def test_concurrent_failed_transaction_publishes_nothing():
+    doc = ConcurrentAloeDocument.from_text(TEXT)
+    before = doc.snapshot
+
+    with pytest.raises(IndexError):
+        with doc.transaction() as tx:
+            tx.set("counters.a", 1)
+            tx.set("shared.array[10]", 1)
+
+    assert doc.snapshot is before
+    assert doc.get("counters.a") == 0
+
+
+def test_concurrent_stress():
+    doc = ConcurrentAloeDocument.from_text(TEXT)
+    writes = 300
+    stop = threading.Event()
+    errors: list[str] = []
+
+    def writer():
+        for _ in range(writes):
+            with doc.transaction() as tx:
+                value = doc.get("counters.a")
+                assert isinstance(value, int)
+                tx.set("counters.a", value + 1)
+                tx.set("counters.b", value + 1)
+
+    def reader():
+        last = 0
+
+        while not stop.is_set():
+            snapshot = doc.snapshot
+            a = snapshot.get("counters.a")
+            b = snapshot.get("counters.b")
+
+            if a != b:
+                errors.append(f"torn read: a={a} b={b}")
+            if not isinstance(a, int) or a < last:
+                errors.append(f"went back in time: {last} -> {a}")
+                return
+            if snapshot.get("shared.nested.key") != "value":
+                errors.append("lost an unrelated key")
+
+            last = a
+
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    writers = [threading.Thread(target=writer) for _ in range(2)]
+
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+
+    stop.set()
+
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    # writers read outside the lock, so increments may be lost, never torn
+    value = doc.get("counters.a")
+    assert isinstance(value, int) and 0 < value <= 2 * writes
+    assert doc.get("counters.a") == doc.get("counters.b")
@@ -0,0 +1,98 @@
+import aloe
+
+from aloe.diff import Change, ChangeType
+from aloe.document import AloeDocument
+
+OLD = """name = "app"
+dependencies = ["a", "b", [1, 2]]
+
+@database {
+    host = "localhost"
+    port = 5432
+
+    @pool {
+        timeout = 30
+    }
+}
+
+@cache {
+    size = 10
+}
+"""
+
+NEW = """# formatting and comments are ignored
+version = "1.0"
+dependencies = ["a", "c", [1, 2, 3]]
+
+@database
+{
+    port = 5432
+    host = "db"
+
+    @pool {
+        timeout = 30
+    }
+}
+
+@logging {
+    level = "debug"
+}
+"""
+
+
+def changes(old: str, new: str, elements: bool = True) -> list[Change]:
+    old_doc = AloeDocument.from_text(old).document
+    new_doc = AloeDocument.from_text(new).document
+
+    return list(aloe.diff(old_doc, new_doc, elements=elements))
+
+
+def test_diff():
+    assert set(changes(OLD, NEW)) == {
+        Change(ChangeType.REMOVED, "name", "app", None),
+        Change(ChangeType.ADDED, "version", None, "1.0"),
+        Change(ChangeType.CHANGED, "dependencies[1]", "b", "c"),
+        Change(ChangeType.ADDED, "dependencies[2][2]", None, 3),
+        Change(ChangeType.CHANGED, "database.host", "localhost", "db"),
+        Change(ChangeType.REMOVED, "cache.size", 10, None),
+        Change(ChangeType.ADDED, "logging.level", None, "debug"),
+    }
+
+
+def test_diff_whole_arrays():
+    result = changes(OLD, NEW, elements=False)
+
+    assert {(change.type, change.path) for change in result} == {
+        (ChangeType.REMOVED, "name"),
+        (ChangeType.ADDED, "version"),
+        (ChangeType.CHANGED, "dependencies"),
+        (ChangeType.CHANGED, "database.host"),
+        (ChangeType.REMOVED, "cache.size"),
+        (ChangeType.ADDED, "logging.level"),
+    }
+
+
+def test_diff_identical():
+    assert changes(OLD, OLD) == []
+
+
+def test_diff_type_change():
+    assert changes("flag = 1", "flag = true") == [
+        Change(ChangeType.CHANGED, "flag", 1, True)
+    ]
+
+
+def test_diff_skips_shared_subtrees():
+    doc = AloeDocument.from_text(OLD).document
+
+    assert list(aloe.diff(doc, doc)) == []
+
+    # a shared section isn't visited, even when its content differs from
+    # what an unshared copy would report
+    other = AloeDocument.from_text(OLD).document
+    other._items[-1] = doc._items[-1]
+
+    assert list(aloe.diff(doc, other)) == []
+
+    assert list(aloe.diff(doc, AloeDocument.from_text("").document)) != []
+
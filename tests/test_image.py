@@ -0,0 +1,100 @@
+import pytest
+
+from aloe.ast import Null
+from aloe.document import AloeDocument
+from aloe.image import ConfigImage, build_image, share_image, write_image
+
+TEXT = """name = "app"
+nothing = null
+huge = 123456789012345678901234567890
+flags = [true, 1, 1.5, null, "s", [1, [2]]]
+
+@database {
+    port = 5432
+    port = 1
+
+    @pool {
+        timeout = 30
+    }
+}
+
+@databases {
+    host = "other"
+}
+"""
+
+
+def test_get():
+    doc = AloeDocument.from_text(TEXT)
+    image = ConfigImage(build_image(doc.document))
+
+    for path in [
+        "name",
+        "nothing",
+        "huge",
+        "flags",
+        "flags[1]",
+        "flags[-1][1][0]",
+        "database.port",
+        "database.pool.timeout",
+        "databases.host",
+    ]:
+        assert image.get(path) == doc.get(path), path
+
+    assert image.get("nothing") is Null
+    assert image.get("flags[0]") is True
+    assert image.get("flags[10]") is None
+    assert image.get("name[0]") is None
+    assert image.get("database") is None
+    assert image.get("missing.key") is None
+
+
+def test_keys_and_sections():
+    doc = AloeDocument.from_text(TEXT)
+    image = ConfigImage(build_image(doc.document))
+
+    assert len(image) == len(doc)
+    assert list(image.keys()) == sorted(doc.keys())
+    assert list(image.keys("database")) == ["database.pool.timeout", "database.port"]
+    assert list(image.keys("database.pool")) == ["database.pool.timeout"]
+    assert list(image.keys("missing")) == []
+    assert list(image.sections()) == ["database", "database.pool", "databases"]
+    assert "database.port" in image
+    assert "database" not in image
+
+
+def test_empty_document():
+    image = ConfigImage(build_image(AloeDocument.from_text("").document))
+
+    assert len(image) == 0
+    assert image.get("key") is None
+
+
+def test_invalid_image():
+    with pytest.raises(ValueError):
+        ConfigImage(b"not an image" * 10)
+
+    data = build_image(AloeDocument.from_text(TEXT).document)
+
+    with pytest.raises(ValueError):
+        ConfigImage(data[: len(data) // 2])
+
+
+def test_open_file(tmp_path):
+    path = str(tmp_path / "config.img")
+    write_image(AloeDocument.from_text(TEXT).document, path)
+
+    with ConfigImage.open(path) as image:
+        assert image.get("database.pool.timeout") == 30
+        assert image.get("flags[4]") == "s"
+
+
+def test_shared_memory():
+    segment = share_image(AloeDocument.from_text(TEXT).document)
+
+    try:
+        with ConfigImage.attach(segment.name) as image:
+            assert image.get("databases.host") == "other"
+    finally:
+        segment.close()
+        segment.unlink()
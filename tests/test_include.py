@@ -0,0 +1,179 @@
+import os
+
+import pytest
+
+import aloe.include
+from aloe.ast import IncludeNode
+from aloe.document import AloeDocument
+from aloe.journal import Journal
+from aloe.lexer import lex
+from aloe.parser import ParserSyntaxError, parse
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    aloe.include.clear_cache()
+    yield
+    aloe.include.clear_cache()
+
+
+def write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def test_include(tmp_path):
+    write(tmp_path / "common.aloe", 'level = "info"\n')
+    main = write(
+        tmp_path / "main.aloe",
+        '@include "common.aloe"\n\n@database {\n    @include "common.aloe"\n}\n',
+    )
+
+    doc = AloeDocument.from_file(main)
+
+    assert doc.get("level") == "info"
+    assert doc.get("database.level") == "info"
+
+    # Every include gets its own nodes
+    doc.set("database.level", "debug")
+    assert doc.get("level") == "info"
+
+
+def test_shared_fragment_parsed_once(tmp_path, monkeypatch):
+    calls = []
+    parse = aloe.include.parse
+
+    def counting_parse(source, text, tokens):
+        calls.append(source)
+        return parse(source, text, tokens)
+
+    monkeypatch.setattr(aloe.include, "parse", counting_parse)
+
+    write(tmp_path / "shared.aloe", "timeout = 30\n")
+    write(tmp_path / "a.aloe", '@include "shared.aloe"\n')
+    write(tmp_path / "b.aloe", '@include "shared.aloe"\n')
+    main = write(
+        tmp_path / "main.aloe",
+        '@a {\n    @include "a.aloe"\n}\n\n@b {\n    @include "b.aloe"\n}\n',
+    )
+
+    doc = AloeDocument.from_file(main)
+    AloeDocument.from_file(main)
+
+    assert doc.get("a.timeout") == 30
+    assert doc.get("b.timeout") == 30
+    assert sorted(os.path.basename(path) for path in calls) == [
+        "a.aloe",
+        "b.aloe",
+        "shared.aloe",
+    ]
+
+
+def test_changed_fragment(tmp_path):
+    common = write(tmp_path / "common.aloe", "port = 1\n")
+    main = write(tmp_path / "main.aloe", '@include "common.aloe"\n')
+
+    assert AloeDocument.from_file(main).get("port") == 1
+
+    write(tmp_path / "common.aloe", "port = 22\n")
+    stat = os.stat(common)
+    os.utime(common, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert AloeDocument.from_file(main).get("port") == 22
+
+
+def test_cycle(tmp_path):
+    write(tmp_path / "a.aloe", '@include "b.aloe"\n')
+    write(tmp_path / "b.aloe", '@include "a.aloe"\n')
+
+    with pytest.raises(ParserSyntaxError) as e:
+        AloeDocument.from_file(str(tmp_path / "a.aloe"))
+
+    assert "Include cycle" in e.value.message
+    assert e.value.source == str(tmp_path / "b.aloe")
+    assert e.value.position == (1, 1)
+
+
+def test_missing(tmp_path):
+    main = write(tmp_path / "main.aloe", 'x = 1\n@include "missing.aloe"\n')
+
+    with pytest.raises(ParserSyntaxError) as e:
+        AloeDocument.from_file(main)
+
+    assert "missing.aloe" in e.value.message
+    assert e.value.position == (2, 1)
+
+
+def test_error_in_fragment(tmp_path):
+    broken = write(tmp_path / "broken.aloe", "x = \n")
+    main = write(tmp_path / "main.aloe", '@include "broken.aloe"\n')
+
+    with pytest.raises(ParserSyntaxError) as e:
+        AloeDocument.from_file(main)
+
+    assert e.value.source == broken
+
+
+def test_parse_and_serialize():
+    text = '@include "common.aloe"\n'
+    document = parse("text", text, lex(text))
+
+    assert document._items == [IncludeNode("common.aloe")]
+    assert document.to_text() == text
+
+
+def test_save_keeps_includes(tmp_path):
+    write(tmp_path / "pool.aloe", '@include "limits.aloe"\nsize = 5\n')
+    write(tmp_path / "limits.aloe", "timeout = 30\n")
+    text = 'name = "app"\n\n@database {\n    @include "pool.aloe"\n}'
+    main = write(tmp_path / "main.aloe", text)
+
+    doc = AloeDocument.from_file(main)
+    doc.save()
+
+    assert (tmp_path / "main.aloe").read_text() == text
+
+    doc.set("name", "api")
+    doc.set("database.port", 5432)
+    doc.save()
+
+    doc = AloeDocument.from_file(main)
+
+    assert doc.get("name") == "api"
+    assert doc.get("database.port") == 5432
+    assert doc.get("database.timeout") == 30
+    assert '@include "pool.aloe"' in (tmp_path / "main.aloe").read_text()
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda doc: doc.set("database.size", 6),
+        lambda doc: doc.set("database.timeout", 60),
+        lambda doc: doc.remove("database.size"),
+    ],
+)
+def test_save_refuses_changed_includes(tmp_path, change):
+    write(tmp_path / "pool.aloe", '@include "limits.aloe"\nsize = 5\n')
+    write(tmp_path / "limits.aloe", "timeout = 30\n")
+    text = '@database {\n    @include "pool.aloe"\n}\n'
+    main = write(tmp_path / "main.aloe", text)
+
+    doc = AloeDocument.from_file(main)
+    change(doc)
+
+    with pytest.raises(ValueError, match="pool.aloe|limits.aloe"):
+        doc.save()
+
+    assert (tmp_path / "main.aloe").read_text() == text
+
+
+def test_journal_compaction_keeps_includes(tmp_path):
+    write(tmp_path / "common.aloe", 'level = "info"\n')
+    main = write(tmp_path / "main.aloe", '@include "common.aloe"\n')
+
+    with Journal.open(main) as journal:
+        journal.doc.set("port", 1)
+        journal.compact()
+
+    assert (tmp_path / "main.aloe").read_text() == '@include "common.aloe"\nport = 1\n'
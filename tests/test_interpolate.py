@@ -0,0 +1,82 @@
+import pytest
+
+from aloe.ast import Array
+from aloe.document import AloeDocument
+from aloe.interpolate import InterpolationError, Interpolator
+
+TEXT = """@defaults {
+    port = 5432
+    hosts = ["a", "b"]
+}
+
+@database {
+    host = "db.internal"
+    port = "${defaults.port}"
+    url = "postgres://${database.host}:${database.port}/app"
+    replica = "${defaults.hosts[1]}"
+    literal = "$${not.a.reference}"
+    flags = "${defaults.hosts} ${missing_is_fine_here.not}"
+}
+"""
+
+
+def test_resolve():
+    config = Interpolator(AloeDocument.from_text(TEXT))
+
+    assert config.get("database.port") == 5432
+    assert config.get("database.url") == "postgres://db.internal:5432/app"
+    assert config.get("database.replica") == "b"
+    assert config.get("database.literal") == "${not.a.reference}"
+    assert config.get("defaults.hosts[0]") == "a"
+    assert config.get("missing") is None
+
+
+def test_unknown_reference():
+    config = Interpolator(AloeDocument.from_text(TEXT))
+
+    with pytest.raises(InterpolationError) as error:
+        config.get("database.flags")
+
+    assert error.value.path == "database.flags"
+    assert error.value.position == (12, 5)
+    assert "${missing_is_fine_here.not}" in str(error.value)
+
+
+def test_cycle():
+    doc = AloeDocument.from_text('a = "${b}"\nb = "x${c}"\nc = "${a}"\nd = "${a}"\n')
+    config = Interpolator(doc)
+
+    with pytest.raises(InterpolationError, match="a -> b -> c -> a") as error:
+        config.get("d")
+
+    assert error.value.path == "a"
+    assert error.value.position == (1, 1)
+
+    doc.set("c", "end")
+
+    assert config.get("d") == "xend"
+
+
+def test_targeted_invalidation():
+    doc = AloeDocument.from_text(TEXT)
+    config = Interpolator(doc)
+
+    assert config.get("database.url") == "postgres://db.internal:5432/app"
+    assert config.get("database.replica") == "b"
+
+    doc.set("defaults.port", 6543)
+
+    assert "database.url" not in config._resolved
+    assert config._resolved["database.replica"] == "b"
+    assert config.get("database.url") == "postgres://db.internal:6543/app"
+
+    # New references are picked up
+    doc.set("database.host", "${database.replica}.internal")
+    assert config.get("database.url") == "postgres://b.internal:6543/app"
+
+    doc.remove("defaults")
+    with pytest.raises(InterpolationError):
+        config.get("database.port")
+
+    doc.update({"defaults": {"port": 1, "hosts": Array.from_iter(["c", "d"])}})
+    assert config.get("database.url") == "postgres://d.internal:1/app"
@@ -0,0 +1,133 @@
+import os
+import threading
+
+from aloe.document import AloeDocument
+from aloe.journal import Journal, journal_path
+
+TEXT = """name = "app"
+
+@database {
+    host = "localhost"
+    ports = [5432, 5433]
+
+    @pool {
+        size = 10
+    }
+}
+"""
+
+
+def mutate(doc):
+    doc.set("database.host", "db")
+    doc.set("database.ports[1]", 6432)
+    doc.remove("name")
+    doc.clear("database.pool")
+    doc.update({"cache": {"ttl": 60}, "database.user": "admin"})
+
+
+def test_journal(tmp_path):
+    path = str(tmp_path / "config.aloe")
+    with open(path, "w") as f:
+        f.write(TEXT)
+
+    with Journal.open(path) as journal:
+        mutate(journal.doc)
+        expected = journal.doc.document.to_dict()
+
+        assert journal.records == 5
+        assert journal.compactions == 0
+
+    # The file itself is untouched until compaction
+    with open(path) as f:
+        assert f.read() == TEXT
+
+    with Journal.open(path) as journal:
+        assert journal.doc.document.to_dict() == expected
+
+        journal.compact()
+
+        assert os.path.getsize(journal_path(path)) == 0
+
+    assert AloeDocument.from_file(path).document.to_dict() == expected
+
+
+def test_journal_crash_recovery(tmp_path):
+    path = str(tmp_path / "config.aloe")
+    with open(path, "w") as f:
+        f.write(TEXT)
+
+    journal = Journal.open(path)
+    mutate(journal.doc)
+    expected = journal.doc.document.to_dict()
+    size = journal.size
+
+    # A record torn by a crash in the middle of an append
+    journal.doc.set("database.host", "lost")
+    with open(journal_path(path), "r+b") as f:
+        f.truncate(size + 5)
+
+    recovered = Journal.open(path)
+
+    assert recovered.doc.document.to_dict() == expected
+    assert recovered.size == size
+
+    # Crash between the save and the truncation of a compaction: the
+    # records are replayed over the saved file
+    with open(journal_path(path), "rb") as f:
+        records = f.read()
+    recovered.compact()
+    with open(journal_path(path), "wb") as f:
+        f.write(records)
+
+    assert Journal.open(path).doc.document.to_dict() == expected
+
+
+def test_journal_compact_while_writing(tmp_path):
+    path = str(tmp_path / "config.aloe")
+    with open(path, "w") as f:
+        f.write(TEXT)
+
+    journal = Journal.open(path, threshold=256)
+
+    def write():
+        for i in range(500):
+            journal.doc.set("counter", i)
+
+    def compact():
+        for _ in range(100):
+            journal.compact()
+
+    threads = [
+        threading.Thread(target=write, daemon=True),
+        threading.Thread(target=compact, daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert not any(thread.is_alive() for thread in threads)
+
+    journal.close()
+    assert Journal.open(path).doc.get("counter") == 499
+
+
+def test_journal_compaction(tmp_path):
+    path = str(tmp_path / "config.aloe")
+    with open(path, "w") as f:
+        f.write(TEXT)
+
+    journal = Journal.open(path, threshold=200)
+
+    for i in range(50):
+        journal.doc.set("counter", i)
+
+    assert journal.compactions > 0
+    assert journal.size <= 200
+    assert Journal.open(path).doc.get("counter") == 49
+
+    # Not expressible as the state of a few paths
+    journal.doc.clear()
+
+    assert journal.size == 0
+    assert AloeDocument.from_file(path).document.to_dict() == {}
@@ -0,0 +1,155 @@
+from aloe.document import AloeDocument
+from aloe.overlay import AloeStack
+
+DEFAULTS = """@database {
+    host = "localhost"
+    port = 5432
+    replicas = ["a", "b"]
+
+    @pool {
+        timeout = 30
+        max_connections = 10
+    }
+}
+"""
+
+PRODUCTION = """@database {
+    host = "db.internal"
+
+    @pool {
+        max_connections = 100
+    }
+}
+"""
+
+LOCAL = """@database {
+    replicas = ["local"]
+}
+debug = true
+"""
+
+
+def make_stack():
+    defaults = AloeDocument.from_text(DEFAULTS)
+    production = AloeDocument.from_text(PRODUCTION)
+    local = AloeDocument.from_text(LOCAL)
+
+    return AloeStack(defaults, production, local), (defaults, production, local)
+
+
+def test_stack_get():
+    stack, (defaults, production, local) = make_stack()
+
+    assert stack.get("database.host") == "db.internal"
+    assert stack.get("database.port") == 5432
+    assert stack.get("database.pool.timeout") == 30
+    assert stack.get("database.pool.max_connections") == 100
+    assert stack.get("database.replicas[0]") == "local"
+    assert stack.get("database.replicas[1]") is None
+    assert stack.get("debug") is True
+    assert stack.get("missing") is None
+
+    assert stack.layer_of("database.host") is production
+    assert stack.layer_of("database.port") is defaults
+
+
+def test_stack_keys():
+    stack, _ = make_stack()
+
+    assert list(stack.keys()) == [
+        "database.host",
+        "database.port",
+        "database.replicas",
+        "database.pool.timeout",
+        "database.pool.max_connections",
+        "debug",
+    ]
+    assert "debug" in stack
+    assert len(stack) == 6
+    assert dict(stack.items())["database.host"] == "db.internal"
+
+
+def test_stack_cache_invalidated_by_layer_mutation():
+    stack, (defaults, production, local) = make_stack()
+
+    assert stack.get("database.port") == 5432
+
+    local.set("database.port", 1234)
+
+    assert stack.get("database.port") == 1234
+
+    local.remove("database.port")
+
+    assert stack.get("database.port") == 5432
+
+    production.document = AloeDocument.from_text("").document
+
+    assert stack.get("database.host") == "localhost"
+
+
+def test_stack_cache_drops_changed_paths_only():
+    stack, (defaults, production, local) = make_stack()
+
+    stack.get("database.port")
+    stack.get("database.replicas[0]")
+    stack.get("database.pool.timeout")
+    stack.get("debug")
+
+    local.set("debug", False)
+    assert set(stack._cache) == {
+        "database.port",
+        "database.replicas[0]",
+        "database.pool.timeout",
+    }
+
+    defaults.remove("database.pool")
+    assert set(stack._cache) == {"database.port", "database.replicas[0]"}
+
+    local.set("database.replicas", ["other"])
+    assert set(stack._cache) == {"database.port"}
+
+
+def test_stack_cache_size():
+    stack, _ = make_stack()
+    stack.cache_size = 2
+
+    stack.get("database.port")
+    stack.get("database.host")
+    stack.get("database.port")
+    stack.get("missing")
+
+    assert list(stack._cache) == ["database.port", "missing"]
+
+
+def test_stack_doesnt_cache_values_resolved_during_a_change():
+    stack, (defaults, production, local) = make_stack()
+    index = local._key_index()
+
+    class ReloadingIndex(dict):
+        def get(self, key, default=None):
+            node = super().get(key, default)
+            # Another thread replaces the document while the value is read
+            local.document = AloeDocument.from_text("debug = false\n").document
+            return node
+
+    local._key_index = lambda: ReloadingIndex(index)
+
+    assert stack.get("debug") is True
+    assert "debug" not in stack._cache
+
+    del local._key_index
+    assert stack.get("debug") is False
+
+
+def test_stack_push_pop():
+    stack, (defaults, production, local) = make_stack()
+
+    assert stack.pop() is local
+    assert stack.get("debug") is None
+
+    # a removed layer doesn't affect the stack anymore
+    local.set("database.host", "other")
+    assert stack.get("database.host") == "db.internal"
+
+    stack.push(local)
+    assert stack.get("database.host") == "other"
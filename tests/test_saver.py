@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+
+import pytest
+
+from aloe.document import AloeDocument
+from aloe.saver import CoalescingSaver
+
+
+class ManualScheduler:
+    def __init__(self):
+        self.pending: list = []
+
+    def __call__(self, delay, callback):
+        scheduler = self
+
+        class Handle:
+            def cancel(self):
+                if callback in scheduler.pending:
+                    scheduler.pending.remove(callback)
+
+        self.pending.append(callback)
+        return Handle()
+
+    def run(self):
+        pending, self.pending = self.pending, []
+        for callback in pending:
+            callback()
+
+
+def test_atomic_save(tmp_path):
+    path = tmp_path / "config.aloe"
+    path.write_text("key = 1\n")
+    os.chmod(path, 0o600)
+
+    doc = AloeDocument.from_file(str(path))
+    doc.set("key", 2)
+    doc.save(atomic=True)
+
+    assert path.read_text() == "key = 2\n"
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    assert os.listdir(tmp_path) == ["config.aloe"]
+
+
+def test_atomic_save_failure_keeps_file(tmp_path, monkeypatch):
+    path = tmp_path / "config.aloe"
+    path.write_text("key = 1\n")
+
+    doc = AloeDocument.from_file(str(path))
+    doc.set("key", 2)
+
+    def fail(fd):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "fsync", fail)
+
+    with pytest.raises(OSError):
+        doc.save(atomic=True)
+
+    assert path.read_text() == "key = 1\n"
+    assert os.listdir(tmp_path) == ["config.aloe"]
+
+
+def test_coalescing_saver(tmp_path):
+    path = tmp_path / "config.aloe"
+    path.write_text("counter = 0\n")
+
+    doc = AloeDocument.from_file(str(path))
+    scheduler = ManualScheduler()
+    saver = CoalescingSaver(doc, scheduler=scheduler)
+
+    for i in range(1000):
+        doc.set("counter", i)
+
+    assert len(scheduler.pending) == 1
+    assert saver.dirty
+    assert path.read_text() == "counter = 0\n"
+
+    scheduler.run()
+
+    assert saver.saves == 1
+    assert not saver.dirty
+    assert path.read_text() == "counter = 999\n"
+
+    # nothing changed, nothing to save
+    saver.flush()
+    assert saver.saves == 1
+
+    doc.set("counter", 1000)
+    saver.close()
+
+    assert scheduler.pending == []
+    assert saver.saves == 2
+    assert path.read_text() == "counter = 1000\n"
+
+    # detached from the document
+    doc.set("counter", 0)
+    assert scheduler.pending == []
+
+
+def test_coalescing_saver_timer(tmp_path):
+    path = tmp_path / "config.aloe"
+    path.write_text("counter = 0\n")
+
+    doc = AloeDocument.from_file(str(path))
+
+    with CoalescingSaver(doc, interval=0.01) as saver:
+        doc.set("counter", 1)
+
+        deadline = time.monotonic() + 5
+        while saver.saves == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert saver.saves == 1
+
+    assert path.read_text() == "counter = 1\n"
+
+
+def test_coalescing_saver_waits_for_mutations(tmp_path):
+    path = tmp_path / "config.aloe"
+    path.write_text("a = 0\nb = 0\n")
+
+    doc = AloeDocument.from_file(str(path))
+    saver = CoalescingSaver(doc, scheduler=ManualScheduler())
+    doc.set("a", 0)
+    remove = doc._remove
+    saving = []
+
+    # The timer fires in the middle of a transaction
+    def remove_then_save(path, undo=None):
+        remove(path, undo)
+        thread = threading.Thread(target=saver.flush)
+        thread.start()
+        thread.join(0.1)
+        saving.append(thread)
+
+    doc._remove = remove_then_save
+
+    with doc.transaction() as tx:
+        tx.remove("a")
+        tx.set("b", 1)
+
+    saving[0].join()
+
+    assert path.read_text() == "b = 1\n"
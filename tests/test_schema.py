@@ -0,0 +1,160 @@
+import pytest
+
+from aloe.document import AloeDocument
+from aloe.schema import Schema, SchemaError, Violation
+
+SCHEMA = """@name {
+    type = "string"
+    required = true
+    min_length = 1
+}
+
+@level {
+    type = "string"
+    values = ["debug", "info"]
+}
+
+@ratio {
+    type = "number"
+    min = 0
+    max = 1
+}
+
+@tags {
+    type = "array"
+    items = "string"
+    max_length = 2
+}
+
+@database {
+    required = true
+    strict = true
+
+    @port {
+        type = "int"
+        required = true
+    }
+
+    @replicas {
+        allowed = ["primary", "standby"]
+    }
+}
+"""
+
+VALID = """name = "app"
+level = "info"
+ratio = 0.5
+tags = ["a"]
+
+@database {
+    port = 5432
+
+    @replicas {
+        @primary {
+            host = "a"
+        }
+    }
+}
+"""
+
+INVALID = """name = ""
+level = "trace"
+ratio = 2
+tags = ["a", 1, "c"]
+
+@database {
+    port = "5432"
+    user = "admin"
+
+    @replicas {
+        @backup {
+        }
+    }
+}
+
+name = "again"
+"""
+
+
+def messages(violations: list[Violation]) -> list[tuple[str, str]]:
+    return [(violation.path, violation.message) for violation in violations]
+
+
+def test_valid():
+    schema = Schema.from_text(SCHEMA)
+
+    assert schema.validate(AloeDocument.from_text(VALID).document) == []
+
+
+def test_violations():
+    schema = Schema.from_text(SCHEMA)
+    violations = schema.validate(AloeDocument.from_text(INVALID).document, "x.aloe")
+
+    assert messages(violations) == [
+        ("name", "Length 0 is less than the minimum 1"),
+        ("level", "'trace' is not one of the allowed values"),
+        ("ratio", "2 is more than the maximum 1"),
+        ("tags", "Length 3 is more than the maximum 2"),
+        ("tags[1]", "Expected string, got int"),
+        ("database.port", "Expected int, got string"),
+        ("database.user", "Unexpected key"),
+        ("database.replicas.backup", "Section not allowed"),
+        ("name", "Duplicate key, only the first one is used"),
+    ]
+    assert violations[5].position == (7, 5)
+    assert str(violations[5]) == (
+        "x.aloe:7:5: database.port: Expected int, got string"
+    )
+
+
+def test_missing_and_kind_mismatch():
+    schema = Schema.from_text(SCHEMA)
+    document = AloeDocument.from_text("@name {\n}\ndatabase = 1\n").document
+
+    assert messages(schema.validate(document)) == [
+        ("name", "Expected string, got a section"),
+        ("database", "Expected a section, got int"),
+        ("name", "Missing required key"),
+        ("database", "Missing required section"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        ('@a {\n    type = "strin"\n}\n', "Unknown type 'strin'"),
+        ('@a {\n    type = "int"\n    strict = true\n}\n', "Unknown key rule"),
+        ("@a {\n    min = 1\n}\n", "Unknown section rule"),
+        ('@a {\n    type = ["int", "section"]\n}\n', "can't be mixed"),
+        ('@a {\n    type = "int"\n    @b {\n    }\n}\n', "Only sections"),
+        ('@a {\n    type = "int"\n    min = 2\n    max = 1\n}\n', "'max' is less"),
+        ('@a {\n    required = "yes"\n}\n', "must be a boolean"),
+    ],
+)
+def test_invalid_schema(text, message):
+    with pytest.raises(SchemaError, match=message) as error:
+        Schema.from_text(text)
+
+    assert error.value.position is not None
+
+
+def test_validate_files(tmp_path):
+    schema = Schema.from_text(SCHEMA)
+    valid = tmp_path / "valid.aloe"
+    invalid = tmp_path / "invalid.aloe"
+    broken = tmp_path / "broken.aloe"
+    valid.write_text(VALID)
+    invalid.write_text(INVALID)
+    broken.write_text("= 1\n")
+    missing = tmp_path / "missing.aloe"
+
+    results = schema.validate_files(
+        [str(valid), str(invalid), str(broken), str(missing)]
+    )
+
+    assert results[str(valid)] == []
+    assert len(results[str(invalid)]) == 9
+    assert results[str(invalid)][0].source == str(invalid)
+    assert messages(results[str(broken)]) == [("", "Expected an identifier before '='")]
+    assert messages(results[str(missing)]) == [("", "No such file or directory")]
+    assert results[str(missing)][0].source == str(missing)
@@ -0,0 +1,104 @@
+import os
+
+from aloe.document import AloeDocument
+from aloe.section_index import SectionIndex, index_path, lookup
+
+TEXT = """top = 1
+# comment
+
+@database {
+    host = "h{o}st"
+
+    @pool {
+        size = 10
+        names = [
+            "a", # comment
+            "ü",
+        ]
+    }
+
+    port = 5432
+
+    @pool {
+        size = 99
+    }
+}
+
+after = "é"
+
+@cache
+{
+    ttl = 60
+}
+"""
+
+
+def write(path, text):
+    path.write_text(text)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    return str(path)
+
+
+def test_section_index(tmp_path):
+    path = write(tmp_path / "config.aloe", TEXT)
+    index = SectionIndex.load(path)
+    doc = AloeDocument.from_file(path)
+
+    for key in doc.keys():
+        assert index.get(key) == doc.get(key), key
+
+    assert index.get("database.pool.names[1]") == "ü"
+    assert index.get("database.missing") is None
+    assert index.get("missing.key") is None
+    assert lookup(path, "cache.ttl") == 60
+    assert os.path.exists(index_path(path))
+
+
+def test_section_index_revalidates(tmp_path, monkeypatch):
+    path = write(tmp_path / "config.aloe", TEXT)
+    SectionIndex.load(path)
+
+    builds = []
+    build = SectionIndex.build.__func__
+
+    def counting_build(cls, filename, text):
+        builds.append(filename)
+        return build(cls, filename, text)
+
+    monkeypatch.setattr(SectionIndex, "build", classmethod(counting_build))
+
+    # Same content with a new mtime: the hash matches, nothing is rebuilt
+    write(tmp_path / "config.aloe", TEXT)
+    assert SectionIndex.load(path).get("cache.ttl") == 60
+    assert builds == []
+
+    write(tmp_path / "config.aloe", TEXT.replace("ttl = 60", "ttl = 61"))
+    assert SectionIndex.load(path).get("cache.ttl") == 61
+    assert builds == [path]
+
+
+def test_section_index_follows_the_file(tmp_path):
+    path = write(tmp_path / "config.aloe", TEXT)
+    index = SectionIndex.load(path)
+
+    assert index.get("cache.ttl") == 60
+
+    # Every range moves, the index held has to notice
+    write(tmp_path / "config.aloe", "# prepended\n" + TEXT)
+
+    assert index.get("top") == 1
+    assert index.get("cache.ttl") == 60
+    assert index.get("database.pool.size") == 10
+
+
+def test_section_index_includes(tmp_path):
+    (tmp_path / "common.aloe").write_text("level = 1\n")
+    path = write(
+        tmp_path / "config.aloe", '@logging {\n    @include "common.aloe"\n}\n'
+    )
+
+    index = SectionIndex.load(path)
+
+    assert index.includes
+    assert index.get("logging.level") == 1
@@ -0,0 +1,122 @@
+import os
+
+import pytest
+
+from aloe.store import AloeStore
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_store(tmp_path):
+    write(tmp_path / "acme.aloe", "@database {\n    port = 5432\n}\n")
+    write(tmp_path / "globex" / "eu.aloe", "hosts = [\"a\", \"b\"]\n")
+    store = AloeStore(str(tmp_path))
+
+    assert store.get("acme.database.port") == 5432
+    assert store.get("acme.database.host") is None
+    assert store.get("globex.eu.hosts[1]") == "b"
+    assert store.get("initech.database.port") is None
+    assert (store.hits, store.misses, len(store)) == (1, 2, 2)
+
+    store.document("acme").set("database.port", 5433)
+    assert store.get("acme.database.port") == 5433
+
+    with pytest.raises(KeyError):
+        store.document("initech")
+
+
+def test_store_revalidates(tmp_path):
+    path = tmp_path / "acme.aloe"
+    write(path, "port = 1\n")
+    store = AloeStore(str(tmp_path))
+
+    assert store.get("acme.port") == 1
+
+    write(path, "port = 22\n")
+    assert store.get("acme.port") == 22
+    assert store.misses == 2
+
+    path.unlink()
+    assert store.get("acme.port") is None
+    assert len(store) == 0 and store.bytes == 0
+
+
+def test_store_eviction(tmp_path):
+    for name in ("a", "b", "c", "d"):
+        write(tmp_path / f"tenant_{name}.aloe", "value = 1\n")
+
+    size = os.path.getsize(tmp_path / "tenant_a.aloe")
+    store = AloeStore(str(tmp_path), max_documents=3, max_bytes=size * 2)
+
+    store.get("tenant_a.value")
+    store.get("tenant_b.value")
+    store.get("tenant_a.value")
+    # Over the byte limit: `tenant_b` is the least recently used
+    store.get("tenant_c.value")
+
+    assert store.evictions == 1
+    assert store.bytes == size * 2
+    assert store.get("tenant_a.value") == 1
+    assert store.hits == 2
+
+    store.max_bytes = size * 10
+    store.get("tenant_b.value")
+    store.get("tenant_d.value")
+
+    # Over the document limit
+    assert len(store) == 3
+    assert store.evictions == 2
+
+
+def test_store_keeps_changed_documents(tmp_path):
+    path = tmp_path / "acme.aloe"
+    write(path, "port = 1\n")
+    write(tmp_path / "other.aloe", "port = 2\n")
+    store = AloeStore(str(tmp_path), max_documents=1)
+
+    store.document("acme").set("port", 5433)
+
+    # Neither evicted nor parsed again while it isn't saved
+    assert store.get("other.port") == 2
+    write(path, "port = 22\n")
+    assert store.get("acme.port") == 5433
+    assert len(store) == 2 and store.evictions == 0
+
+    assert store.save() == 1
+    assert store.save() == 0
+    assert path.read_text() == "port = 5433\n"
+    assert len(store) == 1 and store.evictions == 1
+
+    write(path, "port = 22\n")
+    assert store.get("acme.port") == 22
+
+
+def test_store_save_updates_bytes(tmp_path):
+    write(tmp_path / "acme.aloe", "a = 1\n")
+    store = AloeStore(str(tmp_path))
+
+    store.document("acme").set("a", "x" * 1000)
+    store.save()
+
+    assert store.bytes == os.path.getsize(tmp_path / "acme.aloe")
+
+    store.invalidate("acme")
+    assert store.bytes == 0
+
+
+@pytest.mark.parametrize(
+    "name", ["/etc/passwd", "a/../../secret", "..", "", "a..b", "a\x00/b"]
+)
+def test_store_rejects_paths(tmp_path, name):
+    store = AloeStore(str(tmp_path))
+
+    with pytest.raises(ValueError):
+        store.document(name)
+
+    with pytest.raises(ValueError):
+        store.get(name + ".key")
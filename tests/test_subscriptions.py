@@ -0,0 +1,77 @@
+from aloe.document import AloeDocument
+
+TEXT = """@database {
+    host = "localhost"
+    ports = [5432, 5433]
+
+    @pool {
+        size = 10
+    }
+}
+
+@logging {
+    level = "debug"
+}
+"""
+
+
+def subscribe(doc, prefix):
+    calls = []
+    subscription = doc.subscribe(prefix, calls.append)
+    return calls, subscription
+
+
+def test_subscribe():
+    doc = AloeDocument.from_text(TEXT)
+    database, _ = subscribe(doc, "database")
+    pool, _ = subscribe(doc, "database.pool")
+    logging, _ = subscribe(doc, "logging")
+
+    doc.set("database.pool.size", 20)
+    doc.set("database.ports[1]", 6432)
+    doc.remove("database.host")
+
+    assert database == [["database.pool.size"], ["database.ports"], ["database.host"]]
+    assert pool == [["database.pool.size"]]
+    assert logging == []
+
+    # Removing a section notifies the subscriptions below it with their prefix
+    doc.clear("database")
+    assert pool[-1] == ["database.pool"]
+    assert database[-1] == ["database"]
+
+    doc.document = AloeDocument.from_text(TEXT).document
+    assert logging == [["logging"]]
+
+
+def test_subscribe_batched():
+    doc = AloeDocument.from_text(TEXT)
+    database, _ = subscribe(doc, "database")
+    logging, _ = subscribe(doc, "logging")
+
+    doc.update({"database": {"host": "db", "pool.size": 5}, "logging.level": "info"})
+
+    assert database == [["database.host", "database.pool.size"]]
+    assert logging == [["logging.level"]]
+
+    with doc.transaction() as tx:
+        tx.set("database.host", "db2")
+        tx.remove("database.ports")
+        tx.set("name", "app")
+
+    assert database[1:] == [["database.host", "database.ports"]]
+    assert len(logging) == 1
+
+
+def test_subscription_cancel():
+    doc = AloeDocument.from_text(TEXT)
+    pool, subscription = subscribe(doc, "database.pool")
+
+    subscription.cancel()
+    subscription.cancel()
+    doc.set("database.pool.size", 20)
+
+    assert pool == []
+    assert not subscription.active
+    # The trie doesn't keep the nodes of cancelled subscriptions
+    assert not doc._subscriptions
@@ -0,0 +1,248 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from aloe.document import AloeDocument
+from aloe.parser import ParserSyntaxError
+from aloe.watch import Watcher
+
+TEXT = """name = "app"
+
+@database {
+    host = "localhost"
+    port = 5432
+}
+
+@logging {
+    level = "debug"
+}
+"""
+
+
+def write(path, text):
+    if isinstance(text, bytes):
+        path.write_bytes(text)
+    else:
+        path.write_text(text)
+    # make sure the signature changes even on coarse mtime clocks
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_reload_changed_paths(tmp_path):
+    path = tmp_path / "config.aloe"
+    write(path, TEXT)
+
+    doc = AloeDocument.from_file(str(path))
+    logging = doc.document._items[-1]
+
+    write(
+        path,
+        TEXT.replace("5432", "5433").replace('name = "app"', 'version = "1.0"'),
+    )
+
+    changed = doc.reload()
+
+    assert changed == {"name", "version", "database.port"}
+    assert doc.get("database.port") == 5433
+    # unchanged sections keep their nodes
+    assert doc.document._items[-1] is logging
+
+
+def test_reload_moves_positions(tmp_path):
+    path = tmp_path / "config.aloe"
+    write(path, TEXT)
+
+    doc = AloeDocument.from_file(str(path))
+    logging = doc.document._items[-1]
+
+    write(path, "\n\n" + TEXT)
+    doc.reload()
+
+    assert doc.document._items[-1] is logging
+    assert logging.position == (10, 1)
+    assert logging.body[0].position == (11, 5)
+
+
+def test_reload_detects_type_change(tmp_path):
+    path = tmp_path / "config.aloe"
+    write(path, "flag = 1\n")
+
+    doc = AloeDocument.from_file(str(path))
+
+    write(path, "flag = true\n")
+
+    assert doc.reload() == {"flag"}
+    assert doc.get("flag") is True
+
+
+def test_watcher_poll(tmp_path):
+    path = tmp_path / "config.aloe"
+    write(path, TEXT)
+
+    doc = AloeDocument.from_file(str(path))
+    events = []
+
+    watcher = Watcher(interval=1, max_interval=8)
+    watcher.add(doc)
+    watcher.subscribe(lambda doc, changed: events.append(changed))
+
+    now = watcher.next_due()
+    assert now is not None
+
+    assert watcher.poll(now) == []
+
+    write(path, TEXT.replace('"debug"', '"info"'))
+
+    now = watcher.next_due()
+    assert now is not None
+
+    assert watcher.poll(now) == [(doc, {"logging.level"})]
+    assert events == [{"logging.level"}]
+    assert doc.get("logging.level") == "info"
+
+
+def test_watcher_backoff(tmp_path):
+    path = tmp_path / "config.aloe"
+    write(path, TEXT)
+
+    watcher = Watcher(interval=1, max_interval=4)
+    watcher.add(AloeDocument.from_file(str(path)))
+
+    start = watcher.next_due()
+    assert start is not None
+
+    dues = []
+    now = start
+    for _ in range(4):
+        watcher.poll(now)
+        due = watcher.next_due()
+        assert due is not None
+        dues.append(due - now)
+        now = due
+
+    assert dues == pytest.approx([2, 4, 4, 4])
+
+    # nothing is stat'ed before it's due
+    assert watcher.poll(now - 1) == []
+
+
+def test_watcher_remove_during_poll(tmp_path):
+    path = tmp_path / "config.aloe"
+    write(path, TEXT)
+
+    doc = AloeDocument.from_file(str(path))
+    watcher = Watcher(interval=1)
+    watcher.add(doc)
+    check = watcher._check
+
+    # `remove` from another thread while the entry is out of the queue
+    def removing_check(entry):
+        watcher.remove(doc)
+        return check(entry)
+
+    watcher._check = removing_check
+
+    now = watcher.next_due()
+    assert now is not None
+
+    watcher.poll(now)
+
+    assert watcher.next_due() is None
+
+
+def test_watcher_keeps_document_on_syntax_error(tmp_path):
+    path = tmp_path / "config.aloe"
+    write(path, TEXT)
+
+    doc = AloeDocument.from_file(str(path))
+    errors = []
+
+    watcher = Watcher(on_error=lambda doc, err: errors.append(err))
+    watcher.add(doc)
+
+    write(path, "= 1\n")
+
+    now = watcher.next_due()
+    assert now is not None
+
+    assert watcher.poll(now) == []
+    assert len(errors) == 1
+    assert doc.get("database.port") == 5432
+
+
+@pytest.mark.parametrize("broken", ['name = "ap', b"name = '\xff'\n"])
+def test_watcher_recovers_from_broken_file(tmp_path, broken):
+    path = tmp_path / "config.aloe"
+    write(path, TEXT)
+
+    doc = AloeDocument.from_file(str(path))
+    errors = []
+
+    watcher = Watcher(on_error=lambda doc, err: errors.append(err))
+    watcher.add(doc)
+
+    write(path, broken)
+
+    now = watcher.next_due()
+    assert now is not None
+    assert watcher.poll(now) == []
+    assert len(errors) == 1
+    assert not isinstance(errors[0], ParserSyntaxError)
+
+    write(path, TEXT.replace("5432", "5433"))
+
+    now = watcher.next_due()
+    assert now is not None
+    assert [changed for _, changed in watcher.poll(now)] == [{"database.port"}]
+    assert doc.get("database.port") == 5433
+
+
+def test_watcher_thread_survives_failing_subscriber(tmp_path, monkeypatch):
+    path = tmp_path / "config.aloe"
+    write(path, TEXT)
+
+    doc = AloeDocument.from_file(str(path))
+    reloaded = threading.Event()
+    calls = []
+
+    def subscriber(doc, changed):
+        calls.append(changed)
+        if len(calls) == 1:
+            raise RuntimeError("subscriber failed")
+        reloaded.set()
+
+    monkeypatch.setattr(sys, "excepthook", lambda *exc_info: None)
+
+    with Watcher(interval=0.01, max_interval=0.01) as watcher:
+        watcher.add(doc)
+        watcher.subscribe(subscriber)
+
+        write(path, TEXT.replace("5432", "5433"))
+        while not calls:
+            time.sleep(0.01)
+        write(path, TEXT.replace("5432", "5434"))
+
+        assert reloaded.wait(5)
+
+    assert doc.get("database.port") == 5434
+
+
+def test_reload_section_view(tmp_path):
+    path = tmp_path / "config.aloe"
+    write(path, TEXT)
+
+    doc = AloeDocument.from_file(str(path))
+    database = doc.section("database")
+    logging = doc.section("logging")
+
+    write(path, TEXT.replace("5432", "5433"))
+    doc.reload()
+
+    # `database` was parsed again, the view follows the new section
+    assert database.get("port") == 5433
+    assert database._body is doc.document._items[2].body
+    assert logging.get("level") == "debug"